@@ -9,16 +9,17 @@ from .error import (
 )
 from .functions import predownload_models, transform_epub, transform_markdown
 from .craft import ExtractionOptions, PDFCraft, PDFOptions, TranslationStep
-from .pipeline.epub import translate_epub
+from .pipeline.epub import TranslationPlan, collect_epub_translation, plan_epub_translation, translate_epub
 from .pipeline.pdf import PDFPatcher, PDFReplacement, PDFSkippedReplacement, PDFTranslationPipeline, PatchTextOptions
 from .transformer import (
     ChapterPackageTransformer,
+    ChapterProgress,
     FillFailedEvent,
     PackageTransformer,
     SubmitKind,
     XMLTranslator,
 )
-from .llm import LLM
+from .llm import LLM, LLMEvent, LLMEventKind, LLMMetering
 from .metering import AbortedCheck, InterruptedKind, OCRTokensMetering
 from .ocr_config import (
     DeepSeekOCR2LocalConfig,
@@ -1,6 +1,9 @@
 import hashlib
 import uuid
+from concurrent.futures import Future, ThreadPoolExecutor
+from io import BytesIO
 from pathlib import Path
+from threading import Lock
 from typing import Literal
 
 from PIL import Image
@@ -10,32 +13,81 @@ ASSET_TAGS: tuple[AssetRef, ...] = ("image", "table", "equation")
 
 
 class AssetHub:
-    def __init__(self, asset_path: Path) -> None:
+    """Stores cropped page regions as ``{sha256}.png`` files.
+
+    Each crop is encoded to PNG once in memory and hashed there. Hashes already
+    stored by this hub skip the disk entirely. With ``background_writes`` the
+    files are written by one writer thread, and ``flush()`` waits for them.
+    """
+
+    def __init__(self, asset_path: Path, background_writes: bool = False) -> None:
         self._asset_path = asset_path
+        self._known_hashes: set[str] = set()
+        self._lock = Lock()
+        self._background_writes = background_writes
+        self._writer: ThreadPoolExecutor | None = None
+        self._pending_writes: list[Future[None]] = []
 
     def clip(self, image: Image.Image, det: tuple[int, int, int, int]) -> str:
-        cropped_image = image.crop(det)
-        self._asset_path.mkdir(parents=True, exist_ok=True)
-        temp_filename = f"{uuid.uuid4().hex}.png.temp"
-        temp_path = self._asset_path / temp_filename
+        buffer = BytesIO()
+        image.crop(det).save(buffer, format="PNG")
+        data = buffer.getvalue()
+        image_hash = hashlib.sha256(data).hexdigest()
+
+        with self._lock:
+            if image_hash in self._known_hashes:
+                return image_hash
+            self._known_hashes.add(image_hash)
+            if self._background_writes:
+                if self._writer is None:
+                    self._writer = ThreadPoolExecutor(
+                        max_workers=1,
+                        thread_name_prefix="pdf-craft-assets",
+                    )
+                self._pending_writes.append(
+                    self._writer.submit(self._write, image_hash, data)
+                )
+                return image_hash
+
+        self._write(image_hash, data)
+        return image_hash
+
+    def flush(self) -> None:
+        """Wait for every write submitted before this call, also when called concurrently."""
+        # OCR 线程与主线程可能同时 flush，因此只取快照而不清空，完成后再剔除已结束的写入
+        with self._lock:
+            pending_writes = list(self._pending_writes)
+        try:
+            for future in pending_writes:
+                future.result()
+        finally:
+            with self._lock:
+                self._pending_writes = [future for future in self._pending_writes if not future.done()]
+
+    def close(self) -> None:
+        with self._lock:
+            writer = self._writer
+            self._writer = None
+            self._pending_writes = []
+        if writer is not None:
+            writer.shutdown(wait=True)
+
+    def _write(self, image_hash: str, data: bytes) -> None:
+        target_path = self._asset_path / f"{image_hash}.png"
         try:
-            cropped_image.save(temp_path, format="PNG")
-            image_hash = self._calculate_file_hash(temp_path)
-            target_path = self._asset_path / f"{image_hash}.png"
             if target_path.exists():
-                temp_path.unlink()
-                return image_hash
-            temp_path.rename(target_path)
-            return image_hash
-
-        except Exception as e:
-            if temp_path.exists():
-                temp_path.unlink()
-            raise e
-
-    def _calculate_file_hash(self, file_path: Path) -> str:
-        sha256 = hashlib.sha256()
-        with open(file_path, "rb") as f:
-            for chunk in iter(lambda: f.read(8192), b""):
-                sha256.update(chunk)
-        return sha256.hexdigest()
+                return
+            self._asset_path.mkdir(parents=True, exist_ok=True)
+            temp_path = self._asset_path / f"{uuid.uuid4().hex}.png.temp"
+            try:
+                temp_path.write_bytes(data)
+                temp_path.replace(target_path)
+            except Exception as e:
+                if temp_path.exists():
+                    temp_path.unlink()
+                raise e
+
+        except Exception:
+            with self._lock:
+                self._known_hashes.discard(image_hash)
+            raise
@@ -12,30 +12,44 @@ class XMLReader(Generic[T]):
     def __init__(
         self, prefix: str, dir_path: Path, decode: Callable[[Element], T]
     ) -> None:
-        dir_path = Path(dir_path)
-        file_pattern = f"{prefix}_*.xml"
-        regex = re.compile(rf"^{re.escape(prefix)}_(\d+)\.xml$")
-        indexed_files: list[tuple[int, Path]] = []
-
-        for p in dir_path.glob(file_pattern):
-            m = regex.match(p.name)
-            if not m:
-                continue
-            idx = int(m.group(1))
-            indexed_files.append((idx, p))
-
-        indexed_files.sort(key=lambda t: t[0])
-        self._indexed_files: list[tuple[int, Path]] = indexed_files
+        self._prefix: str = prefix
+        self._dir_path: Path = Path(dir_path)
+        self._indexed_files: dict[int, Path] | None = None
         self._decode: Callable[[Element], T] = decode
 
     def read(
         self, page_indexes: Container[int] | None = None
     ) -> Generator[T, None, None]:
-        for page_index, xml_path in self._indexed_files:
+        for page_index in self._indexes():
             if page_indexes is not None and page_index not in page_indexes:
                 continue
-            root = read_xml(xml_path)
-            try:
-                yield self._decode(root)
-            except Exception as e:
-                raise ValueError(f"Failed to decode from: {xml_path}") from e
+            yield self._load(page_index)
+
+    def _indexes(self) -> list[int]:
+        return list(self._get_indexed_files().keys())
+
+    def _load(self, index: int) -> T:
+        xml_path = self._get_indexed_files()[index]
+        root = read_xml(xml_path)
+        try:
+            return self._decode(root)
+        except Exception as e:
+            raise ValueError(f"Failed to decode from: {xml_path}") from e
+
+    def _get_indexed_files(self) -> dict[int, Path]:
+        # 延迟到首次读取时才扫描目录，子类可以改用其他索引而完全跳过 glob
+        if self._indexed_files is None:
+            file_pattern = f"{self._prefix}_*.xml"
+            regex = re.compile(rf"^{re.escape(self._prefix)}_(\d+)\.xml$")
+            indexed_files: list[tuple[int, Path]] = []
+
+            for p in self._dir_path.glob(file_pattern):
+                m = regex.match(p.name)
+                if not m:
+                    continue
+                idx = int(m.group(1))
+                indexed_files.append((idx, p))
+
+            indexed_files.sort(key=lambda t: t[0])
+            self._indexed_files = dict(indexed_files)
+        return self._indexed_files
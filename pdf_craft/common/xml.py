@@ -25,13 +25,21 @@ def read_xml(file_path: Path) -> Element:
         raise ValueError(f"Failed to parse XML file: {file_path}") from error
 
 
-def save_xml(element: Element, file_path: Path) -> None:
-    # 使用临时文件确保写入的原子性
+_XML_DECLARATION = '<?xml version="1.0" encoding="UTF-8"?>\n'
+
+
+def save_xml(element: Element, file_path: Path, skip_unchanged: bool = False) -> None:
     xml_string = tostring(element, encoding="unicode")
+    if skip_unchanged and file_path.exists():
+        # 内容不变时保留原文件（及其硬链接）
+        if file_path.read_text(encoding="utf-8") == _XML_DECLARATION + xml_string:
+            return
+
+    # 使用临时文件确保写入的原子性
     temp_path = file_path.with_suffix(".xml.tmp")
     try:
         with open(temp_path, "w", encoding="utf-8") as f:
-            f.write('<?xml version="1.0" encoding="UTF-8"?>\n')
+            f.write(_XML_DECLARATION)
             f.write(xml_string)
         temp_path.replace(file_path)
     except Exception as err:
@@ -12,14 +12,21 @@ from epub_generator import BookMeta, LaTeXRender, TableRender
 from .document import DocumentPackage
 from .error import IgnoreOCRErrorsChecker, IgnorePDFErrorsChecker
 from .extractor import PDFExtractor
-from .llm import LLM
+from .llm import LLM, LLMEvent, LLMMetering
 from .metering import AbortedCheck, OCRTokensMetering
 from .ocr_config import OCRConfig
 from .pdf import DeepSeekOCRSize, OCREvent, PDFHandler
-from .pipeline.epub import translate_epub as run_epub_translation
+from .pipeline.epub import (
+    TranslationPlan,
+    collect_epub_translation,
+    plan_epub_translation,
+    translate_epub as run_epub_translation,
+)
 from .pipeline.pdf import PDFTranslationPipeline
 from .renderer import EpubRenderer, MarkdownRenderer
-from .transformer import ChapterPackageTransformer, ChapterTransformer, PackageTransformer, SubmitKind
+from .transformer import (
+    ChapterPackageTransformer, ChapterTransformer, PackageTransformer, SubmitKind, TextBatchTransformer,
+)
 
 
 @dataclass(frozen=True)
@@ -38,6 +45,8 @@ class PDFOptions:
     pdf_handler: PDFHandler | None = None
     models_cache_path: PathLike | str | None = None
     local_only: bool = False
+    ocr_cache_path: PathLike | str | None = None
+    ocr_cache_max_size: int | None = None
 
 
 @dataclass(frozen=True)
@@ -50,6 +59,9 @@ class ExtractionOptions:
     max_page_image_file_size: int | None = None
     max_ocr_tokens: int | None = None
     max_ocr_output_tokens: int | None = None
+    ocr_workers: int = 1
+    prefetch_pages: int = 0
+    packed_pages: bool = False
     includes_cover: bool = False
     includes_footnotes: bool = False
     generate_plot: bool = False
@@ -59,6 +71,7 @@ class ExtractionOptions:
     ignore_ocr_errors: IgnoreOCRErrorsChecker = False
     aborted: AbortedCheck = lambda: False
     on_ocr_event: Callable[[OCREvent], None] = lambda _: None
+    on_llm_event: Callable[[LLMEvent], None] | None = None
 
 
 class PDFCraft:
@@ -95,6 +108,9 @@ class PDFCraft:
             max_page_image_file_size=options.max_page_image_file_size,
             max_tokens=options.max_ocr_tokens,
             max_output_tokens=options.max_ocr_output_tokens,
+            ocr_workers=options.ocr_workers,
+            prefetch_pages=options.prefetch_pages,
+            packed_pages=options.packed_pages,
             includes_cover=options.includes_cover,
             includes_footnotes=options.includes_footnotes,
             generate_plot=options.generate_plot,
@@ -102,6 +118,7 @@ class PDFCraft:
             ignore_pdf_errors=options.ignore_pdf_errors,
             ignore_ocr_errors=options.ignore_ocr_errors,
             aborted=options.aborted, on_ocr_event=options.on_ocr_event,
+            on_llm_event=options.on_llm_event,
         )
 
     def render_markdown(
@@ -138,8 +155,9 @@ class PDFCraft:
 
     def translate_pdf(
         self, source: PathLike | str, package: DocumentPackage,
-        output: PathLike | str, transformer: ChapterTransformer | Callable[[str], str],
+        output: PathLike | str, transformer: ChapterTransformer | TextBatchTransformer | Callable[[str], str],
         *, steps: Sequence[TranslationStep | PackageTransformer] = (),
+        max_workers: int = 1, batch_size: int = 32, patch_workers: int = 1,
     ) -> None:
         for step in steps:
             mode = _step_mode(step, self._as_package_transformer(step))
@@ -147,13 +165,21 @@ class PDFCraft:
                 raise ValueError("PDF output does not support APPEND_BLOCK")
         package = self._apply_steps(package, steps)
         PDFTranslationPipeline(
-            pdf_handler=self._pdf.pdf_handler if self._pdf else None
+            pdf_handler=self._pdf.pdf_handler if self._pdf else None,
+            max_workers=max_workers, batch_size=batch_size, patch_workers=patch_workers,
         ).translate(Path(source), Path(output), package, transformer)
 
     def translate_epub(self, source: PathLike | str, output: PathLike | str, *,
                        target_language: str, submit: SubmitKind,
-                       **options) -> None:
-        run_epub_translation(source, output, target_language, submit, **options)
+                       **options) -> LLMMetering:
+        return run_epub_translation(source, output, target_language, submit, **options)
+
+    def plan_epub_translation(self, source: PathLike | str, *, target_language: str,
+                              submit: SubmitKind, **options) -> TranslationPlan:
+        return plan_epub_translation(source, target_language, submit, **options)
+
+    def collect_epub_translation(self, responses: PathLike | str, **options) -> int:
+        return collect_epub_translation(responses, **options)
 
     def convert_pdf_to_markdown(
         self, source: PathLike | str, output: PathLike | str, *,
@@ -204,7 +230,11 @@ class PDFCraft:
         if isinstance(transformer, ChapterPackageTransformer):
             if step.mode != SubmitKind.REPLACE and transformer.mode != step.mode:
                 return ChapterPackageTransformer(
-                    transformer.chapter_transformer, mode=step.mode
+                    transformer.chapter_transformer, mode=step.mode,
+                    max_workers=transformer.max_workers,
+                    on_progress=transformer.on_progress,
+                    aborted=transformer.aborted,
+                    incremental=transformer.incremental,
                 )
             return transformer
         if _accepts_package(transformer):
@@ -220,7 +250,9 @@ class PDFCraft:
         from .transform import Transform
         return Transform(models_cache_path=self._pdf.models_cache_path,
                          pdf_handler=self._pdf.pdf_handler,
-                         local_only=self._pdf.local_only, ocr=self._pdf.ocr)
+                         local_only=self._pdf.local_only, ocr=self._pdf.ocr,
+                         ocr_cache_path=self._pdf.ocr_cache_path,
+                         ocr_cache_max_size=self._pdf.ocr_cache_max_size)
 
     def _extract_book_meta(self, source: Path) -> BookMeta | None:
         engine = self._pdf_engine()
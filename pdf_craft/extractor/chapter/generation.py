@@ -2,7 +2,7 @@ from pathlib import Path
 from typing import Generator
 
 from ...common import XMLReader, save_xml
-from ...pdf import TITLE_TAGS, Page, decode
+from ...pdf import TITLE_TAGS, Page
 from ..toc import Toc, TocInfo, iter_toc
 from .analyse_level import analyse_chapter_internal_levels
 from .chapter import (
@@ -20,13 +20,13 @@ from .punctuation import normalize_punctuation_in_chapter
 from .reference import References
 
 
-def generate_chapter_files(pages_path: Path, chapters_path: Path, toc: TocInfo):
+def generate_chapter_files(pages: XMLReader[Page], chapters_path: Path, toc: TocInfo):
     chapters_path.mkdir(parents=True, exist_ok=True)
     for chapter_file in chapters_path.glob("chapter_*.xml"):
         chapter_file.unlink()
 
     for chapter in _generate_chapters(
-        pages_path=pages_path,
+        pages=pages,
         toc=toc,
     ):
         tail: str
@@ -43,7 +43,7 @@ def generate_chapter_files(pages_path: Path, chapters_path: Path, toc: TocInfo):
 
 
 def _generate_chapters(
-    pages_path: Path, toc: TocInfo
+    pages: XMLReader[Page], toc: TocInfo
 ) -> Generator[Chapter, None, None]:
     chapter: Chapter | None = None
     ref2toc: dict[tuple[int, int], Toc] = {}
@@ -51,7 +51,7 @@ def _generate_chapters(
     for item in iter_toc(toc.content):
         ref2toc[(item.page_index, item.order)] = item
 
-    for layout in _extract_body_layouts(pages_path, toc):
+    for layout in _extract_body_layouts(pages, toc):
         matched_toc = False
         if (
             isinstance(layout, ParagraphLayout)
@@ -87,12 +87,8 @@ def _generate_chapters(
         yield chapter
 
 
-def _extract_body_layouts(pages_path: Path, toc: TocInfo):
-    pages: XMLReader[Page] = XMLReader(
-        prefix="page",
-        dir_path=pages_path,
-        decode=decode,
-    )
+def _extract_body_layouts(pages: XMLReader[Page], toc: TocInfo):
+    # 正文与脚注两个 Jointer 交错读取同一批页面，传入 PageStore 可使每页只解码一次
     toc_page_indexes = set(toc.page_indexes)
     body_jointer = Jointer(
         (
@@ -240,9 +240,11 @@ class Jointer:
                 if pending:
                     yield pending
 
+                text = layout.text
                 if layout.ref in TITLE_TAGS:
                     # 将 Markdown 标题前的 `##` 之类的符号删除，DeepSeek OCR 总会生成这种符号
-                    layout.text = _MARKDOWN_HEAD_PATTERN.sub("", layout.text)
+                    # 不改写 layout 本身：页面可能来自多个读者共享的 PageStore
+                    text = _MARKDOWN_HEAD_PATTERN.sub("", text)
 
                 paragraph = ParagraphLayout(
                     ref=layout.ref,
@@ -252,7 +254,7 @@ class Jointer:
                             page_index=page_index,
                             order=layout.order,
                             det=layout.det,
-                            content=_parse_block_content(layout.text),
+                            content=_parse_block_content(text),
                         )
                     ],
                 )
@@ -22,7 +22,9 @@ class PDFExtractor:
             "toc_llm": None, "toc_assumed": False,
             "aborted": lambda: False, "max_tokens": None,
             "max_output_tokens": None, "on_ocr_event": lambda _: None,
-            "page_indexes": None,
+            "on_llm_event": None,
+            "page_indexes": None, "ocr_workers": 1, "prefetch_pages": 0,
+            "packed_pages": False,
         }
         defaults.update(kwargs)
         defaults["analysing_path"] = package_path
@@ -1,11 +1,11 @@
 import logging
 import re
 from pathlib import Path
+from typing import Callable
 
 from ...common import XMLReader, read_xml, save_xml
-from ...llm import LLM
+from ...llm import LLM, LLMEvent
 from ...pdf import TITLE_TAGS, Page
-from ...pdf import decode as decode_pdf
 from .llm_analyser import (
     LLMAnalysisError,
     analyse_title_levels_by_llm,
@@ -23,31 +23,28 @@ _TITLE_HEAD_REGX = re.compile(r"^\s*#{1,6}\s*")
 
 
 def analyse_toc(
-    pages_path: Path,
+    pages: XMLReader[Page],
     toc_path: Path,
     toc_assumed: bool,
     toc_llm: LLM | None = None,
+    on_llm_event: Callable[[LLMEvent], None] | None = None,
 ) -> TocInfo:
     if toc_path.exists():
         return decode_toc(read_xml(toc_path))
 
     toc_path.parent.mkdir(parents=True, exist_ok=True)
-    toc_info = _do_analyse_toc(pages_path, toc_llm, toc_assumed)
+    toc_info = _do_analyse_toc(pages, toc_llm, toc_assumed, on_llm_event)
     save_xml(encode_toc(toc_info), toc_path)
 
     return toc_info
 
 
 def _do_analyse_toc(
-    pages_path: Path,
+    pages: XMLReader[Page],
     toc_llm: LLM | None,
     toc_assumed: bool,
+    on_llm_event: Callable[[LLMEvent], None] | None = None,
 ) -> TocInfo:
-    pages: XMLReader[Page] = XMLReader(
-        prefix="page",
-        dir_path=pages_path,
-        decode=decode_pdf,
-    )
     toc_pages: list[PageRef] = []
     if toc_assumed:
         toc_pages = find_toc_pages(
@@ -81,6 +78,7 @@ def _do_analyse_toc(
                             },
                         )
                     ),
+                    on_llm_event=on_llm_event,
                 )
             except LLMAnalysisError as error:
                 print(
@@ -90,7 +88,6 @@ def _do_analyse_toc(
         if ref2level is None:
             ref2level = analyse_toc_levels(
                 pages=pages,
-                pages_path=pages_path,
                 toc_pages=toc_pages,
             )
         toc_page_indexes.extend(ref.page_index for ref in toc_pages)
@@ -99,7 +96,7 @@ def _do_analyse_toc(
     else:
         if toc_llm is not None:
             try:
-                ref2level = analyse_title_levels_by_llm(toc_llm, pages)
+                ref2level = analyse_title_levels_by_llm(toc_llm, pages, on_llm_event)
             except LLMAnalysisError as error:
                 print(
                     f"LLM analysis title failed, falling back to statistical method: {error}"
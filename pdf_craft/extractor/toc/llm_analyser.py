@@ -1,5 +1,6 @@
 import json
 import re
+from contextlib import ExitStack
 from dataclasses import dataclass
 from typing import Any, Callable, Generator, Generic, Iterable, TypeVar, cast
 
@@ -8,8 +9,10 @@ from pydantic import BaseModel, StrictInt, ValidationError, field_validator, mod
 
 from ...common import XMLReader, split_by_cv
 from .config import MAX_LEVELS, MAX_TITLE_CV
-from ...llm import LLM, Message, MessageRole, runtime_for
-from ...llm.guaranteed import GuaranteedOptions, request_guaranteed_json
+from ...llm import LLM, LLMEvent, LLMRuntime, Message, MessageRole, runtime_for
+from ...llm.event_loop import run_async
+from ...llm.guaranteed import (arequest_guaranteed_json, AsyncGuaranteedOptions, GuaranteedOptions,
+                               request_guaranteed_json)
 from ...pdf import TITLE_TAGS, Page
 from .toc_levels import Ref2Level
 from .toc_pages import PageRef
@@ -24,7 +27,11 @@ class LLMAnalysisError(Exception):
         super().__init__(message)
 
 
-def analyse_title_levels_by_llm(llm: LLM, pages: XMLReader[Page]) -> Ref2Level:
+def analyse_title_levels_by_llm(
+    llm: LLM,
+    pages: XMLReader[Page],
+    on_llm_event: Callable[[LLMEvent], None] | None = None,
+) -> Ref2Level:
     titles: list[_Title] = []
     for page in pages.read():
         for layout in page.body_layouts:
@@ -55,6 +62,7 @@ def analyse_title_levels_by_llm(llm: LLM, pages: XMLReader[Page]) -> Ref2Level:
     analyser = _LLMAnalyser(
         llm=llm,
         validate=_validate_title_response,
+        on_llm_event=on_llm_event,
     )
     levels = analyser.request(
         payload=len(titles),
@@ -86,6 +94,7 @@ def analyse_toc_levels_by_llm(
     llm: LLM,
     toc_page_refs: list[PageRef],
     toc_page_contents: list[Page],
+    on_llm_event: Callable[[LLMEvent], None] | None = None,
 ) -> Ref2Level:
     toc_entries = list(_extract_toc_entries(toc_page_contents))
     if not toc_entries:
@@ -104,6 +113,7 @@ def analyse_toc_levels_by_llm(
     analyser = _LLMAnalyser(
         llm=llm,
         validate=_validate_toc_response,
+        on_llm_event=on_llm_event,
     )
     levels = analyser.request(
         payload=len(matched_title2references),
@@ -562,23 +572,14 @@ class _LLMAnalyser(Generic[_P, _R]):
         self,
         llm: LLM,
         validate: Callable[[str, _P], tuple[_R | None, str | None]],
+        on_llm_event: Callable[[LLMEvent], None] | None = None,
     ) -> None:
         self._llm = llm
         self._validate: Callable[[str, _P], tuple[_R | None, str | None]] = validate
+        self._on_llm_event: Callable[[LLMEvent], None] | None = on_llm_event
         self._runtime = runtime_for(llm, protocol_version="toc-json-v1") if isinstance(llm, LLM) else None
 
     def request(self, payload: _P, messages: Iterable[Message]) -> _R:
-        class _ResponseSchema(BaseModel):
-            """Transport schema; TOC validator owns RESULT and ID semantics."""
-            payload: dict[str, Any]
-
-            @model_validator(mode="before")
-            @classmethod
-            def wrap_object(cls, value: Any) -> dict[str, Any]:
-                if not isinstance(value, dict):
-                    raise ValueError("TOC response must be a JSON object")
-                return {"payload": value}
-
         def parse(data, _index, _maximum):
             result, error_msg = self._validate(json.dumps(data.payload, ensure_ascii=False), payload)
             if result is None:
@@ -588,22 +589,51 @@ class _LLMAnalyser(Generic[_P, _R]):
         # The business validators already extract RESULT and enforce their own
         # schema. The guaranteed layer supplies typed retries and bounded history.
         try:
-            return request_guaranteed_json(GuaranteedOptions(
-                messages=list(messages),
-                request=lambda current, index, maximum: (
-                    self._runtime.request(current, retry_index=index, retry_max=maximum, use_cache=False)
-                    if self._runtime is not None
-                    else cast(Any, self._llm).request(input=current)
-                ),
+            if self._runtime is None:
+                return request_guaranteed_json(GuaranteedOptions(
+                    messages=list(messages),
+                    request=lambda current, _index, _maximum: cast(Any, self._llm).request(input=current),
+                    schema=_ResponseSchema,
+                    parse=parse,
+                    max_retries=_MAX_RETRIES - 1,
+                    extractor=_extract_result_json,
+                ))
+            return run_async(self._arequest(self._runtime, list(messages), parse))
+        except Exception as error:
+            if isinstance(error, LLMAnalysisError):
+                raise
+            raise LLMAnalysisError(f"LLM request failed at attempt 1: {error}") from error
+
+    async def _arequest(
+        self,
+        runtime: LLMRuntime,
+        messages: list[Message],
+        parse: Callable[[Any, int, int], _R],
+    ) -> _R:
+        with ExitStack() as stack:
+            if self._on_llm_event is not None:
+                stack.enter_context(runtime.observe(self._on_llm_event))
+            return await arequest_guaranteed_json(AsyncGuaranteedOptions(
+                messages=messages,
+                request=lambda current, index, maximum: runtime.arequest(
+                    current, retry_index=index, retry_max=maximum, use_cache=False),
                 schema=_ResponseSchema,
                 parse=parse,
                 max_retries=_MAX_RETRIES - 1,
                 extractor=_extract_result_json,
             ))
-        except Exception as error:
-            if isinstance(error, LLMAnalysisError):
-                raise
-            raise LLMAnalysisError(f"LLM request failed at attempt 1: {error}") from error
+
+
+class _ResponseSchema(BaseModel):
+    """Transport schema; TOC validator owns RESULT and ID semantics."""
+    payload: dict[str, Any]
+
+    @model_validator(mode="before")
+    @classmethod
+    def wrap_object(cls, value: Any) -> dict[str, Any]:
+        if not isinstance(value, dict):
+            raise ValueError("TOC response must be a JSON object")
+        return {"payload": value}
 
 
 def _extract_result_json(response: str) -> str:
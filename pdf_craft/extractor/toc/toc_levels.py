@@ -1,10 +1,8 @@
 from dataclasses import dataclass
-from pathlib import Path
 
-from ...common import XMLReader, avg, read_xml, split_by_cv
+from ...common import XMLReader, avg, split_by_cv
 from .config import MAX_LEVELS, MAX_TITLE_CV
 from ...pdf import TITLE_TAGS, Page, PageLayout
-from ...pdf import decode as decode_as_page
 from .text import normalize_text
 from .toc_pages import PageRef
 
@@ -18,10 +16,10 @@ def analyse_title_levels(pages: XMLReader[Page]) -> Ref2Level:
 
 
 def analyse_toc_levels(
-    pages: XMLReader[Page], pages_path: Path, toc_pages: list[PageRef]
+    pages: XMLReader[Page], toc_pages: list[PageRef]
 ) -> Ref2Level:
     ref2meta, toc_page_indexes = _extract_ref2meta(
-        pages_path=pages_path,
+        pages=pages,
         toc_pages=toc_pages,
     )
     ref2global_level = _extract_content_title_levels(
@@ -62,16 +60,21 @@ _Ref2Meta = dict[tuple[int, int], _TitleMeta]
 
 
 def _extract_ref2meta(
-    pages_path: Path, toc_pages: list[PageRef]
+    pages: XMLReader[Page], toc_pages: list[PageRef]
 ) -> tuple[_Ref2Meta, set[int]]:
     ref2meta: _Ref2Meta = {}  # key: (page_index, order)
-    toc_page_indexes: set[int] = set()
+    toc_page_indexes: set[int] = set(ref.page_index for ref in toc_pages)
+    toc_page_contents: dict[int, Page] = {
+        page.index: page for page in pages.read(page_indexes=toc_page_indexes)
+    }
 
     for ref in toc_pages:
-        toc_page_indexes.add(ref.page_index)
+        page = toc_page_contents.get(ref.page_index)
+        if page is None:
+            raise ValueError(f"Missing OCR page {ref.page_index} for TOC analysis")
         grouped_hooks = _analyse_toc_page_hooks(
             ref=ref,
-            page_path=Path(pages_path / f"page_{ref.page_index}.xml"),
+            page=page,
         )
         for level, hooks in enumerate(grouped_hooks):
             for hook in sorted(hooks, key=lambda x: x.layout.order):
@@ -85,8 +88,7 @@ def _extract_ref2meta(
     return ref2meta, toc_page_indexes
 
 
-def _analyse_toc_page_hooks(ref: PageRef, page_path: Path) -> list[list[_Hook]]:
-    page = decode_as_page(read_xml(page_path))
+def _analyse_toc_page_hooks(ref: PageRef, page: Page) -> list[list[_Hook]]:
     hooks_items: list[tuple[float, _Hook]] = []
 
     for layout in page.body_layouts:
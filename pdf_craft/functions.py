@@ -5,7 +5,7 @@ from typing import Callable, Literal
 from epub_generator import BookMeta, LaTeXRender, TableRender
 
 from .error import IgnoreOCRErrorsChecker, IgnorePDFErrorsChecker
-from .llm import LLM
+from .llm import LLM, LLMEvent
 from .metering import AbortedCheck, OCRTokensMetering
 from .ocr_config import OCRConfig, ensure_ocr_config
 from .pdf import OCR, DeepSeekOCRSize, OCREvent, PDFHandler
@@ -49,6 +49,7 @@ def transform_markdown(
     max_ocr_tokens: int | None = None,
     max_ocr_output_tokens: int | None = None,
     on_ocr_event: Callable[[OCREvent], None] = lambda _: None,
+    on_llm_event: Callable[[LLMEvent], None] | None = None,
     ocr: OCRConfig | None = None,
     steps: Sequence[TranslationStep | PackageTransformer] = (),
 ) -> OCRTokensMetering:
@@ -76,6 +77,7 @@ def transform_markdown(
         max_ocr_tokens=max_ocr_tokens,
         max_ocr_output_tokens=max_ocr_output_tokens,
         on_ocr_event=on_ocr_event,
+        on_llm_event=on_llm_event,
         steps=steps,
     )
 
@@ -106,6 +108,7 @@ def transform_epub(
     max_ocr_tokens: int | None = None,
     max_ocr_output_tokens: int | None = None,
     on_ocr_event: Callable[[OCREvent], None] = lambda _: None,
+    on_llm_event: Callable[[LLMEvent], None] | None = None,
     ocr: OCRConfig | None = None,
     steps: Sequence[TranslationStep | PackageTransformer] = (),
 ) -> OCRTokensMetering:
@@ -137,5 +140,6 @@ def transform_epub(
         max_ocr_tokens=max_ocr_tokens,
         max_ocr_output_tokens=max_ocr_output_tokens,
         on_ocr_event=on_ocr_event,
+        on_llm_event=on_llm_event,
         steps=steps,
     )
@@ -1,10 +1,20 @@
+from .cache import (DirectoryLLMCache as DirectoryLLMCache, LLMCache as LLMCache,
+                    SQLiteLLMCache as SQLiteLLMCache)
 from .core import LLM as LLM
-from .runtime import LLMContext as LLMContext, LLMRuntime as LLMRuntime, runtime_for as runtime_for
+from .batch import (batch_request_record as batch_request_record, batch_response_record as batch_response_record,
+                    read_batch_responses as read_batch_responses)
+from .limiter import ConcurrencyLimiter as ConcurrencyLimiter
+from .metering import LLMEvent as LLMEvent, LLMEventKind as LLMEventKind, LLMMetering as LLMMetering
+from .runtime import (aclose_async_clients as aclose_async_clients, LLMContext as LLMContext,
+                      LLMRuntime as LLMRuntime, PreparedRequest as PreparedRequest, runtime_for as runtime_for)
 from .types import Message as Message, MessageRole as MessageRole
-from .loop import (ProtocolFailure as ProtocolFailure, ProtocolPartial as ProtocolPartial,
+from .loop import (AsyncRepairLoopOptions as AsyncRepairLoopOptions, arun_repair_loop as arun_repair_loop,
+                   ProtocolFailure as ProtocolFailure, ProtocolPartial as ProtocolPartial,
                    ProtocolRetry as ProtocolRetry, ProtocolSuccess as ProtocolSuccess,
                    RepairLoopOptions as RepairLoopOptions, run_repair_loop as run_repair_loop)
 
-__all__ = ["LLM", "LLMContext", "LLMRuntime", "Message", "MessageRole", "runtime_for",
-           "ProtocolFailure", "ProtocolPartial", "ProtocolRetry", "ProtocolSuccess",
-           "RepairLoopOptions", "run_repair_loop"]
+__all__ = ["aclose_async_clients", "arun_repair_loop", "AsyncRepairLoopOptions", "batch_request_record", "batch_response_record",
+           "ConcurrencyLimiter", "DirectoryLLMCache", "LLM", "LLMCache", "LLMContext", "LLMEvent", "LLMEventKind",
+           "LLMMetering", "LLMRuntime", "Message", "MessageRole", "PreparedRequest", "read_batch_responses",
+           "runtime_for", "SQLiteLLMCache", "ProtocolFailure", "ProtocolPartial", "ProtocolRetry",
+           "ProtocolSuccess", "RepairLoopOptions", "run_repair_loop"]
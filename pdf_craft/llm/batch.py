@@ -0,0 +1,65 @@
+import json
+from collections.abc import Generator, Iterable
+from pathlib import Path
+from typing import Any
+
+from .runtime import PreparedRequest
+
+BATCH_ENDPOINT = "/v1/chat/completions"
+
+
+def batch_request_record(model: str, request: PreparedRequest, custom_id: str | None = None) -> dict[str, Any]:
+    """One line of an OpenAI-compatible batch input file.
+
+    ``custom_id`` defaults to the cache key, so a response can be stored back
+    into the cache and picked up by the next ordinary run.
+    """
+    body: dict[str, Any] = {
+        "model": model,
+        "messages": [
+            {"role": message.role.name.lower(), "content": message.message}
+            for message in request.messages
+        ],
+    }
+    if request.temperature is not None:
+        body["temperature"] = request.temperature
+    if request.top_p is not None:
+        body["top_p"] = request.top_p
+    if request.max_tokens is not None:
+        body["max_tokens"] = request.max_tokens
+    return {
+        "custom_id": custom_id or request.cache_key,
+        "method": "POST",
+        "url": BATCH_ENDPOINT,
+        "body": body,
+    }
+
+
+def batch_response_record(custom_id: str, content: str) -> dict[str, Any]:
+    """One successful line of an OpenAI-compatible batch output file."""
+    return {
+        "custom_id": custom_id,
+        "response": {
+            "status_code": 200,
+            "body": {"choices": [{"index": 0, "message": {"role": "assistant", "content": content}}]},
+        },
+        "error": None,
+    }
+
+
+def read_batch_responses(path: Path) -> dict[str, str]:
+    """Map ``custom_id`` to the response text of every successful, non-empty line of a batch output file."""
+    with open(path, "r", encoding="utf-8") as file:
+        return dict(_successful_responses(json.loads(line) for line in file if line.strip()))
+
+
+def _successful_responses(records: Iterable[dict[str, Any]]) -> Generator[tuple[str, str], None, None]:
+    for record in records:
+        # 失败或为空的条目不写入缓存，下次运行时会重新交互式请求
+        response = record.get("response") or {}
+        if record.get("error") or response.get("status_code") != 200:
+            continue
+        choices = (response.get("body") or {}).get("choices") or []
+        content = choices[0].get("message", {}).get("content") if choices else None
+        if isinstance(content, str) and content.strip():
+            yield record["custom_id"], content
@@ -0,0 +1,187 @@
+import sqlite3
+import threading
+import time
+import uuid
+from os import PathLike
+from pathlib import Path
+from typing import Mapping, Protocol
+
+
+_ACCESS_FLUSH_THRESHOLD = 1000
+
+
+class LLMCache(Protocol):
+    """Response cache used by :class:`LLMRuntime`.
+
+    ``put_many`` receives every response of one successful ``LLMContext`` and
+    must store all of them or none.
+    """
+
+    def get(self, key: str) -> str | None: ...
+
+    def put_many(self, entries: Mapping[str, str]) -> None: ...
+
+
+class DirectoryLLMCache:
+    """One ``{key}.txt`` file per response, the historical cache layout."""
+
+    def __init__(self, path: PathLike | str) -> None:
+        self._path = Path(path)
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> str | None:
+        try:
+            return (self._path / f"{key}.txt").read_text(encoding="utf-8")
+        except FileNotFoundError:
+            return None
+
+    def put_many(self, entries: Mapping[str, str]) -> None:
+        temporaries: list[tuple[Path, Path]] = []
+        try:
+            for key, response in entries.items():
+                temporary = self._path / f"{key}.{uuid.uuid4().hex[:12]}.txt"
+                temporary.write_text(response, encoding="utf-8")
+                temporaries.append((temporary, self._path / f"{key}.txt"))
+            with self._lock:
+                for temporary, permanent in temporaries:
+                    if permanent.exists():
+                        temporary.unlink(missing_ok=True)
+                    else:
+                        temporary.rename(permanent)
+        finally:
+            for temporary, _ in temporaries:
+                temporary.unlink(missing_ok=True)
+
+
+class SQLiteLLMCache:
+    """All responses in one SQLite file, with optional LRU size and age limits.
+
+    Each ``put_many`` is a single transaction. The database runs in WAL mode so
+    readers in other threads or processes never block on a writer, and reads
+    never write: access times are buffered and stored with the next
+    ``put_many``, in batches, or on ``close()``. Entries older than
+    ``max_age_seconds`` are dropped, and when the stored responses exceed
+    ``max_size`` bytes the least recently read ones are evicted.
+    """
+
+    def __init__(
+        self,
+        path: PathLike | str,
+        max_size: int | None = None,
+        max_age_seconds: float | None = None,
+    ) -> None:
+        if max_size is not None and max_size <= 0:
+            raise ValueError("max_size must be positive.")
+        if max_age_seconds is not None and max_age_seconds <= 0:
+            raise ValueError("max_age_seconds must be positive.")
+        self._path = Path(path)
+        self._max_size: int | None = max_size
+        self._max_age_seconds: float | None = max_age_seconds
+        self._local = threading.local()
+        self._connections: list[sqlite3.Connection] = []
+        self._accessed: dict[str, float] = {}
+        self._lock = threading.Lock()
+        self._path.parent.mkdir(parents=True, exist_ok=True)
+        with self._connection() as connection:
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                "key TEXT PRIMARY KEY, response TEXT NOT NULL, size INTEGER NOT NULL, "
+                "created_at REAL NOT NULL, accessed_at REAL NOT NULL)"
+            )
+            connection.execute(
+                "CREATE INDEX IF NOT EXISTS responses_accessed_at ON responses (accessed_at)"
+            )
+
+    def get(self, key: str) -> str | None:
+        now = time.time()
+        connection = self._connection()
+        row = connection.execute(
+            "SELECT response, created_at FROM responses WHERE key = ?", (key,)
+        ).fetchone()
+        if row is None:
+            return None
+        response, created_at = row
+        if self._max_age_seconds is not None and now - created_at > self._max_age_seconds:
+            return None
+        with self._lock:
+            self._accessed[key] = now
+            flush = len(self._accessed) >= _ACCESS_FLUSH_THRESHOLD
+        if flush:
+            with connection:
+                self._store_accessed(connection)
+        return response
+
+    def put_many(self, entries: Mapping[str, str]) -> None:
+        if not entries:
+            return
+        now = time.time()
+        connection = self._connection()
+        with connection:
+            connection.executemany(
+                "INSERT OR IGNORE INTO responses (key, response, size, created_at, accessed_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                [
+                    (key, response, len(response.encode("utf-8")), now, now)
+                    for key, response in entries.items()
+                ],
+            )
+            self._store_accessed(connection)
+            self._evict(connection, now)
+
+    def close(self) -> None:
+        """Store buffered access times and close the connections of all threads."""
+        with self._lock:
+            connections = self._connections
+            self._connections = []
+        if connections:
+            with connections[0]:
+                self._store_accessed(connections[0])
+        for connection in connections:
+            connection.close()
+
+    def _store_accessed(self, connection: sqlite3.Connection) -> None:
+        with self._lock:
+            accessed = self._accessed
+            self._accessed = {}
+        if accessed:
+            connection.executemany(
+                "UPDATE responses SET accessed_at = MAX(accessed_at, ?) WHERE key = ?",
+                [(accessed_at, key) for key, accessed_at in accessed.items()],
+            )
+
+    def _evict(self, connection: sqlite3.Connection, now: float) -> None:
+        if self._max_age_seconds is not None:
+            connection.execute(
+                "DELETE FROM responses WHERE created_at < ?", (now - self._max_age_seconds,)
+            )
+        if self._max_size is None:
+            return
+        (total_size,) = connection.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM responses"
+        ).fetchone()
+        if total_size <= self._max_size:
+            return
+        evicted_keys: list[str] = []
+        for key, size in connection.execute(
+            "SELECT key, size FROM responses ORDER BY accessed_at"
+        ).fetchall():
+            if total_size <= self._max_size:
+                break
+            evicted_keys.append(key)
+            total_size -= size
+        connection.executemany(
+            "DELETE FROM responses WHERE key = ?", [(key,) for key in evicted_keys]
+        )
+
+    def _connection(self) -> sqlite3.Connection:
+        # sqlite3 连接不能跨线程共享，每个线程各自持有一个
+        # close() 会在其他线程中关闭这些连接，因此关闭跨线程检查并统一登记
+        connection: sqlite3.Connection | None = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(self._path, timeout=30, check_same_thread=False)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            self._local.connection = connection
+            with self._lock:
+                self._connections.append(connection)
+        return connection
@@ -4,6 +4,9 @@ from pathlib import Path
 from jinja2 import Template
 from tiktoken import Encoding, get_encoding
 
+from .cache import LLMCache
+from .limiter import ConcurrencyLimiter
+
 
 class LLM:
     """Declarative LLM configuration; execution is provided by ``LLMRuntime``."""
@@ -14,12 +17,22 @@ class LLM:
                  temperature: float | tuple[float, float] | None = None,
                  retry_times: int = 5, retry_interval_seconds: float = 6.0,
                  cache_path: PathLike | str | None = None,
-                 log_dir_path: PathLike | str | None = None) -> None:
+                 log_dir_path: PathLike | str | None = None,
+                 cache: LLMCache | None = None,
+                 max_concurrency: int | None = None,
+                 limiter: ConcurrencyLimiter | None = None,
+                 stream_usage: bool = True) -> None:
         self.key, self.url, self.model, self.token_encoding = key, url, model, token_encoding
         self.timeout, self.top_p, self.temperature = timeout, top_p, temperature
         self.retry_times, self.retry_interval_seconds = retry_times, retry_interval_seconds
         self.cache_path = _directory(cache_path)
         self.log_dir_path = _directory(log_dir_path)
+        self.cache = cache  # 未指定时使用 cache_path 下每个响应一个文件的缓存
+        # 未指定 limiter 时，url、key、model 相同的 runtime 共享一个自适应并发上限；
+        # max_concurrency 为 None 时沿用已有上限（新建时为 DEFAULT_MAX_CONCURRENCY）
+        self.max_concurrency, self.limiter = max_concurrency, limiter
+        # 是否请求服务端在流末尾报告 usage；不支持 stream_options 的服务端应设为 False，改为本地计数
+        self.stream_usage = stream_usage
         self._encoding = get_encoding(token_encoding)
         self._templates: dict[str, Template] = {}
 
@@ -0,0 +1,92 @@
+import asyncio
+import atexit
+import threading
+from collections.abc import Coroutine
+from concurrent.futures import Future
+from typing import Any, Self, TypeVar
+
+from .runtime import aclose_async_clients
+
+T = TypeVar("T")
+
+_SHARED_LOCK = threading.Lock()
+_SHARED_LOOPS: "list[EventLoopThread]" = []
+
+
+class EventLoopThread:
+    """An asyncio event loop running on a daemon thread.
+
+    Lets sync entry points drive many async requests without a thread per
+    request. On exit, tasks still running are cancelled and the connection
+    pool of the loop is closed before the loop itself.
+    """
+
+    def __init__(self) -> None:
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, name="pdf-craft-event-loop", daemon=True)
+        self._thread.start()
+
+    @property
+    def loop(self) -> asyncio.AbstractEventLoop:
+        return self._loop
+
+    def submit(self, coroutine: Coroutine[Any, Any, T]) -> "Future[T]":
+        return asyncio.run_coroutine_threadsafe(coroutine, self._loop)
+
+    def run(self, coroutine: Coroutine[Any, Any, T]) -> T:
+        return self.submit(coroutine).result()
+
+    def close(self) -> None:
+        if self._loop.is_closed():
+            return
+        try:
+            self.run(_shutdown())
+        finally:
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._thread.join()
+            self._loop.close()
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.close()
+
+
+async def _shutdown() -> None:
+    current = asyncio.current_task()
+    tasks = [task for task in asyncio.all_tasks() if task is not current]
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+    await aclose_async_clients()
+    await asyncio.get_running_loop().shutdown_asyncgens()
+
+
+def shared_event_loop() -> EventLoopThread:
+    """Return the process-wide loop that sync entry points run async requests on.
+
+    Reusing one loop across calls, chapters and runtimes keeps a single
+    connection pool warm. The loop is started on first use and closed at
+    interpreter exit.
+    """
+    with _SHARED_LOCK:
+        if not _SHARED_LOOPS or _SHARED_LOOPS[0].loop.is_closed():
+            _SHARED_LOOPS[:] = [EventLoopThread()]
+        return _SHARED_LOOPS[0]
+
+
+def run_async(coroutine: Coroutine[Any, Any, T]) -> T:
+    """Run ``coroutine`` to completion on :func:`shared_event_loop`.
+
+    Unlike ``asyncio.run`` it also works when the caller's thread already runs a loop.
+    """
+    return shared_event_loop().run(coroutine)
+
+
+@atexit.register
+def _close_shared_loops() -> None:
+    with _SHARED_LOCK:
+        loops, _SHARED_LOOPS[:] = list(_SHARED_LOOPS), []
+    for event_loop in loops:
+        event_loop.close()
@@ -3,7 +3,7 @@ from __future__ import annotations
 
 import json
 import re
-from collections.abc import Callable, Sequence
+from collections.abc import Awaitable, Callable, Sequence
 from dataclasses import dataclass
 from typing import Generic, TypeVar, cast
 
@@ -11,8 +11,8 @@ from json_repair import repair_json
 from pydantic import BaseModel, ValidationError
 
 from .types import Message, MessageRole
-from .loop import (ProtocolFailure, ProtocolRetry, ProtocolSuccess, RepairLoopOptions,
-                   run_repair_loop)
+from .loop import (arun_repair_loop, AsyncRepairLoopOptions, ProtocolFailure, ProtocolRetry, ProtocolSuccess,
+                   RepairLoopOptions, ResponseProtocol, run_repair_loop)
 
 TData = TypeVar("TData")
 TResult = TypeVar("TResult")
@@ -54,7 +54,29 @@ class GuaranteedOptions(Generic[TData, TResult]):
     extractor: Callable[[str], str] | None = None
 
 
+@dataclass(frozen=True)
+class AsyncGuaranteedOptions(Generic[TData, TResult]):
+    messages: Sequence[Message]
+    request: Callable[[list[Message], int, int], Awaitable[str]]
+    schema: type[BaseModel]
+    parse: Callable[[TData, int, int], TResult]
+    max_retries: int = 12
+    extractor: Callable[[str], str] | None = None
+
+
 def request_guaranteed_json(options: GuaranteedOptions[TData, TResult]) -> TResult:
+    return run_repair_loop(RepairLoopOptions(messages=options.messages, request=options.request,
+        protocol=_json_protocol(options), state=None, max_attempts=options.max_retries + 1))
+
+
+async def arequest_guaranteed_json(options: AsyncGuaranteedOptions[TData, TResult]) -> TResult:
+    return await arun_repair_loop(AsyncRepairLoopOptions(messages=options.messages, request=options.request,
+        protocol=_json_protocol(options), state=None, max_attempts=options.max_retries + 1))
+
+
+def _json_protocol(
+    options: GuaranteedOptions[TData, TResult] | AsyncGuaranteedOptions[TData, TResult],
+) -> ResponseProtocol[TResult, None]:
     class _JsonProtocol:
         def __init__(self) -> None:
             self.last_error: GuaranteedRequestError | None = None
@@ -87,8 +109,7 @@ def request_guaranteed_json(options: GuaranteedOptions[TData, TResult]) -> TResu
                 raise self.last_error
             raise GuaranteedEmptyResponseError("LLM returned empty response after all retries", attempts=attempts, response=response)
 
-    return run_repair_loop(RepairLoopOptions(messages=options.messages, request=options.request,
-        protocol=_JsonProtocol(), state=None, max_attempts=options.max_retries + 1))
+    return _JsonProtocol()
 
 
 def _extract_json(response: str) -> str:
@@ -0,0 +1,143 @@
+import asyncio
+import threading
+from contextlib import asynccontextmanager, contextmanager
+from typing import AsyncGenerator, Generator
+
+from .error import is_retry_error
+
+DEFAULT_MAX_CONCURRENCY = 6
+
+_SHARED_LOCK = threading.Lock()
+_SHARED_LIMITERS: dict[tuple[str, str, str], "ConcurrencyLimiter"] = {}
+
+
+class ConcurrencyLimiter:
+    """Caps in-flight LLM requests and adapts the cap with AIMD.
+
+    The limit starts at ``max_concurrency``. Each successful request raises it
+    by ``1 / limit`` (about one slot per round of requests) up to the ceiling.
+    A request failing with an error that ``is_retry_error`` accepts (rate
+    limits, timeouts, overloaded servers) halves it, down to ``min_concurrency``.
+    Failures of requests that started before the last halving are ignored, so
+    one burst of errors only backs off once.
+    """
+
+    def __init__(self, max_concurrency: int, min_concurrency: int = 1) -> None:
+        if min_concurrency < 1:
+            raise ValueError("min_concurrency must be at least 1.")
+        if max_concurrency < min_concurrency:
+            raise ValueError("max_concurrency must not be less than min_concurrency.")
+        self._max_concurrency: int = max_concurrency
+        self._min_concurrency: int = min_concurrency
+        self._limit: float = float(max_concurrency)
+        self._active: int = 0
+        self._epoch: int = 0
+        self._condition = threading.Condition()
+        # 异步调用方不能阻塞事件循环，改为在释放时通过各自的循环唤醒
+        self._async_waiters: list[tuple[asyncio.AbstractEventLoop, asyncio.Future[None]]] = []
+
+    @property
+    def max_concurrency(self) -> int:
+        return self._max_concurrency
+
+    @property
+    def limit(self) -> int:
+        with self._condition:
+            return int(self._limit)
+
+    def raise_ceiling(self, max_concurrency: int) -> None:
+        with self._condition:
+            if max_concurrency > self._max_concurrency:
+                # 当前上限随天花板同步抬高，被唤醒的等待者才能立即用上新增的并发槽位
+                self._limit += max_concurrency - self._max_concurrency
+                self._max_concurrency = max_concurrency
+                self._condition.notify_all()
+                self._wake_async_waiters()
+
+    def lower_ceiling(self, max_concurrency: int) -> None:
+        with self._condition:
+            max_concurrency = max(max_concurrency, self._min_concurrency)
+            if max_concurrency < self._max_concurrency:
+                self._max_concurrency = max_concurrency
+                self._limit = min(self._limit, float(max_concurrency))
+
+    @contextmanager
+    def acquire(self) -> Generator[None, None, None]:
+        with self._condition:
+            while self._active >= int(self._limit):
+                self._condition.wait()
+            self._active += 1
+            epoch = self._epoch
+        try:
+            yield
+        except Exception as error:
+            self._release(epoch, backoff=is_retry_error(error), success=False)
+            raise
+        except BaseException:
+            self._release(epoch, backoff=False, success=False)
+            raise
+        self._release(epoch, backoff=False, success=True)
+
+    @asynccontextmanager
+    async def acquire_async(self) -> AsyncGenerator[None, None]:
+        loop = asyncio.get_running_loop()
+        while True:
+            with self._condition:
+                if self._active < int(self._limit):
+                    self._active += 1
+                    epoch = self._epoch
+                    break
+                waiter: asyncio.Future[None] = loop.create_future()
+                self._async_waiters.append((loop, waiter))
+            await waiter
+        try:
+            yield
+        except Exception as error:
+            self._release(epoch, backoff=is_retry_error(error), success=False)
+            raise
+        except BaseException:
+            self._release(epoch, backoff=False, success=False)
+            raise
+        self._release(epoch, backoff=False, success=True)
+
+    def _release(self, epoch: int, backoff: bool, success: bool) -> None:
+        with self._condition:
+            self._active -= 1
+            if backoff:
+                if epoch == self._epoch:
+                    self._limit = max(float(self._min_concurrency), self._limit / 2)
+                    self._epoch += 1
+            elif success:
+                self._limit = min(float(self._max_concurrency), self._limit + 1 / self._limit)
+            self._condition.notify_all()
+            self._wake_async_waiters()
+
+    def _wake_async_waiters(self) -> None:
+        async_waiters, self._async_waiters = self._async_waiters, []
+        for loop, waiter in async_waiters:
+            loop.call_soon_threadsafe(_wake, waiter)
+
+
+def _wake(waiter: "asyncio.Future[None]") -> None:
+    if not waiter.done():
+        waiter.set_result(None)
+
+
+def shared_limiter(endpoint: str, key: str, model: str, max_concurrency: int | None = None) -> ConcurrencyLimiter:
+    """Return the limiter shared by every runtime calling ``model`` at ``endpoint`` with ``key``.
+
+    ``max_concurrency=None`` adopts the ceiling the limiter already has
+    (``DEFAULT_MAX_CONCURRENCY`` for a new one). An explicit value becomes
+    the ceiling, raising or lowering it for every runtime sharing the limiter.
+    Pass an explicit ``LLM(limiter=...)`` to opt out of sharing.
+    """
+    with _SHARED_LOCK:
+        shared_key = (endpoint, key, model)
+        limiter = _SHARED_LIMITERS.get(shared_key)
+        if limiter is None:
+            limiter = ConcurrencyLimiter(max_concurrency or DEFAULT_MAX_CONCURRENCY)
+            _SHARED_LIMITERS[shared_key] = limiter
+        elif max_concurrency is not None:
+            limiter.raise_ceiling(max_concurrency)
+            limiter.lower_ceiling(max_concurrency)
+        return limiter
@@ -1,6 +1,6 @@
 from __future__ import annotations
 
-from collections.abc import Callable, Sequence
+from collections.abc import Awaitable, Callable, Generator, Sequence
 from dataclasses import dataclass
 from typing import Generic, Protocol, TypeVar
 
@@ -58,22 +58,67 @@ class RepairLoopOptions(Generic[T, S]):
     history_limit: int = 2
 
 
+@dataclass
+class AsyncRepairLoopOptions(Generic[T, S]):
+    messages: Sequence[Message]
+    request: Callable[[list[Message], int, int], Awaitable[str]]
+    protocol: ResponseProtocol[T, S]
+    state: S
+    max_attempts: int = 1
+    history_limit: int = 2
+
+
+@dataclass(frozen=True)
+class _Request:
+    messages: list[Message]
+    attempt: int
+    max_attempt: int
+
+
+@dataclass(frozen=True)
+class _Done(Generic[T]):
+    value: T
+
+
 def run_repair_loop(options: RepairLoopOptions[T, S]) -> T:
-    initial = list(options.messages)
+    steps = _repair_steps(options.messages, options.protocol, options.state,
+                          options.max_attempts, options.history_limit)
+    step = next(steps)
+    while isinstance(step, _Request):
+        step = steps.send(options.request(step.messages, step.attempt, step.max_attempt))
+    return step.value
+
+
+async def arun_repair_loop(options: AsyncRepairLoopOptions[T, S]) -> T:
+    steps = _repair_steps(options.messages, options.protocol, options.state,
+                          options.max_attempts, options.history_limit)
+    step = next(steps)
+    while isinstance(step, _Request):
+        step = steps.send(await options.request(step.messages, step.attempt, step.max_attempt))
+    return step.value
+
+
+def _repair_steps(
+    messages: Sequence[Message],
+    protocol: ResponseProtocol[T, S],
+    state: S,
+    max_attempts: int,
+    history_limit: int,
+) -> Generator[_Request | _Done[T], str, None]:
+    # 同步与异步版本共用这段校验与重试逻辑，调用方只负责发出 yield 出的请求
+    initial = list(messages)
     current = list(initial)
     retry_history: list[Message] = []
-    state = options.state
     last_response: str | None = None
-    attempts = max(1, options.max_attempts)
+    attempts = max(1, max_attempts)
     for attempt in range(attempts):
-        response = options.request(current, attempt, attempts - 1)
+        response = yield _Request(current, attempt, attempts - 1)
         last_response = response
-        result = options.protocol.empty(state, attempt, attempts) if not response.strip() else options.protocol.validate(response, state, attempt, attempts)
+        result = protocol.empty(state, attempt, attempts) if not response.strip() else protocol.validate(response, state, attempt, attempts)
         state = result.state
-        if isinstance(result, ProtocolSuccess):
-            return result.value
-        if isinstance(result, ProtocolPartial):
-            return result.value
+        if isinstance(result, ProtocolSuccess | ProtocolPartial):
+            yield _Done(result.value)
+            return
         if isinstance(result, ProtocolFailure):
             raise result.error
         if attempt + 1 >= attempts:
@@ -82,6 +127,6 @@ def run_repair_loop(options: RepairLoopOptions[T, S]) -> T:
             retry_history = []
         additions = ([Message(MessageRole.ASSISTANT, response)] if result.include_response and response else [])
         additions.append(Message(MessageRole.USER, result.feedback))
-        retry_history = [*retry_history, *additions][-max(1, options.history_limit):]
+        retry_history = [*retry_history, *additions][-max(1, history_limit):]
         current = [*initial, *retry_history]
-    return options.protocol.exhausted(state, attempts, last_response)
+    yield _Done(protocol.exhausted(state, attempts, last_response))
@@ -0,0 +1,64 @@
+from dataclasses import dataclass
+from enum import Enum, auto
+
+
+class LLMEventKind(Enum):
+    CACHE_HIT = auto()
+    COMPLETE = auto()
+    RETRY = auto()
+    FAILED = auto()
+
+
+@dataclass
+class LLMEvent:
+    """One cache hit, or one HTTP attempt of an LLM request.
+
+    ``RETRY`` marks an attempt that failed or came back empty and will be
+    retried. ``FAILED`` marks the attempt after which the request gave up.
+    """
+
+    kind: LLMEventKind
+    protocol: str
+    model: str
+    attempt: int
+    cost_time_ms: int = 0
+    first_token_ms: int | None = None
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    error: Exception | None = None
+
+
+@dataclass
+class LLMMetering:
+    requests: int = 0
+    cache_hits: int = 0
+    attempts: int = 0
+    retries: int = 0
+    failures: int = 0
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    cost_time_ms: int = 0
+    first_token_ms: int = 0
+
+    @property
+    def cache_hit_rate(self) -> float:
+        return self.cache_hits / self.requests if self.requests else 0.0
+
+    def record(self, event: LLMEvent) -> None:
+        if event.kind == LLMEventKind.CACHE_HIT:
+            self.requests += 1
+            self.cache_hits += 1
+            return
+        self.attempts += 1
+        self.cost_time_ms += event.cost_time_ms
+        if event.kind == LLMEventKind.RETRY:
+            self.retries += 1
+            return
+        self.requests += 1
+        if event.kind == LLMEventKind.FAILED:
+            self.failures += 1
+            return
+        self.prompt_tokens += event.prompt_tokens
+        self.completion_tokens += event.completion_tokens
+        # 累计值；除以成功请求数 (requests - cache_hits - failures) 即为平均首 token 延迟
+        self.first_token_ms += event.first_token_ms or 0
@@ -0,0 +1,138 @@
+import atexit
+import json
+import queue
+import threading
+import uuid
+import weakref
+from pathlib import Path
+from typing import Any, TextIO
+
+DEFAULT_MAX_BYTES = 16 * 1024 * 1024
+
+_IDLE_SECONDS = 1.0
+_LIVE_LOGS: "weakref.WeakSet[RequestLog]" = weakref.WeakSet()
+
+
+class RequestLog:
+    """JSON-lines request log written by a background thread.
+
+    ``write`` only enqueues the record. The writer thread keeps the current
+    ``request-*.log`` open, writes whatever is queued in one batch and starts a
+    new file once the current one reaches ``max_bytes``. The thread exits after
+    a second without records and is restarted by the next write.
+
+    If writing fails, the records still queued are dropped and the error is
+    raised by the next ``flush``.
+    """
+
+    def __init__(self, directory: Path, max_bytes: int = DEFAULT_MAX_BYTES) -> None:
+        if max_bytes <= 0:
+            raise ValueError("max_bytes must be positive.")
+        self._directory = directory
+        self._max_bytes = max_bytes
+        self._queue: queue.SimpleQueue[dict[str, Any]] = queue.SimpleQueue()
+        self._lock = threading.Lock()
+        self._idle = threading.Condition(self._lock)
+        self._pending: int = 0
+        self._error: BaseException | None = None
+        self._writer: threading.Thread | None = None
+        self._path = self._next_path()
+        self._path.touch()
+        _LIVE_LOGS.add(self)
+
+    @property
+    def path(self) -> Path:
+        return self._path
+
+    def write(self, record: dict[str, Any]) -> None:
+        with self._lock:
+            self._pending += 1
+            self._queue.put(record)
+            if self._writer is None:
+                self._writer = threading.Thread(target=self._run, name="pdf-craft-request-log", daemon=True)
+                self._writer.start()
+
+    def flush(self, timeout: float | None = None) -> None:
+        """Block until every record written so far is on disk or dropped.
+
+        Raises the error that made the writer drop records since the last flush.
+        """
+        with self._idle:
+            self._idle.wait_for(lambda: self._pending == 0, timeout)
+            error, self._error = self._error, None
+        if error is not None:
+            raise error
+
+    def _run(self) -> None:
+        file: TextIO | None = None
+        try:
+            while True:
+                try:
+                    batch = [self._queue.get(timeout=_IDLE_SECONDS)]
+                except queue.Empty:
+                    with self._lock:
+                        # 加锁后再确认一次，避免与 write 竞争导致记录无人处理
+                        if self._queue.empty():
+                            self._writer = None
+                            return
+                    continue
+                batch.extend(self._drain())
+                try:
+                    file = self._write_batch(file, batch)
+                except Exception as error:  # pylint: disable=broad-exception-caught
+                    # 写盘失败（磁盘满、无权限等）时丢弃积压的记录，留给 flush 抛出，保证 flush 不会永远等待
+                    if file is not None:
+                        file.close()
+                        file = None
+                    with self._idle:
+                        self._error = error
+                        batch.extend(self._drain())
+                finally:
+                    with self._idle:
+                        self._pending -= len(batch)
+                        self._idle.notify_all()
+        except BaseException:
+            with self._lock:
+                self._writer = None
+            raise
+        finally:
+            if file is not None:
+                file.close()
+
+    def _drain(self) -> list[dict[str, Any]]:
+        records: list[dict[str, Any]] = []
+        while True:
+            try:
+                records.append(self._queue.get_nowait())
+            except queue.Empty:
+                return records
+
+    def _write_batch(self, file: TextIO | None, batch: list[dict[str, Any]]) -> TextIO:
+        if file is None:
+            file = open(self._path, "a", encoding="utf-8")
+        size = file.tell()
+        for record in batch:
+            line = json.dumps(record, ensure_ascii=False) + "\n"
+            line_size = len(line.encode("utf-8"))
+            if size > 0 and size + line_size > self._max_bytes:
+                file.close()
+                self._path = self._next_path()
+                file = open(self._path, "a", encoding="utf-8")
+                size = 0
+            file.write(line)
+            size += line_size
+        file.flush()
+        return file
+
+    def _next_path(self) -> Path:
+        return self._directory / f"request-{uuid.uuid4().hex}.log"
+
+
+@atexit.register
+def _flush_live_logs() -> None:
+    for log in list(_LIVE_LOGS):
+        try:
+            log.flush(timeout=5.0)
+        except Exception:  # pylint: disable=broad-exception-caught
+            # 退出时请求日志写失败不影响其余日志，也不应阻断进程退出
+            pass
@@ -1,25 +1,36 @@
 # pylint: disable=protected-access
 from __future__ import annotations
 
+import asyncio
 import hashlib
 import json
-import logging
 import threading
 import time
 import uuid
-from contextlib import AbstractContextManager
+import weakref
+from collections.abc import Callable, Generator, Mapping
+from contextlib import AbstractContextManager, contextmanager
+from dataclasses import dataclass, field
 from typing import Self
 from typing import cast
 
 import openai
-from openai.types.chat import ChatCompletionMessageParam
+from openai import Omit, omit
+from openai.types.chat import ChatCompletionChunk, ChatCompletionMessageParam, ChatCompletionStreamOptionsParam
 
+from .cache import DirectoryLLMCache, LLMCache
 from .core import LLM
 from .error import is_retry_error
 from .increasable import Increasable
+from .limiter import shared_limiter
+from .metering import LLMEvent, LLMEventKind, LLMMetering
+from .request_log import RequestLog
 from .types import Message, MessageRole
 
-_CACHE_LOCK = threading.Lock()
+# 同一事件循环中的所有 AsyncOpenAI 客户端共用一个 HTTP 连接池
+_ASYNC_HTTP_CLIENTS: weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, openai.DefaultAsyncHttpxClient] = (
+    weakref.WeakKeyDictionary()
+)
 
 
 class LLMTransportError(RuntimeError):
@@ -44,12 +55,39 @@ class LLMRuntime:
         self._client = openai.OpenAI(api_key=config.key, base_url=config.url,
                                      timeout=config.timeout, max_retries=0)
         self._top_p, self._temperature = Increasable(config.top_p), Increasable(config.temperature)
-        self._limiter = threading.BoundedSemaphore(6)
-        self._logger = _create_logger(config.log_dir_path)
+        self._limiter = config.limiter or shared_limiter(
+            config.url, config.key, config.model, config.max_concurrency)
+        self._stream_usage = config.stream_usage
+        self._request_log = RequestLog(config.log_dir_path) if config.log_dir_path is not None else None
+        self._cache: LLMCache | None = config.cache
+        if self._cache is None and config.cache_path is not None:
+            self._cache = DirectoryLLMCache(config.cache_path)
+        self._async_clients: weakref.WeakKeyDictionary[
+            asyncio.AbstractEventLoop, tuple[openai.DefaultAsyncHttpxClient, openai.AsyncOpenAI]
+        ] = weakref.WeakKeyDictionary()
+        self._observers: list[tuple[LLMMetering, Callable[[LLMEvent], None] | None]] = []
+        self._observers_lock = threading.Lock()
+
+    @property
+    def max_concurrency(self) -> int:
+        """Ceiling of the concurrency limiter; more concurrent requests only queue."""
+        return self._limiter.max_concurrency
 
     def context(self, cache_seed_content: str | None = None) -> LLMContext:
         return LLMContext(self, cache_seed_content)
 
+    def cached(self, request: PreparedRequest) -> str | None:
+        """Return the cached response of a prepared request without calling the LLM."""
+        if self._cache is None:
+            return None
+        return self._cache.get(request.cache_key)
+
+    def store(self, responses: Mapping[str, str]) -> None:
+        """Put responses obtained elsewhere (e.g. a batch job) into the cache by cache key."""
+        if self._cache is None:
+            raise ValueError("LLM has no cache to store responses in")
+        self._cache.put_many(responses)
+
     def request(self, input: str | list[Message], max_tokens: int | None = None,
                 temperature: float | None = None, top_p: float | None = None,
                 *, cache_seed_content: str | None = None, retry_index: int | None = None,
@@ -59,6 +97,46 @@ class LLMRuntime:
                                    retry_index=retry_index, retry_max=retry_max,
                                    use_cache=use_cache)
 
+    async def arequest(self, input: str | list[Message], max_tokens: int | None = None,
+                       temperature: float | None = None, top_p: float | None = None,
+                       *, cache_seed_content: str | None = None, retry_index: int | None = None,
+                       retry_max: int | None = None, use_cache: bool = True) -> str:
+        """Asynchronous :meth:`request`; many calls can share one event loop and connection pool.
+
+        Await :func:`aclose_async_clients` before the loop shuts down to close that pool.
+        """
+        with self.context(cache_seed_content) as context:
+            return await context.arequest(input, max_tokens, temperature, top_p,
+                                          retry_index=retry_index, retry_max=retry_max,
+                                          use_cache=use_cache)
+
+    @contextmanager
+    def observe(
+        self, on_event: Callable[[LLMEvent], None] | None = None,
+    ) -> Generator[LLMMetering, None, None]:
+        """Meter every request this runtime makes while the block is active.
+
+        The yielded :class:`LLMMetering` is updated as requests finish, and
+        ``on_event`` receives each event from the thread that made the request.
+        """
+        observer = (LLMMetering(), on_event)
+        with self._observers_lock:
+            self._observers.append(observer)
+        try:
+            yield observer[0]
+        finally:
+            with self._observers_lock:
+                self._observers.remove(observer)
+
+    def _emit(self, event: LLMEvent) -> None:
+        with self._observers_lock:
+            observers = list(self._observers)
+            for metering, _ in observers:
+                metering.record(event)
+        for _, on_event in observers:
+            if on_event is not None:
+                on_event(event)
+
     @staticmethod
     def _scheduled(value, source: Increasable, index, maximum):
         if value is not None:
@@ -69,81 +147,226 @@ class LLMRuntime:
             return start + (end - start) * min(max(index, 0), maximum) / maximum
         return source.context().current
 
-    def _invoke(self, messages: list[Message], max_tokens, temperature, top_p) -> str:
-        converted = cast(list[ChatCompletionMessageParam], [
-            {"role": message.role.name.lower(), "content": message.message} for message in messages
-        ])
-        with self._limiter:
-            stream = self._client.chat.completions.create(model=self.config.model,
-                messages=converted, stream=True, top_p=top_p, temperature=temperature,
-                max_tokens=max_tokens)
-            return "".join(chunk.choices[0].delta.content for chunk in stream
-                           if chunk.choices and chunk.choices[0].delta.content)
+    def _invoke(self, messages: list[Message], max_tokens, temperature, top_p,
+                timing: _Timing | None = None) -> str:
+        converted = _convert_messages(messages)
+        with self._limiter.acquire():
+            stream_options = self._stream_options()
+            try:
+                stream = self._client.chat.completions.create(model=self.config.model,
+                    messages=converted, stream=True, top_p=top_p, temperature=temperature,
+                    max_tokens=max_tokens, stream_options=stream_options)
+            except (openai.BadRequestError, openai.UnprocessableEntityError) as error:
+                if not self._rejects_stream_options(stream_options, error):
+                    raise
+                stream = self._client.chat.completions.create(model=self.config.model,
+                    messages=converted, stream=True, top_p=top_p, temperature=temperature,
+                    max_tokens=max_tokens)
+            parts: list[str] = []
+            for chunk in stream:
+                _read_chunk(chunk, parts, timing)
+            return "".join(parts)
+
+    async def _ainvoke(self, messages: list[Message], max_tokens, temperature, top_p,
+                       timing: _Timing | None = None) -> str:
+        converted = _convert_messages(messages)
+        async with self._limiter.acquire_async():
+            stream_options = self._stream_options()
+            try:
+                stream = await self._async_client().chat.completions.create(model=self.config.model,
+                    messages=converted, stream=True, top_p=top_p, temperature=temperature,
+                    max_tokens=max_tokens, stream_options=stream_options)
+            except (openai.BadRequestError, openai.UnprocessableEntityError) as error:
+                if not self._rejects_stream_options(stream_options, error):
+                    raise
+                stream = await self._async_client().chat.completions.create(model=self.config.model,
+                    messages=converted, stream=True, top_p=top_p, temperature=temperature,
+                    max_tokens=max_tokens)
+            parts: list[str] = []
+            async for chunk in stream:
+                _read_chunk(chunk, parts, timing)
+            return "".join(parts)
+
+    def _stream_options(self) -> ChatCompletionStreamOptionsParam | Omit:
+        return {"include_usage": True} if self._stream_usage else omit
+
+    def _rejects_stream_options(self, sent: ChatCompletionStreamOptionsParam | Omit,
+                                error: openai.APIStatusError) -> bool:
+        # 部分兼容 OpenAI 的服务端不认识 stream_options：此后不再发送，token 改为本地编码计数
+        if isinstance(sent, Omit) or "stream_options" not in str(error):
+            return False
+        self._stream_usage = False
+        return True
+
+    def _async_client(self) -> openai.AsyncOpenAI:
+        loop = asyncio.get_running_loop()
+        http_client = _ASYNC_HTTP_CLIENTS.get(loop)
+        if http_client is None:
+            http_client = openai.DefaultAsyncHttpxClient()
+            _ASYNC_HTTP_CLIENTS[loop] = http_client
+        cached = self._async_clients.get(loop)
+        # 连接池被 aclose_async_clients 关闭后重新创建客户端
+        if cached is not None and cached[0] is http_client:
+            return cached[1]
+        client = openai.AsyncOpenAI(api_key=self.config.key, base_url=self.config.url,
+                                    timeout=self.config.timeout, max_retries=0,
+                                    http_client=http_client)
+        self._async_clients[loop] = (http_client, client)
+        return client
+
+
+@dataclass(frozen=True)
+class PreparedRequest:
+    """Messages and sampling parameters of a request, resolved exactly as :meth:`LLMContext.request` would."""
+
+    messages: list[Message]
+    max_tokens: int | None
+    temperature: float | None
+    top_p: float | None
+    cache_key: str
+
+
+@dataclass
+class _Timing:
+    started_at: float = field(default_factory=time.perf_counter)
+    first_token_at: float | None = None
+    # 服务端在流末尾报告的 (prompt_tokens, completion_tokens)
+    usage: tuple[int, int] | None = None
+
+    def elapsed_ms(self, until: float | None = None) -> int:
+        return int(((until or time.perf_counter()) - self.started_at) * 1000)
+
+
+@dataclass(frozen=True)
+class _Invoke:
+    messages: list[Message]
+    max_tokens: int | None
+    temperature: float | None
+    top_p: float | None
+    timing: _Timing
+
+
+@dataclass(frozen=True)
+class _Sleep:
+    seconds: float
 
 
 class LLMContext(AbstractContextManager["LLMContext"]):
     def __init__(self, runtime: LLMRuntime, cache_seed_content: str | None) -> None:
         self.runtime, self.cache_seed_content = runtime, cache_seed_content
-        self.context_id, self._pending = uuid.uuid4().hex[:12], set()
+        self.context_id, self._pending = uuid.uuid4().hex[:12], {}
         self._top_p, self._temperature = runtime._top_p.context(), runtime._temperature.context()
 
     def __enter__(self) -> Self:
         return self
 
     def __exit__(self, exc_type, exc_val, exc_tb) -> None:
-        for temporary in sorted(self._pending):
-            if exc_type is None:
-                permanent = temporary.with_name(temporary.name.rsplit(".", 2)[0] + ".txt")
-                with _CACHE_LOCK:
-                    if permanent.exists():
-                        temporary.unlink(missing_ok=True)
-                    else:
-                        temporary.rename(permanent)
-            else:
-                temporary.unlink(missing_ok=True)
+        # 只有整个 context 成功时才一次性提交本次的全部响应
+        pending, self._pending = self._pending, {}
+        if exc_type is None and pending and self.runtime._cache is not None:
+            self.runtime._cache.put_many(pending)
+
+    def discard(self) -> None:
+        """Drop the responses not committed yet, so they are never cached."""
+        self._pending.clear()
 
     def request(self, input, max_tokens=None, temperature=None, top_p=None, *,
                 retry_index=None, retry_max=None, use_cache=True) -> str:
+        steps = self._request_steps(input, max_tokens, temperature, top_p,
+                                    retry_index, retry_max, use_cache)
+        step, response = _advance(steps, None)
+        while step is not None:
+            try:
+                if isinstance(step, _Sleep):
+                    time.sleep(step.seconds)
+                    result = None
+                else:
+                    result = self.runtime._invoke(step.messages, step.max_tokens, step.temperature, step.top_p,
+                                                  step.timing)
+            except Exception as error:  # pylint: disable=broad-exception-caught
+                step, response = _advance(steps, None, error)
+            else:
+                step, response = _advance(steps, result)
+        return cast(str, response)
+
+    async def arequest(self, input, max_tokens=None, temperature=None, top_p=None, *,
+                       retry_index=None, retry_max=None, use_cache=True) -> str:
+        steps = self._request_steps(input, max_tokens, temperature, top_p,
+                                    retry_index, retry_max, use_cache)
+        step, response = _advance(steps, None)
+        while step is not None:
+            try:
+                if isinstance(step, _Sleep):
+                    await asyncio.sleep(step.seconds)
+                    result = None
+                else:
+                    result = await self.runtime._ainvoke(step.messages, step.max_tokens, step.temperature,
+                                                         step.top_p, step.timing)
+            except Exception as error:  # pylint: disable=broad-exception-caught
+                step, response = _advance(steps, None, error)
+            else:
+                step, response = _advance(steps, result)
+        return cast(str, response)
+
+    def prepare(self, input, max_tokens=None, temperature=None, top_p=None, *,
+                retry_index=None, retry_max=None) -> PreparedRequest:
+        """Resolve a request without sending it, e.g. to look it up in the cache."""
         messages = [Message(MessageRole.USER, input)] if isinstance(input, str) else list(input)
         temperature = self.runtime._scheduled(temperature, self.runtime._temperature, retry_index, retry_max)
         top_p = self.runtime._scheduled(top_p, self.runtime._top_p, retry_index, retry_max)
-        key = self._cache_key(messages, max_tokens, temperature, top_p) if use_cache else None
-        cache_path = self.runtime.config.cache_path
-        if key and cache_path:
-            cached = cache_path / f"{key}.txt"
-            if cached.exists():
-                self._log("cache-hit", 0, key=key)
-                return cached.read_text(encoding="utf-8")
-        self._log("cache-miss", 0, key=key)
+        return PreparedRequest(messages=messages, max_tokens=max_tokens, temperature=temperature, top_p=top_p,
+                               cache_key=self._cache_key(messages, max_tokens, temperature, top_p))
+
+    def _request_steps(self, input, max_tokens, temperature, top_p, retry_index, retry_max,
+                       use_cache) -> Generator[_Invoke | _Sleep, str | None, str]:
+        # 重试、缓存与日志逻辑只写一次：同步与异步调用方只负责执行 yield 出的请求和等待
+        prepared = self.prepare(input, max_tokens, temperature, top_p,
+                                retry_index=retry_index, retry_max=retry_max)
+        messages, temperature, top_p = prepared.messages, prepared.temperature, prepared.top_p
+        key = prepared.cache_key if use_cache else None
+        cache = self.runtime._cache
+        if key and cache is not None:
+            cached = cache.get(key)
+            if cached is not None:
+                self._log("cache-hit", 0, key=key, kind=LLMEventKind.CACHE_HIT, cache="hit")
+                return cached
+        self._log("cache-miss", 0, key=key, cache="miss" if key else "off")
         last_error: Exception | None = None
         empty_attempts = 0
+        retry_times = self.runtime.config.retry_times
         try:
-            for attempt in range(self.runtime.config.retry_times + 1):
+            for attempt in range(retry_times + 1):
+                timing = _Timing()
                 try:
                     self._log("request", attempt + 1, key=key)
-                    response = self.runtime._invoke(messages, max_tokens, temperature, top_p)
+                    response = yield _Invoke(messages, max_tokens, temperature, top_p, timing)
+                    assert response is not None
                     if not response.strip():
                         empty_attempts += 1
-                        self._log("empty-response", attempt + 1, key=key)
-                        if attempt >= self.runtime.config.retry_times:
+                        # 最后一次为空时由下方的异常分支上报 FAILED
+                        self._log("empty-response", attempt + 1, key=key, timing=timing,
+                                  kind=LLMEventKind.RETRY if attempt < retry_times else None)
+                        if attempt >= retry_times:
                             raise LLMEmptyResponseError(attempts=empty_attempts)
                         continue
-                    if key and cache_path:
-                        temporary = cache_path / f"{key}.{self.context_id}.txt"
-                        temporary.write_text(response, encoding="utf-8")
-                        self._pending.add(temporary)
-                    self._log("success", attempt + 1, key=key)
+                    if key and cache is not None:
+                        self._pending[key] = response
+                    self._log("success", attempt + 1, key=key, kind=LLMEventKind.COMPLETE, timing=timing,
+                              exchange=(messages, response))
                     return response
                 except Exception as error:
                     last_error = error
                     retryable = is_retry_error(error)
-                    self._log("transport-error" if retryable else "non-retryable-error", attempt + 1, key=key, error=error)
+                    gives_up = isinstance(error, LLMEmptyResponseError) or not retryable or attempt >= retry_times
+                    self._log("transport-error" if retryable else "non-retryable-error", attempt + 1, key=key,
+                              kind=LLMEventKind.FAILED if gives_up else LLMEventKind.RETRY,
+                              timing=timing, error=error)
                     if isinstance(error, LLMEmptyResponseError):
                         raise
-                    if not retryable or attempt >= self.runtime.config.retry_times:
+                    if gives_up:
                         raise LLMTransportError("LLM transport request failed", attempts=attempt + 1, cause=error) from error
                     if self.runtime.config.retry_interval_seconds > 0:
-                        time.sleep(self.runtime.config.retry_interval_seconds)
+                        yield _Sleep(self.runtime.config.retry_interval_seconds)
         finally:
             self._temperature.increase()
             self._top_p.increase()
@@ -157,32 +380,84 @@ class LLMContext(AbstractContextManager["LLMContext"]):
                    "protocol": self.runtime.protocol_version}
         return hashlib.sha512(json.dumps(payload, sort_keys=True, ensure_ascii=False).encode()).hexdigest()
 
-    def _log(self, category: str, attempt: int, *, key: str | None, error: Exception | None = None) -> None:
-        self.runtime._logger.info(json.dumps({
-            "session": self.context_id, "category": category, "attempt": attempt,
-            "model": self.runtime.config.model, "cache_key": key,
-            **({"error": type(error).__name__} if error else {}),
-        }, ensure_ascii=False))
-        _close_file_handlers(self.runtime._logger)
+    def _log(self, category: str, attempt: int, *, key: str | None, kind: LLMEventKind | None = None,
+             cache: str | None = None, timing: _Timing | None = None,
+             exchange: tuple[list[Message], str] | None = None, error: Exception | None = None) -> None:
+        runtime = self.runtime
+        observed = kind is not None and bool(runtime._observers)
+        if runtime._request_log is None and not observed:
+            return
+        now = time.perf_counter()
+        cost_time_ms = timing.elapsed_ms(now) if timing is not None else 0
+        first_token_ms: int | None = None
+        if timing is not None and timing.first_token_at is not None:
+            first_token_ms = timing.elapsed_ms(timing.first_token_at)
+        prompt_tokens, completion_tokens = 0, 0
+        if exchange is not None and timing is not None and timing.usage is not None:
+            prompt_tokens, completion_tokens = timing.usage
+        elif exchange is not None:
+            # 服务端未报告 usage 时才在本地编码计数，且只在写日志或有人计量时付出这份开销
+            messages, response = exchange
+            encoding = runtime.config.encoding
+            prompt_tokens = sum(len(encoding.encode(message.message)) for message in messages)
+            completion_tokens = len(encoding.encode(response))
 
+        if runtime._request_log is not None:
+            record: dict = {"time": time.time(), "session": self.context_id, "category": category,
+                            "attempt": attempt, "model": runtime.config.model, "cache_key": key}
+            if cache is not None:
+                record["cache"] = cache
+            if timing is not None:
+                record["latency_ms"] = round((now - timing.started_at) * 1000, 3)
+            if first_token_ms is not None:
+                record["first_token_ms"] = first_token_ms
+            if exchange is not None:
+                record["prompt_tokens"], record["completion_tokens"] = prompt_tokens, completion_tokens
+            if error is not None:
+                record["error"] = type(error).__name__
+            runtime._request_log.write(record)
 
-def runtime_for(config: LLM, *, protocol_version: str = "1") -> LLMRuntime:
-    return LLMRuntime(config, protocol_version=protocol_version)
+        if observed and kind is not None:
+            runtime._emit(LLMEvent(kind=kind, protocol=runtime.protocol_version, model=runtime.config.model,
+                                   attempt=attempt, cost_time_ms=cost_time_ms, first_token_ms=first_token_ms,
+                                   prompt_tokens=prompt_tokens, completion_tokens=completion_tokens,
+                                   error=error))
+
+
+def _read_chunk(chunk: ChatCompletionChunk, parts: list[str], timing: _Timing | None) -> None:
+    if chunk.choices and chunk.choices[0].delta.content:
+        if timing is not None and not parts:
+            timing.first_token_at = time.perf_counter()
+        parts.append(chunk.choices[0].delta.content)
+    if chunk.usage is not None and timing is not None:
+        timing.usage = (chunk.usage.prompt_tokens, chunk.usage.completion_tokens)
+
+
+def _convert_messages(messages: list[Message]) -> list[ChatCompletionMessageParam]:
+    return cast(list[ChatCompletionMessageParam], [
+        {"role": message.role.name.lower(), "content": message.message} for message in messages
+    ])
 
 
-def _create_logger(path):
-    logger = logging.getLogger(f"pdf_craft.llm.{uuid.uuid4().hex}")
-    logger.addHandler(logging.NullHandler())
-    logger.setLevel(logging.INFO)
-    logger.propagate = False
-    if path is not None:
-        handler = logging.FileHandler(path / f"request-{uuid.uuid4().hex}.log", encoding="utf-8")
-        handler.setFormatter(logging.Formatter("%(message)s"))
-        logger.addHandler(handler)
-    return logger
+def _advance(
+    steps: Generator[_Invoke | _Sleep, str | None, str],
+    value: str | None,
+    error: Exception | None = None,
+) -> tuple[_Invoke | _Sleep | None, str | None]:
+    try:
+        step = steps.throw(error) if error is not None else steps.send(value)
+    except StopIteration as stop:
+        return None, stop.value
+    return step, None
 
 
-def _close_file_handlers(logger: logging.Logger) -> None:
-    for handler in logger.handlers:
-        if isinstance(handler, logging.FileHandler):
-            handler.close()
+async def aclose_async_clients() -> None:
+    """Close the connection pool shared by async requests on the running event loop."""
+    http_client = _ASYNC_HTTP_CLIENTS.pop(asyncio.get_running_loop(), None)
+    if http_client is not None:
+        await http_client.aclose()
+
+
+def runtime_for(config: LLM, *, protocol_version: str = "1") -> LLMRuntime:
+    return LLMRuntime(config, protocol_version=protocol_version)
+
@@ -1,6 +1,9 @@
 from .handler import DefaultPDFDocument, DefaultPDFHandler, PDFDocument, PDFHandler
 from .ocr import OCR, OCREvent, OCREventKind
+from .ocr_cache import OCRCache
+from .page_pack import PagePack
 from .page_ref import pdf_pages_count
+from .page_store import PageStore
 from .ref import *
 from .types import (
     DeepSeekOCRSize,
@@ -1,7 +1,9 @@
+import subprocess
+import tempfile
 from datetime import datetime, timezone
 from os import PathLike
 from pathlib import Path
-from typing import Protocol, cast, runtime_checkable
+from typing import IO, Generator, Iterable, Protocol, cast, runtime_checkable
 
 from PIL import Image
 
@@ -11,6 +13,18 @@ from .types import PDFDocumentMetadata
 
 @runtime_checkable
 class PDFDocument(Protocol):
+    """An opened PDF document.
+
+    Implementations may also provide an optional bulk method
+    ``render_pages(page_indexes: Iterable[int], dpi: int) -> Iterator[Image]``
+    that yields the pages in the given order. ``PageRefContext`` prefers it
+    over repeated ``render_page`` calls when it is available.
+
+    ``page_size`` is the unrotated media box. Implementations may also provide
+    ``page_rotation(page_index: int) -> int`` returning the page's ``/Rotate``
+    in degrees; without it pages are assumed not to be rotated.
+    """
+
     @property
     def pages_count(self) -> int: ...
 
@@ -142,6 +156,14 @@ class DefaultPDFDocument:
                 f"Failed to get page size for page {page_index}.", page_index=page_index
             ) from error
 
+    def page_rotation(self, page_index: int) -> int:
+        try:
+            return self._reader.pages[page_index - 1].rotation
+        except Exception as error:
+            raise PDFError(
+                f"Failed to get page rotation for page {page_index}.", page_index=page_index
+            ) from error
+
     def render_page(self, page_index: int, dpi: int) -> Image.Image:
         from pdf2image import convert_from_path
         from pdf2image.exceptions import PDFInfoNotInstalledError
@@ -161,13 +183,7 @@ class DefaultPDFDocument:
                 poppler_path=cast(str, poppler_path),
             )
         except PDFInfoNotInstalledError as error:
-            if self._poppler_path:
-                error_message = (
-                    f"Poppler not found at specified path: {self._poppler_path}"
-                )
-            else:
-                error_message = "Poppler not found in PATH. Either not installed or PATH is not configured correctly."
-            raise PDFError(error_message, page_index) from error
+            raise PDFError(self._poppler_not_found_message(), page_index) from error
 
         if not images:
             raise RuntimeError(f"Failed to render page {page_index}")
@@ -178,5 +194,109 @@ class DefaultPDFDocument:
 
         return image
 
+    def render_pages(
+        self, page_indexes: Iterable[int], dpi: int
+    ) -> Generator[Image.Image, None, None]:
+        # 每段连续页码只启动一个 pdftoppm 进程，从 stdout 流式读取 PPM，不落临时文件
+        for first_page, last_page in _continuous_ranges(page_indexes):
+            yield from self._stream_pages(first_page, last_page, dpi)
+
+    def _stream_pages(
+        self, first_page: int, last_page: int, dpi: int
+    ) -> Generator[Image.Image, None, None]:
+        command = "pdftoppm"
+        if self._poppler_path:
+            command = str(self._poppler_path / command)
+
+        with tempfile.TemporaryFile() as stderr:
+            try:
+                process = subprocess.Popen(
+                    [
+                        command,
+                        "-r",
+                        str(dpi),
+                        "-f",
+                        str(first_page),
+                        "-l",
+                        str(last_page),
+                        str(self._pdf_path),
+                    ],
+                    stdout=subprocess.PIPE,
+                    stderr=stderr,
+                )
+            except FileNotFoundError as error:
+                raise PDFError(self._poppler_not_found_message(), first_page) from error
+
+            assert process.stdout is not None
+            page_index = first_page
+            try:
+                while page_index <= last_page:
+                    try:
+                        image = _read_ppm(process.stdout)
+                    except ValueError:
+                        break
+                    if image is None:
+                        break
+                    yield image
+                    page_index += 1
+            finally:
+                process.stdout.close()
+                if process.poll() is None:
+                    process.kill()
+                process.wait()
+
+            if page_index <= last_page:
+                stderr.seek(0)
+                message = stderr.read().decode("utf-8", errors="replace").strip()
+                raise PDFError(
+                    f"Failed to render page {page_index}: {message}",
+                    page_index=page_index,
+                )
+
+    def _poppler_not_found_message(self) -> str:
+        if self._poppler_path:
+            return f"Poppler not found at specified path: {self._poppler_path}"
+        else:
+            return "Poppler not found in PATH. Either not installed or PATH is not configured correctly."
+
     def close(self) -> None:
         self._reader.stream.close()
+
+
+def _continuous_ranges(page_indexes: Iterable[int]) -> Generator[tuple[int, int], None, None]:
+    first_page: int | None = None
+    last_page: int = 0
+    for page_index in page_indexes:
+        if first_page is not None and page_index == last_page + 1:
+            last_page = page_index
+            continue
+        if first_page is not None:
+            yield first_page, last_page
+        first_page = page_index
+        last_page = page_index
+    if first_page is not None:
+        yield first_page, last_page
+
+
+def _read_ppm(stream: IO[bytes]) -> Image.Image | None:
+    # pdftoppm 输出的是首尾相接的 binary PPM（P6）：头部 4 个字段按行给出，最后一行的换行符后紧跟 RGB 像素
+    fields: list[bytes] = []
+    while len(fields) < 4:
+        line = stream.readline()
+        if not line:
+            if not fields:
+                return None
+            raise ValueError("Truncated PPM header.")
+        fields.extend(line.split(b"#", 1)[0].split())
+
+    if len(fields) != 4:
+        raise ValueError(f"Unexpected PPM header: {b' '.join(fields)[:64]!r}.")
+    magic, width, height, max_value = fields[:4]  # pylint: disable=unbalanced-tuple-unpacking
+    if magic != b"P6" or max_value != b"255":
+        raise ValueError(f"Unsupported PPM format: {magic!r}, max value {max_value!r}.")
+
+    size = (int(width), int(height))
+    data = stream.read(size[0] * size[1] * 3)
+    if len(data) != size[0] * size[1] * 3:
+        raise ValueError("Truncated PPM data.")
+    return Image.frombytes("RGB", size, data)
@@ -1,3 +1,48 @@
+from dataclasses import dataclass
+from operator import eq
+from typing import Iterable
+
+
+@dataclass(frozen=True)
+class RepetitionRule:
+    min_ngram: int
+    max_ngram: int
+    repeat_threshold: int
+
+
+def find_repetitive_ngrams(
+    text: str,
+    rules: Iterable[RepetitionRule],
+) -> list[bool]:
+    """
+    一次调用同时判定多组阈值，返回与 rules 一一对应的结果，语义与 has_repetitive_ngrams 相同。
+
+    文本以长度为 n 的片段连续重复 R 次，等价于存在一段长度为 n * (R - 1) 的区间，
+    区间内每个位置都满足 text[j] == text[j + n]。因此对每个周期 n 只需在 C 层逐字符比较一遍，
+    把结果编码成 0/1 字节串后再做一次子串查找，不再为每个 (n, 起点) 构造 tuple。
+    各组规则共用同一周期的比较结果，总开销为 O(L·N)，与重复次数无关。
+    """
+    rules = list(rules)
+    results = [False] * len(rules)
+    length = len(text)
+    runs_by_period: dict[int, bytes] = {}
+
+    for i, rule in enumerate(rules):
+        if length < rule.min_ngram * rule.repeat_threshold:
+            continue
+        max_period = min(rule.max_ngram, length // rule.repeat_threshold)
+        for period in range(rule.min_ngram, max_period + 1):
+            matches = runs_by_period.get(period)
+            if matches is None:
+                matches = bytes(map(eq, text, text[period:]))
+                runs_by_period[period] = matches
+            if b"\x01" * (period * (rule.repeat_threshold - 1)) in matches:
+                results[i] = True
+                break
+
+    return results
+
+
 def has_repetitive_ngrams(
     text: str,
     min_ngram: int,
@@ -17,25 +62,5 @@ def has_repetitive_ngrams(
     """
     if not text:
         return False
-
-    chars = list(text)
-    if len(chars) < min_ngram * repeat_threshold:
-        return False
-
-    for n in range(min_ngram, min(max_ngram + 1, len(chars) // repeat_threshold + 1)):
-        for i in range(len(chars) - n * repeat_threshold + 1):
-            ngram = tuple(chars[i : i + n])
-            consecutive_count = 1
-            pos = i + n
-            while pos + n <= len(chars):
-                next_ngram = tuple(chars[pos : pos + n])
-                if next_ngram == ngram:
-                    consecutive_count += 1
-                    pos += n
-                else:
-                    break
-
-            if consecutive_count >= repeat_threshold:
-                return True
-
-    return False
+    rule = RepetitionRule(min_ngram, max_ngram, repeat_threshold)
+    return find_repetitive_ngrams(text, (rule,))[0]
@@ -1,3 +1,4 @@
+import re
 import sys
 import time
 import json
@@ -9,14 +10,17 @@ from typing import Callable, Container, Generator, TypeVar
 
 from PIL.Image import Image
 
-from ..common import AssetHub, save_xml
+from ..common import AssetHub, read_xml, save_xml
 from ..error import IgnoreOCRErrorsChecker, IgnorePDFErrorsChecker, OCRError, PDFError
 from ..metering import AbortedCheck, check_aborted
 from ..ocr_config import OCRConfig
 from .handler import DefaultPDFHandler, PDFHandler
+from .ocr_cache import OCRCache
+from .ocr_workers import OCRTokensBudget, create_ocr_jobs
 from .page_extractor import Page, PageExtractorNode, PageLayout
-from .page_ref import PageRefContext
-from .types import DeepSeekOCRSize, PDFDocumentMetadata, encode
+from .page_pack import PAGES_PACK_FILE_NAME, PagePack
+from .page_ref import PageRef, PageRefContext
+from .types import DeepSeekOCRSize, PDFDocumentMetadata, decode, encode
 
 
 class OCREventKind(Enum):
@@ -44,7 +48,10 @@ class OCR:
         self,
         ocr: OCRConfig,
         pdf_handler: PDFHandler | None,
+        cache: OCRCache | None = None,
     ) -> None:
+        self._ocr = ocr
+        self._cache = cache
         self._pdf_handler = pdf_handler
         self._pdf_handler_lock = Lock()
         self._extractor = PageExtractorNode(ocr=ocr)
@@ -81,77 +88,137 @@ class OCR:
         max_tokens: int | None = None,
         max_output_tokens: int | None = None,
         device_number: int | None = None,
+        ocr_workers: int = 1,
+        prefetch_pages: int = 0,
+        packed_pages: bool = False,
     ) -> Generator[OCREvent, None, None]:
+        if ocr_workers < 1:
+            raise ValueError("ocr_workers must be at least 1.")
+        if prefetch_pages < 0:
+            raise ValueError("prefetch_pages must not be negative.")
+
         ocr_path.mkdir(parents=True, exist_ok=True)
         geometry_path = ocr_path / "page_pixel_sizes.json"
         self._last_page_pixel_sizes = self._load_page_pixel_sizes(geometry_path)
         if plot_path is not None:
             plot_path.mkdir(parents=True, exist_ok=True)
 
+        # 一旦写过 pages.pack 就沿用它，已有的 page_N.xml 会先并入包中
+        pack: PagePack | None = PagePack(ocr_path / PAGES_PACK_FILE_NAME)
+        if not packed_pages and not pack.exists():
+            pack = None
+
         done_path = ocr_path / "done"
         did_ignore_any: bool = False
         if done_path.exists():
             return
+        if pack is not None:
+            _pack_xml_pages(ocr_path, pack)
 
-        remain_tokens: int | None = max_tokens
-        remain_output_tokens: int | None = max_output_tokens
+        budget = OCRTokensBudget(max_tokens, max_output_tokens)
 
         with PageRefContext(
             pdf_path=pdf_path,
             pdf_handler=self._get_pdf_handler(),
         ) as refs:
             pages_count = refs.pages_count
-            asset_hub = AssetHub(asset_path)
+            asset_hub = AssetHub(asset_path, background_writes=True)
+            all_refs = list(refs)
+            pending_refs = [
+                ref
+                for ref in all_refs
+                if ref.page_index in page_indexes
+                and not _is_page_saved(ocr_path, pack, ref.page_index)
+            ]
+            pending_indexes = set(ref.page_index for ref in pending_refs)
+
+            renderer = refs.renderer(
+                refs=pending_refs,
+                dpi=dpi if dpi is not None else 300,  # DPI=300 for scanned page
+                max_image_file_size=max_page_image_file_size,
+            )
 
-            for ref in refs:
-                check_aborted(aborted)
-                start_time = time.perf_counter()
-                yield OCREvent(
-                    kind=OCREventKind.START,
+            def extract(
+                ref: PageRef,
+                image: Image,
+                device: int | None,
+                stopped: AbortedCheck,
+            ) -> Page:
+                cache_key: str | None = None
+                if self._cache is not None:
+                    cache_key = self._cache.key(image, self._ocr, ocr_size, includes_footnotes)
+                    cached_page = self._cache.load(cache_key, ref.page_index, asset_path)
+                    if cached_page is not None:
+                        if ref.page_index == 1:
+                            cached_page.image = image
+                        return cached_page
+
+                budget.check()
+                remain_tokens, remain_output_tokens = budget.remain()
+                page = self._extractor.image2page(
+                    image=image,
                     page_index=ref.page_index,
-                    total_pages=pages_count,
+                    asset_hub=asset_hub,
+                    ocr_size=ocr_size,
+                    includes_footnotes=includes_footnotes,
+                    includes_raw_image=(ref.page_index == 1),
+                    plot_path=plot_path,
+                    max_tokens=remain_tokens,
+                    max_output_tokens=remain_output_tokens,
+                    device_number=device,
+                    aborted=lambda: stopped() or aborted(),
                 )
-                if ref.page_index not in page_indexes:
-                    elapsed_ms = int((time.perf_counter() - start_time) * 1000)
-                    did_ignore_any = True
-                    yield OCREvent(
-                        kind=OCREventKind.IGNORE,
-                        page_index=ref.page_index,
-                        total_pages=pages_count,
-                        cost_time_ms=elapsed_ms,
-                    )
-                    continue
-
-                filename = f"page_{ref.page_index}.xml"
-                file_path = ocr_path / filename
-
-                if file_path.exists():
-                    elapsed_ms = int((time.perf_counter() - start_time) * 1000)
+                budget.consume(page)
+                if self._cache is not None and cache_key is not None:
+                    asset_hub.flush()
+                    self._cache.store(cache_key, page, asset_path)
+                return page
+
+            ocr_jobs = create_ocr_jobs(
+                render=renderer.render,
+                extract=extract,
+                devices=self._extractor.worker_devices(ocr_workers, device_number),
+                prefetch_pages=prefetch_pages,
+            )
+            try:
+                jobs = ocr_jobs.run(pending_refs)
+                for ref in all_refs:
+                    check_aborted(aborted)
+                    start_time = time.perf_counter()
                     yield OCREvent(
-                        kind=OCREventKind.SKIP,
+                        kind=OCREventKind.START,
                         page_index=ref.page_index,
                         total_pages=pages_count,
-                        cost_time_ms=elapsed_ms,
                     )
-                else:
-                    from doc_page_extractor.extraction_context import TokenLimitError
+                    if ref.page_index not in page_indexes:
+                        elapsed_ms = int((time.perf_counter() - start_time) * 1000)
+                        did_ignore_any = True
+                        yield OCREvent(
+                            kind=OCREventKind.IGNORE,
+                            page_index=ref.page_index,
+                            total_pages=pages_count,
+                            cost_time_ms=elapsed_ms,
+                        )
+                        continue
 
-                    if remain_tokens is not None and remain_tokens <= 0:
-                        raise TokenLimitError()
-                    if remain_output_tokens is not None and remain_output_tokens <= 0:
-                        raise TokenLimitError()
+                    if ref.page_index not in pending_indexes:
+                        elapsed_ms = int((time.perf_counter() - start_time) * 1000)
+                        yield OCREvent(
+                            kind=OCREventKind.SKIP,
+                            page_index=ref.page_index,
+                            total_pages=pages_count,
+                            cost_time_ms=elapsed_ms,
+                        )
+                        continue
 
+                    # 预算只在 worker 开始识别前检查：已识别完（已付费）的页仍会落盘，之后的页才抛出 TokenLimitError
+                    job = next(jobs)
                     page: Page | None = None
                     image: Image | None = None
                     recognized_error: Exception | None = None
 
                     try:
-                        image = ref.render(
-                            dpi=dpi
-                            if dpi is not None
-                            else 300,  # DPI=300 for scanned page
-                            max_image_file_size=max_page_image_file_size,
-                        )
+                        image = job.image()
                         self._last_page_pixel_sizes[ref.page_index] = image.size
                         yield OCREvent(
                             kind=OCREventKind.RENDERED,
@@ -161,19 +228,7 @@ class OCR:
                             input_tokens=0,
                             output_tokens=0,
                         )
-                        page = self._extractor.image2page(
-                            image=image,
-                            page_index=ref.page_index,
-                            asset_hub=asset_hub,
-                            ocr_size=ocr_size,
-                            includes_footnotes=includes_footnotes,
-                            includes_raw_image=(ref.page_index == 1),
-                            plot_path=plot_path,
-                            max_tokens=remain_tokens,
-                            max_output_tokens=remain_output_tokens,
-                            device_number=device_number,
-                            aborted=aborted,
-                        )
+                        page = job.page()
                     except PDFError as error:
                         if not _check_ignore_error(ignore_pdf_errors, error):
                             raise
@@ -191,7 +246,12 @@ class OCR:
                             image=image,
                         )
 
-                    save_xml(encode(page), file_path)
+                    # 页 XML 落盘前，其引用的资源必须已写完，否则断点续跑会读到缺失的图片
+                    asset_hub.flush()
+                    if pack is not None:
+                        pack.append(page)
+                    else:
+                        save_xml(encode(page), ocr_path / f"page_{ref.page_index}.xml")
                     self._save_page_pixel_sizes(geometry_path)
 
                     if cover_path and page.image:
@@ -209,12 +269,10 @@ class OCR:
                         input_tokens=page.input_tokens,
                         output_tokens=page.output_tokens,
                     )
-                    if remain_tokens is not None:
-                        remain_tokens -= page.input_tokens
-                        remain_tokens -= page.output_tokens
-
-                    if remain_output_tokens is not None:
-                        remain_output_tokens -= page.output_tokens
+            finally:
+                ocr_jobs.close()
+                renderer.close()
+                asset_hub.close()
 
         if not did_ignore_any:
             done_path.touch()
@@ -308,6 +366,30 @@ class OCR:
         )
 
 
+def _pack_xml_pages(ocr_path: Path, pack: PagePack) -> None:
+    # 按文件名先排除已在包中的页，只解析新页；入包后删除 XML，下次续跑无需再扫描
+    xml_pages: list[tuple[int, Path]] = []
+    for xml_path in ocr_path.glob("page_*.xml"):
+        match = _PAGE_XML_PATTERN.match(xml_path.name)
+        if match is not None:
+            xml_pages.append((int(match.group(1)), xml_path))
+    for page_index, xml_path in sorted(xml_pages):
+        if page_index not in pack:
+            try:
+                page = decode(read_xml(xml_path))
+            except Exception as e:
+                raise ValueError(f"Failed to decode from: {xml_path}") from e
+            pack.append(page)
+        xml_path.unlink()
+
+
+def _is_page_saved(ocr_path: Path, pack: PagePack | None, page_index: int) -> bool:
+    if pack is not None:
+        return page_index in pack
+    return (ocr_path / f"page_{page_index}.xml").exists()
+
+
+_PAGE_XML_PATTERN = re.compile(r"^page_(\d+)\.xml$")
 _T = TypeVar("_T", bound=Exception)
 
 
@@ -0,0 +1,170 @@
+import hashlib
+import json
+import os
+import shutil
+import uuid
+from dataclasses import fields
+from pathlib import Path
+from threading import Lock
+
+from PIL.Image import Image
+
+from ..common import read_xml, save_xml
+from ..ocr_config import OCRConfig
+from .types import DeepSeekOCRSize, Page, decode, encode
+
+_CACHE_VERSION = 1
+_PAGE_FILE_NAME = "page.xml"
+
+# 不影响识别结果的字段（密钥、路径、设备、超时）不参与缓存 key
+_IGNORED_CONFIG_FIELDS = frozenset(
+    (
+        "api_key",
+        "ak",
+        "sk",
+        "models_cache_path",
+        "local_only",
+        "enable_devices_numbers",
+        "timeout_seconds",
+        "poll_interval_seconds",
+    )
+)
+
+
+class OCRCache:
+    """Content-addressed OCR results shared across analysing directories.
+
+    Entries are keyed by the rendered page pixels, the OCR config identity,
+    ``ocr_size`` and ``includes_footnotes``. Each entry directory holds the
+    encoded page XML and the assets it references. When ``max_size`` (bytes) is
+    set, the least recently used entries are evicted after each store.
+    """
+
+    def __init__(self, cache_path: Path, max_size: int | None = None) -> None:
+        if max_size is not None and max_size <= 0:
+            raise ValueError("max_size must be positive.")
+        self._entries_path = cache_path / "entries"
+        self._max_size: int | None = max_size
+        self._lock = Lock()
+        self._total_size: int | None = None
+
+    def key(
+        self,
+        image: Image,
+        ocr: OCRConfig,
+        ocr_size: DeepSeekOCRSize,
+        includes_footnotes: bool,
+    ) -> str:
+        identity = {
+            "version": _CACHE_VERSION,
+            "config": _config_identity(ocr),
+            "ocr_size": ocr_size,
+            "includes_footnotes": includes_footnotes,
+            "mode": image.mode,
+            "size": list(image.size),
+        }
+        sha256 = hashlib.sha256()
+        sha256.update(json.dumps(identity, sort_keys=True).encode("utf-8"))
+        sha256.update(image.tobytes())
+        return sha256.hexdigest()
+
+    def load(self, key: str, page_index: int, asset_path: Path) -> Page | None:
+        entry_path = self._entries_path / key
+        page_path = entry_path / _PAGE_FILE_NAME
+        try:
+            page = decode(read_xml(page_path))
+            for layout in (*page.body_layouts, *page.footnotes_layouts):
+                if layout.hash is None:
+                    continue
+                target_path = asset_path / f"{layout.hash}.png"
+                if not target_path.exists():
+                    asset_path.mkdir(parents=True, exist_ok=True)
+                    shutil.copyfile(entry_path / f"{layout.hash}.png", target_path)
+            os.utime(page_path)  # 记录最近使用时间，供 LRU 淘汰
+        except (OSError, ValueError):
+            return None
+
+        # 命中缓存不消耗 token
+        page.index = page_index
+        page.input_tokens = 0
+        page.output_tokens = 0
+        return page
+
+    def store(self, key: str, page: Page, asset_path: Path) -> None:
+        self._entries_path.mkdir(parents=True, exist_ok=True)
+        entry_path = self._entries_path / key
+        if entry_path.exists():
+            return
+
+        temp_path = self._entries_path / f"{key}.{uuid.uuid4().hex}.temp"
+        try:
+            temp_path.mkdir()
+            for layout in (*page.body_layouts, *page.footnotes_layouts):
+                if layout.hash is not None:
+                    shutil.copyfile(
+                        asset_path / f"{layout.hash}.png",
+                        temp_path / f"{layout.hash}.png",
+                    )
+            save_xml(encode(page), temp_path / _PAGE_FILE_NAME)
+            entry_size = _dir_size(temp_path)
+            temp_path.rename(entry_path)
+        except OSError:
+            # 并发写入同一个 key 或磁盘问题都不应影响识别本身
+            shutil.rmtree(temp_path, ignore_errors=True)
+            return
+
+        with self._lock:
+            if self._total_size is not None:
+                self._total_size += entry_size
+        self._evict()
+
+    def _evict(self) -> None:
+        if self._max_size is None:
+            return
+        with self._lock:
+            if self._total_size is None:
+                self._total_size = sum(
+                    _dir_size(entry_path) for entry_path in self._iter_entries()
+                )
+            if self._total_size <= self._max_size:
+                return
+
+            entries: list[tuple[float, Path]] = []
+            for entry_path in self._iter_entries():
+                try:
+                    entries.append(((entry_path / _PAGE_FILE_NAME).stat().st_mtime, entry_path))
+                except OSError:
+                    continue
+            entries.sort(key=lambda entry: entry[0])
+
+            for _, entry_path in entries:
+                if self._total_size <= self._max_size:
+                    break
+                entry_size = _dir_size(entry_path)
+                shutil.rmtree(entry_path, ignore_errors=True)
+                self._total_size -= entry_size
+
+    def _iter_entries(self):
+        if not self._entries_path.exists():
+            return
+        for entry_path in self._entries_path.iterdir():
+            if entry_path.is_dir() and not entry_path.name.endswith(".temp"):
+                yield entry_path
+
+
+def _config_identity(ocr: OCRConfig) -> dict[str, object]:
+    identity: dict[str, object] = {"type": type(ocr).__name__}
+    for field in fields(ocr):
+        if field.name not in _IGNORED_CONFIG_FIELDS:
+            identity[field.name] = getattr(ocr, field.name)
+    return identity
+
+
+def _dir_size(path: Path) -> int:
+    size = 0
+    try:
+        for file_path in path.iterdir():
+            size += file_path.stat().st_size
+    except OSError:
+        pass
+    return size
@@ -0,0 +1,179 @@
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from queue import Queue
+from threading import Event, Lock
+from typing import Callable, Generator, Iterable, Protocol
+
+from PIL.Image import Image
+
+from ..metering import AbortedCheck
+from .page_ref import PageRef
+from .types import Page
+
+RenderPage = Callable[[PageRef], Image]
+ExtractPage = Callable[[PageRef, Image, int | None, AbortedCheck], Page]
+
+
+class OCRTokensBudget:
+    """Token limits shared by every OCR worker of one ``OCR.recognize`` run.
+
+    A page only starts while budget remains, and each finished page is charged
+    as soon as its worker returns. Pages already in flight when the budget runs
+    out are allowed to finish and are still saved, so a parallel run may
+    overshoot by those pages.
+    """
+
+    def __init__(self, max_tokens: int | None, max_output_tokens: int | None) -> None:
+        self._lock = Lock()
+        self._remain_tokens: int | None = max_tokens
+        self._remain_output_tokens: int | None = max_output_tokens
+
+    def remain(self) -> tuple[int | None, int | None]:
+        with self._lock:
+            return self._remain_tokens, self._remain_output_tokens
+
+    def check(self) -> None:
+        from doc_page_extractor.extraction_context import TokenLimitError
+
+        remain_tokens, remain_output_tokens = self.remain()
+        if remain_tokens is not None and remain_tokens <= 0:
+            raise TokenLimitError()
+        if remain_output_tokens is not None and remain_output_tokens <= 0:
+            raise TokenLimitError()
+
+    def consume(self, page: Page) -> None:
+        with self._lock:
+            if self._remain_tokens is not None:
+                self._remain_tokens -= page.input_tokens
+                self._remain_tokens -= page.output_tokens
+            if self._remain_output_tokens is not None:
+                self._remain_output_tokens -= page.output_tokens
+
+
+class PageJob(Protocol):
+    def image(self) -> Image: ...
+
+    def page(self) -> Page: ...
+
+
+class OCRJobs(Protocol):
+    def run(self, refs: Iterable[PageRef]) -> Generator[PageJob, None, None]: ...
+
+    def close(self) -> None: ...
+
+
+def create_ocr_jobs(
+    render: RenderPage,
+    extract: ExtractPage,
+    devices: list[int | None],
+    prefetch_pages: int,
+) -> OCRJobs:
+    if len(devices) == 1 and prefetch_pages == 0:
+        return _InlineJobs(render, extract, devices[0])
+    return _PipelinedJobs(render, extract, devices, prefetch_pages)
+
+
+class _InlineJob:
+    def __init__(
+        self,
+        ref: PageRef,
+        render: RenderPage,
+        extract: ExtractPage,
+        device_number: int | None,
+    ) -> None:
+        self._ref = ref
+        self._render = render
+        self._extract = extract
+        self._device_number = device_number
+        self._image: Image | None = None
+
+    def image(self) -> Image:
+        if self._image is None:
+            self._image = self._render(self._ref)
+        return self._image
+
+    def page(self) -> Page:
+        return self._extract(self._ref, self.image(), self._device_number, lambda: False)
+
+
+class _InlineJobs:
+    # 渲染与识别都推迟到调用方取结果时，在调用方线程中执行，与串行流程完全一致
+    def __init__(self, render: RenderPage, extract: ExtractPage, device_number: int | None) -> None:
+        self._render = render
+        self._extract = extract
+        self._device_number = device_number
+
+    def run(self, refs: Iterable[PageRef]) -> Generator[PageJob, None, None]:
+        for ref in refs:
+            yield _InlineJob(ref, self._render, self._extract, self._device_number)
+
+    def close(self) -> None:
+        pass
+
+
+class _PipelinedJob:
+    def __init__(self, rendered: Future[Image], extracted: Future[Page]) -> None:
+        self._rendered = rendered
+        self._extracted = extracted
+
+    def image(self) -> Image:
+        return self._rendered.result()
+
+    def page(self) -> Page:
+        return self._extracted.result()
+
+
+class _PipelinedJobs:
+    # 单线程按页序渲染（PDFDocument 不保证线程安全），识别交给每个设备一个的 worker。
+    # 调用方按页序取结果，因此事件顺序与串行流程一致。
+    def __init__(
+        self,
+        render: RenderPage,
+        extract: ExtractPage,
+        devices: list[int | None],
+        prefetch_pages: int,
+    ) -> None:
+        self._render = render
+        self._extract = extract
+        self._stopped = Event()
+        self._devices: Queue[int | None] = Queue()
+        for device_number in devices:
+            self._devices.put(device_number)
+        # 调用方正在等待的那一页之外，还允许多少页已提交
+        self._ahead_pages: int = len(devices) - 1 + prefetch_pages
+        self._render_executor = ThreadPoolExecutor(
+            max_workers=1,
+            thread_name_prefix="pdf-craft-render",
+        )
+        self._ocr_executor = ThreadPoolExecutor(
+            max_workers=len(devices),
+            thread_name_prefix="pdf-craft-ocr",
+        )
+
+    def run(self, refs: Iterable[PageRef]) -> Generator[PageJob, None, None]:
+        refs_iter = iter(refs)
+        in_flight: deque[PageJob] = deque()
+        ref = next(refs_iter, None)
+        while ref is not None or in_flight:
+            while ref is not None and len(in_flight) <= self._ahead_pages:
+                in_flight.append(self._submit(ref))
+                ref = next(refs_iter, None)
+            yield in_flight.popleft()
+
+    def close(self) -> None:
+        self._stopped.set()
+        self._render_executor.shutdown(wait=True, cancel_futures=True)
+        self._ocr_executor.shutdown(wait=True, cancel_futures=True)
+
+    def _submit(self, ref: PageRef) -> PageJob:
+        rendered = self._render_executor.submit(self._render, ref)
+        extracted = self._ocr_executor.submit(self._extract_rendered, ref, rendered)
+        return _PipelinedJob(rendered, extracted)
+
+    def _extract_rendered(self, ref: PageRef, rendered: Future[Image]) -> Page:
+        image = rendered.result()
+        device_number = self._devices.get()
+        try:
+            return self._extract(ref, image, device_number, self._stopped.is_set)
+        finally:
+            self._devices.put(device_number)
@@ -1,6 +1,7 @@
 import re
 import tempfile
 from pathlib import Path
+from threading import Lock
 
 from PIL.Image import Image
 
@@ -16,7 +17,7 @@ from ..ocr_config import (
     UnlimitedOCRLocalConfig,
     UnlimitedOCRVendorConfig,
 )
-from .ngrams import has_repetitive_ngrams
+from .ngrams import RepetitionRule, find_repetitive_ngrams
 from .types import DeepSeekOCRSize, Page, PageLayout
 
 _LAYOUT_KIND_TO_REF = {
@@ -32,6 +33,13 @@ _LAYOUT_KIND_TO_REF = {
     "aside": "text",
 }
 
+_REPETITION_RULES = (
+    # 检测短模式重复（如 "1.1.1.1."）
+    RepetitionRule(min_ngram=2, max_ngram=5, repeat_threshold=16),
+    # 检测长模式重复（保守策略）
+    RepetitionRule(min_ngram=6, max_ngram=20, repeat_threshold=8),
+)
+
 _LOCAL_OCR_CONFIG_TYPES = (
     DeepSeekOCRLocalConfig,
     DeepSeekOCR2LocalConfig,
@@ -43,10 +51,13 @@ class PageExtractorNode:
     def __init__(self, ocr: OCRConfig) -> None:
         self._ocr = ocr
         self._page_extractor = None
+        self._page_extractor_lock = Lock()
 
     def _get_page_extractor(self):
         if not self._page_extractor:
-            self._page_extractor = self._create_page_extractor()
+            with self._page_extractor_lock:
+                if not self._page_extractor:
+                    self._page_extractor = self._create_page_extractor()
         return self._page_extractor
 
     def _create_page_extractor(self):
@@ -144,6 +155,20 @@ class PageExtractorNode:
             raise RuntimeError("load_models is only available for local OCR.")
         self._get_page_extractor().load_ocr_model()
 
+    def worker_devices(
+        self, workers: int, device_number: int | None
+    ) -> list[int | None]:
+        # 本地模型每个设备一个 worker；供应商接口则按 workers 开线程
+        if not isinstance(self._ocr, _LOCAL_OCR_CONFIG_TYPES):
+            return [device_number] * workers
+        # 单个 worker 时沿用调用方给定的设备（默认 None），与串行流程一致
+        if workers <= 1 or device_number is not None:
+            return [device_number]
+        devices = self._ocr.enable_devices_numbers
+        if not devices:
+            return [None]
+        return list(devices[:workers])
+
     def image2page(
         self,
         image: Image,
@@ -263,16 +288,7 @@ class PageExtractorNode:
             if det is None:
                 continue
 
-            # 检测短模式重复（如 "1.1.1.1."）
-            if has_repetitive_ngrams(
-                text, min_ngram=2, max_ngram=5, repeat_threshold=16
-            ):
-                continue
-
-            # 检测长模式重复（保守策略）
-            if has_repetitive_ngrams(
-                text, min_ngram=6, max_ngram=20, repeat_threshold=8
-            ):
+            if any(find_repetitive_ngrams(text, _REPETITION_RULES)):
                 continue
 
             if stage_index != 1 and ref in ASSET_TAGS:
@@ -0,0 +1,152 @@
+import json
+import struct
+from pathlib import Path
+from threading import Lock
+from typing import Any
+
+from .types import Page, PageLayout
+
+PAGES_PACK_FILE_NAME = "pages.pack"
+
+_MAGIC = b"PDFCPK\x00\x01"
+_RECORD_HEADER = struct.Struct("<II")  # page_index, payload length
+
+
+class PagePack:
+    """All OCR pages of a book in one append-only file.
+
+    The file starts with a magic header, followed by records made of a
+    ``<II`` header (page index, payload length) and a compact JSON payload.
+    Opening the pack only scans record headers to build a page-offset index,
+    so any page can then be read with a single seek. A later record for the
+    same page replaces the earlier one, and a torn tail left by an interrupted
+    write is ignored and cut off before the next append.
+    """
+
+    def __init__(self, pack_path: Path) -> None:
+        self._pack_path = pack_path
+        self._lock = Lock()
+        self._offsets: dict[int, tuple[int, int]] | None = None
+        self._end: int = len(_MAGIC)
+
+    @property
+    def path(self) -> Path:
+        return self._pack_path
+
+    def exists(self) -> bool:
+        return self._pack_path.exists()
+
+    def indexes(self) -> list[int]:
+        return sorted(self._get_offsets().keys())
+
+    def __contains__(self, page_index: int) -> bool:
+        return page_index in self._get_offsets()
+
+    def read(self, page_index: int) -> Page:
+        offset, length = self._get_offsets()[page_index]
+        with open(self._pack_path, "rb") as file:
+            file.seek(offset)
+            payload = file.read(length)
+        try:
+            return _decode_page(json.loads(payload.decode("utf-8")))
+        except Exception as e:
+            raise ValueError(
+                f"Failed to decode page {page_index} from: {self._pack_path}"
+            ) from e
+
+    def append(self, page: Page) -> None:
+        payload = json.dumps(
+            _encode_page(page),
+            ensure_ascii=False,
+            separators=(",", ":"),
+        ).encode("utf-8")
+
+        with self._lock:
+            offsets = self._get_offsets()
+            self._pack_path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self._pack_path, "r+b" if self._pack_path.exists() else "w+b") as file:
+                if self._end == len(_MAGIC):
+                    file.seek(0)
+                    file.write(_MAGIC)
+                file.truncate(self._end)  # 丢弃上次中断留下的半条记录
+                file.seek(self._end)
+                file.write(_RECORD_HEADER.pack(page.index, len(payload)))
+                file.write(payload)
+            offset = self._end + _RECORD_HEADER.size
+            offsets[page.index] = (offset, len(payload))
+            self._end = offset + len(payload)
+
+    def _get_offsets(self) -> dict[int, tuple[int, int]]:
+        if self._offsets is None:
+            self._offsets = self._scan()
+        return self._offsets
+
+    def _scan(self) -> dict[int, tuple[int, int]]:
+        offsets: dict[int, tuple[int, int]] = {}
+        self._end = len(_MAGIC)
+        if not self._pack_path.exists():
+            return offsets
+
+        with open(self._pack_path, "rb") as file:
+            magic = file.read(len(_MAGIC))
+            if magic != _MAGIC:
+                if _MAGIC.startswith(magic):
+                    return offsets  # 文件头本身没写完，视为空包
+                raise ValueError(f"Not a page pack file: {self._pack_path}")
+            file_size = file.seek(0, 2)
+            offset = len(_MAGIC)
+            while offset + _RECORD_HEADER.size <= file_size:
+                file.seek(offset)
+                page_index, length = _RECORD_HEADER.unpack(
+                    file.read(_RECORD_HEADER.size)
+                )
+                payload_offset = offset + _RECORD_HEADER.size
+                if payload_offset + length > file_size:
+                    break
+                offsets[page_index] = (payload_offset, length)
+                offset = payload_offset + length
+            self._end = offset
+        return offsets
+
+
+def _encode_page(page: Page) -> dict[str, Any]:
+    return {
+        "index": page.index,
+        "input_tokens": page.input_tokens,
+        "output_tokens": page.output_tokens,
+        "body": [_encode_layout(layout) for layout in page.body_layouts],
+        "footnotes": [_encode_layout(layout) for layout in page.footnotes_layouts],
+    }
+
+
+def _decode_page(data: dict[str, Any]) -> Page:
+    return Page(
+        index=int(data["index"]),
+        image=None,
+        body_layouts=[
+            _decode_layout(item, order) for order, item in enumerate(data["body"])
+        ],
+        footnotes_layouts=[
+            _decode_layout(item, order) for order, item in enumerate(data["footnotes"])
+        ],
+        input_tokens=int(data["input_tokens"]),
+        output_tokens=int(data["output_tokens"]),
+    )
+
+
+def _encode_layout(layout: PageLayout) -> list[Any]:
+    # 与 XML 格式保持一致：读取时文本会被 strip
+    return [layout.ref, list(layout.det), layout.text.strip(), layout.hash]
+
+
+def _decode_layout(item: list[Any], order: int) -> PageLayout:
+    ref, det, text, hash_value = item
+    if len(det) != 4:
+        raise ValueError(f"det must have 4 values, got {len(det)}")
+    return PageLayout(
+        ref=ref,
+        det=(int(det[0]), int(det[1]), int(det[2]), int(det[3])),
+        text=text,
+        order=order,
+        hash=hash_value,
+    )
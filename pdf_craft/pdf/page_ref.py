@@ -1,6 +1,7 @@
+from collections import deque
 from os import PathLike
 from pathlib import Path
-from typing import Generator
+from typing import Callable, Generator, Iterable, Iterator, cast
 
 from PIL.Image import Image
 
@@ -65,6 +66,111 @@ class PageRefContext:
                 page_index=i + 1,
             )
 
+    def renderer(
+        self,
+        refs: Iterable["PageRef"],
+        dpi: int,
+        max_image_file_size: int | None = None,
+    ) -> "PageRefRenderer":
+        assert self._document is not None
+        return PageRefRenderer(
+            document=self._document,
+            refs=refs,
+            dpi=dpi,
+            max_image_file_size=max_image_file_size,
+        )
+
+
+_RenderPages = Callable[[Iterable[int], int], Iterator[Image]]
+
+
+class PageRefRenderer:
+    """Renders the given refs in order through the document's bulk ``render_pages``.
+
+    Consecutive refs that share a DPI are read from one ``render_pages`` stream.
+    Refs requested out of order, and documents without ``render_pages``, fall
+    back to ``PageRef.render``. A failed page raises ``PDFError`` and the next
+    page opens a fresh stream.
+    """
+
+    def __init__(
+        self,
+        document: PDFDocument,
+        refs: Iterable["PageRef"],
+        dpi: int,
+        max_image_file_size: int | None,
+    ) -> None:
+        self._render_pages: _RenderPages | None = cast(
+            _RenderPages | None, getattr(document, "render_pages", None)
+        )
+        self._pending: deque[PageRef] = deque(refs)
+        self._dpi = dpi
+        self._max_image_file_size = max_image_file_size
+        self._stream: Iterator[Image] | None = None
+        self._stream_pages: int = 0
+
+    def render(self, ref: "PageRef") -> Image:
+        if self._render_pages is None or not self._pending or self._pending[0] is not ref:
+            self._close_stream()
+            if ref in self._pending:
+                self._pending.remove(ref)
+            return ref.render(
+                dpi=self._dpi,
+                max_image_file_size=self._max_image_file_size,
+            )
+
+        self._pending.popleft()
+        try:
+            if self._stream is None:
+                self._open_stream(ref)
+            assert self._stream is not None
+            image = next(self._stream)
+            self._stream_pages -= 1
+            if self._stream_pages <= 0:
+                self._close_stream()
+            if image.mode != "RGB":
+                image = image.convert("RGB")
+            return image
+
+        except PDFError as error:
+            self._close_stream()
+            error.page_index = ref.page_index
+            raise error
+
+        except Exception as error:
+            self._close_stream()
+            raise PDFError(
+                f"Failed to render page {ref.page_index}.",
+                page_index=ref.page_index,
+            ) from error
+
+    def close(self) -> None:
+        self._close_stream()
+        self._pending.clear()
+
+    def _open_stream(self, ref: "PageRef") -> None:
+        assert self._render_pages is not None
+        dpi = ref.dpi(self._dpi, self._max_image_file_size)
+        page_indexes: list[int] = [ref.page_index]
+        for next_ref in self._pending:
+            try:
+                next_dpi = next_ref.dpi(self._dpi, self._max_image_file_size)
+            except Exception:
+                break  # 留给该页自己的流去报告错误
+            if next_dpi != dpi:
+                break
+            page_indexes.append(next_ref.page_index)
+        self._stream = iter(self._render_pages(page_indexes, dpi))
+        self._stream_pages = len(page_indexes)
+
+    def _close_stream(self) -> None:
+        stream = self._stream
+        self._stream = None
+        self._stream_pages = 0
+        close = getattr(stream, "close", None)
+        if close is not None:
+            close()
+
 
 _PNG_COMPRESSION_RATIO = 0.5  # Conservative estimate for document images
 _BYTES_PER_PIXEL = 3  # RGB
@@ -83,22 +189,24 @@ class PageRef:
     def page_index(self) -> int:
         return self._page_index
 
+    def dpi(self, dpi: int, max_image_file_size: int | None = None) -> int:
+        if max_image_file_size is None:
+            return dpi
+        width_inch, height_inch = self._document.page_size(self._page_index)
+        max_dpi = round(
+            self._dpi_with_size(
+                file_size=max_image_file_size,
+                width_inch=width_inch,
+                height_inch=height_inch,
+            )
+        )
+        return min(dpi, max_dpi)
+
     def render(self, dpi: int, max_image_file_size: int | None = None) -> Image:
         try:
-            if max_image_file_size is not None:
-                width_inch, height_inch = self._document.page_size(self._page_index)
-                max_dpi = round(
-                    self._dpi_with_size(
-                        file_size=max_image_file_size,
-                        width_inch=width_inch,
-                        height_inch=height_inch,
-                    )
-                )
-                dpi = min(dpi, max_dpi)
-
             return self._document.render_page(
                 page_index=self._page_index,
-                dpi=dpi,
+                dpi=self.dpi(dpi, max_image_file_size),
             )
         except PDFError as error:
             error.page_index = self._page_index
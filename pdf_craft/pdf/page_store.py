@@ -0,0 +1,35 @@
+from pathlib import Path
+
+from ..common import XMLReader
+from .page_pack import PAGES_PACK_FILE_NAME, PagePack
+from .types import Page, decode
+
+
+class PageStore(XMLReader[Page]):
+    """Reads OCR pages, decoding each one at most once.
+
+    Pages come from ``pages.pack`` when the OCR step wrote one, otherwise from
+    the ``page_N.xml`` files. TOC analysis and chapter generation iterate the
+    OCR pages many times; sharing one store turns every read after the first
+    into a memory lookup. Readers must treat the returned pages as read-only.
+    """
+
+    def __init__(self, pages_path: Path) -> None:
+        super().__init__(prefix="page", dir_path=pages_path, decode=decode)
+        self._pack = PagePack(pages_path / PAGES_PACK_FILE_NAME)
+        self._pages: dict[int, Page] = {}
+
+    def _indexes(self) -> list[int]:
+        if self._pack.exists():
+            return self._pack.indexes()
+        return super()._indexes()
+
+    def _load(self, index: int) -> Page:
+        page = self._pages.get(index)
+        if page is None:
+            if self._pack.exists():
+                page = self._pack.read(index)
+            else:
+                page = super()._load(index)
+            self._pages[index] = page
+        return page
@@ -1,5 +1,8 @@
-from .translation.translator import translate
+from .translation.translator import TranslationPlan, collect, plan, translate
 
 translate_epub = translate
+plan_epub_translation = plan
+collect_epub_translation = collect
 
-__all__ = ["translate", "translate_epub"]
+__all__ = ["collect", "collect_epub_translation", "plan", "plan_epub_translation", "translate", "translate_epub",
+           "TranslationPlan"]
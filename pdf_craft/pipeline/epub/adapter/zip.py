@@ -1,41 +1,62 @@
+import struct
+import sys
+import threading
+import time
 import zipfile
+from copy import copy
 from pathlib import Path
-from typing import IO
+from shutil import copyfileobj
+from tempfile import TemporaryDirectory
+from typing import IO, Any
 
-_BUFFER_SIZE = 8192  # 8KB
+_BUFFER_SIZE = 1024 * 1024  # 1MB
+_MIMETYPE = "mimetype"
+_LOCAL_HEADER_SIZE = 30
+_DATA_DESCRIPTOR_FLAG = 0x08
+
+# zipfile 没有写入已压缩数据的公开接口，原样拷贝依赖其内部实现，只在验证过的版本上启用
+_RAW_COPY_VERSIONS = ((3, 11), (3, 12), (3, 13))
+_RAW_COPY = sys.version_info[:2] in _RAW_COPY_VERSIONS
 
 
 class Zip:
-    def __init__(self, source_path: Path, target_path: Path) -> None:
-        source_zip: zipfile.ZipFile | None = None
-        target_zip: zipfile.ZipFile | None = None
-        try:
-            source_zip = zipfile.ZipFile(source_path, "r")
-            target_zip = zipfile.ZipFile(target_path, "w", zipfile.ZIP_DEFLATED)
-        except Exception:
-            if source_zip:
-                source_zip.close()
-            if target_zip:
-                target_zip.close()
-            raise
-        self._source_zip: zipfile.ZipFile = source_zip
-        self._target_zip: zipfile.ZipFile = target_zip
-        self._processed_files: set[Path] = set()
+    """Copies ``source_path`` to ``target_path`` with some files replaced.
+
+    Replaced files are staged on disk and may be written from any thread in
+    any order. The target is assembled on exit in the entry order of the
+    source, with ``mimetype`` first; untouched entries are copied as their
+    raw compressed bytes, without decompressing them, on the CPython versions
+    whose ``zipfile`` internals this was verified against, and re-compressed
+    elsewhere.
+
+    Without ``target_path`` the zip is opened read-only: ``replace`` raises
+    and nothing is written on exit.
+    """
+
+    def __init__(self, source_path: Path, target_path: Path | None = None) -> None:
+        self._source_path: Path = source_path
+        self._target_path: Path | None = target_path
+        self._source_zip: zipfile.ZipFile = zipfile.ZipFile(source_path, "r")
+        self._staging: TemporaryDirectory[str] | None = None
+        if target_path is not None:
+            try:
+                self._staging = TemporaryDirectory(prefix=f"{target_path.stem}-", dir=target_path.parent)
+            except Exception:
+                self._source_zip.close()
+                raise
+        self._staged_files: dict[str, Path] = {}
+        self._staged_lock: threading.Lock = threading.Lock()
 
     def __enter__(self):
         return self
 
     def __exit__(self, _exc_type, _exc_val, _exc_tb):
         try:
-            if _exc_type is None:
-                all_files = self._source_zip.namelist()
-                for file_path in all_files:
-                    if file_path.endswith("/"):
-                        continue
-                    if Path(file_path) not in self._processed_files:
-                        self.migrate(Path(file_path))
+            if _exc_type is None and self._target_path is not None:
+                self._assemble(self._target_path)
         finally:
-            self._target_zip.close()
+            if self._staging is not None:
+                self._staging.cleanup()
             self._source_zip.close()
 
         return False
@@ -49,21 +70,93 @@ class Zip:
             prefix += "/"
         return [Path(f) for f in all_files if f.startswith(prefix)]
 
-    def migrate(self, path: Path):
-        path_str = path.as_posix()
-        source_info = self._source_zip.getinfo(path_str)
-        with self.read(path) as source_file:
-            content = source_file.read()
-        self._target_zip.writestr(
-            zinfo_or_arcname=source_info,
-            data=content,
-            compress_type=source_info.compress_type,
-        )
-        self._processed_files.add(path)
-
     def read(self, path: Path) -> IO[bytes]:
         return self._source_zip.open(path.as_posix(), "r")
 
     def replace(self, path: Path) -> IO[bytes]:
-        self._processed_files.add(path)
-        return self._target_zip.open(path.as_posix(), "w")
+        if self._staging is None:
+            raise RuntimeError("Zip was opened without a target path")
+        path_str = path.as_posix()
+        with self._staged_lock:
+            # Replacing a file again reuses its staged file, so the last write wins
+            staged_path = self._staged_files.get(path_str)
+            if staged_path is None:
+                staged_path = Path(self._staging.name) / str(len(self._staged_files))
+                self._staged_files[path_str] = staged_path
+        return open(staged_path, "wb")
+
+    def _assemble(self, target_path: Path) -> None:
+        names = [name for name in self._source_zip.namelist() if not name.endswith("/")]
+        names.sort(key=lambda name: name != _MIMETYPE)
+        names.extend(name for name in self._staged_files if name not in self._source_zip.NameToInfo)
+
+        with zipfile.ZipFile(target_path, "w", zipfile.ZIP_DEFLATED) as target_zip, \
+             open(self._source_path, "rb") as source_file:
+            for name in names:
+                staged_path = self._staged_files.get(name)
+                source_info = self._source_zip.NameToInfo.get(name)
+                if staged_path is not None:
+                    self._write_staged(target_zip, name, staged_path, source_info)
+                elif source_info is not None:
+                    self._copy_raw(target_zip, source_file, source_info)
+
+    def _write_staged(
+        self,
+        target_zip: zipfile.ZipFile,
+        name: str,
+        staged_path: Path,
+        source_info: zipfile.ZipInfo | None,
+    ) -> None:
+        if source_info is None:
+            target_info = zipfile.ZipInfo(name, date_time=time.localtime(time.time())[:6])
+        else:
+            target_info = zipfile.ZipInfo(name, date_time=source_info.date_time)
+            target_info.external_attr = source_info.external_attr
+        target_info.compress_type = zipfile.ZIP_DEFLATED
+        with open(staged_path, "rb") as staged_file, target_zip.open(target_info, "w") as target_file:
+            copyfileobj(staged_file, target_file, _BUFFER_SIZE)
+
+    def _copy_raw(self, target_zip: zipfile.ZipFile, source_file: IO[bytes], info: zipfile.ZipInfo) -> None:
+        if not _can_copy_raw(target_zip, info):
+            with self._source_zip.open(info, "r") as entry, target_zip.open(copy(info), "w") as target_file:
+                copyfileobj(entry, target_file, _BUFFER_SIZE)
+            return
+
+        source_file.seek(info.header_offset)
+        header = source_file.read(_LOCAL_HEADER_SIZE)
+        if len(header) != _LOCAL_HEADER_SIZE:
+            raise zipfile.BadZipFile(f"truncated local header: {info.filename}")
+        name_length, extra_length = struct.unpack("<2H", header[26:30])
+        source_file.seek(info.header_offset + _LOCAL_HEADER_SIZE + name_length + extra_length)
+
+        target_info = copy(info)
+        # Sizes and CRC are known, so they go into the local header instead of a data descriptor
+        target_info.flag_bits &= ~_DATA_DESCRIPTOR_FLAG
+
+        # zipfile only writes uncompressed data, so append the header and raw bytes the way it does
+        # pylint: disable=protected-access
+        writer: Any = target_zip
+        with writer._lock:
+            writer._writecheck(target_info)
+            writer._didModify = True
+            target_fp = target_zip.fp
+            assert target_fp is not None
+            target_info.header_offset = target_fp.tell()
+            target_fp.write(target_info.FileHeader(zip64=False))
+            remaining = info.compress_size
+            while remaining > 0:
+                chunk = source_file.read(min(_BUFFER_SIZE, remaining))
+                if not chunk:
+                    raise zipfile.BadZipFile(f"truncated entry: {info.filename}")
+                target_fp.write(chunk)
+                remaining -= len(chunk)
+            target_zip.filelist.append(target_info)
+            target_zip.NameToInfo[target_info.filename] = target_info
+            target_zip.start_dir = target_fp.tell()
+
+
+def _can_copy_raw(target_zip: zipfile.ZipFile, info: zipfile.ZipInfo) -> bool:
+    if not _RAW_COPY or not all(hasattr(target_zip, name) for name in ("_lock", "_writecheck", "_didModify")):
+        return False
+    # ZIP64 extra fields would have to be regenerated, so huge entries are re-compressed
+    return info.file_size <= zipfile.ZIP64_LIMIT and info.compress_size <= zipfile.ZIP64_LIMIT
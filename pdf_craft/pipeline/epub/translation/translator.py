@@ -1,9 +1,13 @@
-from collections.abc import Callable, Generator
+import json
+import threading
+from collections.abc import Callable, Generator, Iterable
+from contextlib import ExitStack
 from dataclasses import dataclass
 from enum import Enum, auto
 from importlib.metadata import version as get_package_version
 from os import PathLike
 from pathlib import Path
+from xml.etree.ElementTree import Element
 
 from pdf_craft.pipeline.epub.adapter import (
     MetadataContext,
@@ -15,14 +19,27 @@ from pdf_craft.pipeline.epub.adapter import (
     write_metadata,
     write_toc,
 )
-from pdf_craft.llm import LLM
+from pdf_craft.llm import LLM, LLMEvent, LLMMetering, batch_request_record, read_batch_responses, runtime_for
+from pdf_craft.transformer.xml_translator.xml_translator.concurrency import run_unordered
 from pdf_craft.transformer.xml_translator.xml import XMLLikeNode, deduplicate_ids_in_element, find_first
-from pdf_craft.transformer.xml_translator.xml_translator import FillFailedEvent, SubmitKind, TranslationTask, XMLTranslator
+from pdf_craft.transformer.xml_translator.xml_translator import (
+    FillFailedEvent,
+    PlannedRequest,
+    PlannedTranslation,
+    SubmitKind,
+    TranslationTask,
+    XMLTranslator,
+    extract_xml_element,
+)
 from .epub_transcode import decode_metadata, decode_toc_list, encode_metadata, encode_toc_list
 from .punctuation import unwrap_french_quotes
 from .xml_interrupter import XMLInterrupter
 
 
+_TRANSLATION_BATCH_PREFIX = "translation:"
+_FILL_BATCH_PREFIX = "fill:"
+
+
 class _ElementType(Enum):
     TOC = auto()
     METADATA = auto()
@@ -37,6 +54,32 @@ class _ElementContext:
     metadata_context: MetadataContext | None = None
 
 
+@dataclass(frozen=True)
+class TranslationPlan:
+    """Result of :func:`plan`: how much of a book ``translate`` would still send to the LLM.
+
+    Fill requests are counted only for chunks whose translation is cached;
+    chunks that need no fill request are not counted at all.
+    """
+
+    chunks: int
+    cached_chunks: int
+    pending_prompt_tokens: int
+    fill_requests: int = 0
+    cached_fill_requests: int = 0
+    pending_fill_prompt_tokens: int = 0
+    batch_path: Path | None = None
+    batch_requests: int = 0
+
+    @property
+    def pending_chunks(self) -> int:
+        return self.chunks - self.cached_chunks
+
+    @property
+    def pending_fill_requests(self) -> int:
+        return self.fill_requests - self.cached_fill_requests
+
+
 def translate(
     source_path: PathLike | str,
     target_path: PathLike | str,
@@ -46,37 +89,47 @@ def translate(
     max_retries: int = 5,
     max_group_tokens: int = 2600,
     concurrency: int = 1,
+    fill_concurrency: int | None = None,
+    chapter_concurrency: int = 1,
     llm: LLM | None = None,
     translation_llm: LLM | None = None,
     fill_llm: LLM | None = None,
     on_progress: Callable[[float], None] | None = None,
     on_fill_failed: Callable[[FillFailedEvent], None] | None = None,
-) -> None:
-    translation_llm = translation_llm or llm
-    fill_llm = fill_llm or llm
-    if translation_llm is None:
-        raise ValueError("Either translation_llm or llm must be provided")
-    if fill_llm is None:
-        raise ValueError("Either fill_llm or llm must be provided")
+    on_llm_event: Callable[[LLMEvent], None] | None = None,
+) -> LLMMetering:
+    """Translate an EPUB, replacing each chapter as soon as it is translated.
 
-    translator = XMLTranslator(
-        translation_llm=translation_llm,
-        fill_llm=fill_llm,
+    With ``chapter_concurrency`` above 1, up to that many chapters are chunked
+    and translated independently at once, each with ``concurrency`` chunk
+    workers, and finish in any order. Chunks then never span two chapters, so
+    their cache keys differ from a sequential run; pass the same value to
+    :func:`plan`. The target EPUB is assembled in source order at the end.
+    """
+    if chapter_concurrency < 1:
+        raise ValueError("chapter_concurrency must be at least 1.")
+    translator = _create_translator(
         target_language=target_language,
         user_prompt=user_prompt,
-        ignore_translated_error=False,
         max_retries=max_retries,
-        max_fill_displaying_errors=10,
-        max_group_score=max_group_tokens,
-        cache_seed_content=f"{_get_version()}:{target_language}",
+        max_group_tokens=max_group_tokens,
+        llm=llm,
+        translation_llm=translation_llm,
+        fill_llm=fill_llm,
     )
+    metering = LLMMetering()
+    metering_lock = threading.Lock()
+
+    def record_llm_event(event: LLMEvent) -> None:
+        with metering_lock:
+            metering.record(event)
+        if on_llm_event is not None:
+            on_llm_event(event)
+
     with Zip(
         source_path=Path(source_path).resolve(),
         target_path=Path(target_path).resolve(),
     ) as zip:
-        # mimetype should be the first file in the EPUB ZIP
-        zip.migrate(Path("mimetype"))
-
         total_chapters = sum(1 for _, _ in search_spine_paths(zip))
         toc_list, toc_context = read_toc(zip)
         metadata_fields, metadata_context = read_metadata(zip)
@@ -87,21 +140,21 @@ def translate(
         total_items = (1 if toc_has_items else 0) + (1 if metadata_has_items else 0) + total_chapters
 
         if total_items == 0:
-            return
+            return metering
 
-        interrupter = XMLInterrupter()
         toc_weight = 0.05 if toc_has_items else 0
         metadata_weight = 0.05 if metadata_has_items else 0
         chapters_weight = 1.0 - toc_weight - metadata_weight
         progress_per_chapter = chapters_weight / total_chapters if total_chapters > 0 else 0
         current_progress = 0.0
 
-        for translated_elem, context in translator.translate_elements(
+        for translated_elem, context in _translate_tasks(
+            translator=translator,
+            chapter_concurrency=chapter_concurrency,
             concurrency=concurrency,
-            interrupt_source_text_segments=interrupter.interrupt_source_text_segments,
-            interrupt_translated_text_segments=interrupter.interrupt_translated_text_segments,
-            interrupt_block_element=interrupter.interrupt_block_element,
+            fill_concurrency=fill_concurrency,
             on_fill_failed=on_fill_failed,
+            on_llm_event=record_llm_event,
             tasks=_generate_tasks_from_book(
                 zip=zip,
                 toc_list=toc_list,
@@ -142,6 +195,220 @@ def translate(
                 if on_progress:
                     on_progress(current_progress)
 
+    return metering
+
+
+def plan(
+    source_path: PathLike | str,
+    target_language: str,
+    submit: SubmitKind,
+    user_prompt: str | None = None,
+    max_retries: int = 5,
+    max_group_tokens: int = 2600,
+    llm: LLM | None = None,
+    translation_llm: LLM | None = None,
+    fill_llm: LLM | None = None,
+    batch_path: PathLike | str | None = None,
+    chapter_concurrency: int = 1,
+) -> TranslationPlan:
+    """Dry run of :func:`translate` that calls no LLM.
+
+    Chunks the book exactly as ``translate`` would with the same arguments and
+    checks each request against the caches; ``chapter_concurrency`` only
+    selects the chunking of ``translate`` with that value. With ``batch_path``, the pending
+    requests are written there as an OpenAI-compatible batch input file; feed
+    the batch output to :func:`collect` and plan again to submit the fill
+    requests of the newly translated chunks.
+    """
+    translator = _create_translator(
+        target_language=target_language,
+        user_prompt=user_prompt,
+        max_retries=max_retries,
+        max_group_tokens=max_group_tokens,
+        llm=llm,
+        translation_llm=translation_llm,
+        fill_llm=fill_llm,
+    )
+    chunks, cached_chunks, pending_prompt_tokens = 0, 0, 0
+    fill_requests, cached_fill_requests, pending_fill_prompt_tokens = 0, 0, 0
+    batch_target = Path(batch_path).resolve() if batch_path is not None else None
+    batch_ids: set[str] = set()
+
+    with ExitStack() as stack:
+        zip = stack.enter_context(Zip(source_path=Path(source_path).resolve()))
+        batch_file = stack.enter_context(open(batch_target, "w", encoding="utf-8")) if batch_target else None
+
+        def write_request(prefix: str, planned: PlannedRequest) -> None:
+            custom_id = prefix + planned.request.cache_key
+            # 相同内容的分块共用一个缓存键，批量文件中只需请求一次
+            if batch_file is not None and custom_id not in batch_ids:
+                batch_ids.add(custom_id)
+                record = batch_request_record(planned.model, planned.request, custom_id)
+                batch_file.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+        toc_list, toc_context = read_toc(zip)
+        metadata_fields, metadata_context = read_metadata(zip)
+        for planned in _plan_tasks(
+            translator=translator,
+            chapter_concurrency=chapter_concurrency,
+            tasks=_generate_tasks_from_book(
+                zip=zip,
+                toc_list=toc_list,
+                toc_context=toc_context,
+                metadata_fields=metadata_fields,
+                metadata_context=metadata_context,
+                submit=submit,
+            ),
+        ):
+            chunks += 1
+            if planned.translation.cached:
+                cached_chunks += 1
+            else:
+                pending_prompt_tokens += planned.translation.prompt_tokens
+                write_request(_TRANSLATION_BATCH_PREFIX, planned.translation)
+            if planned.fill is not None:
+                fill_requests += 1
+                if planned.fill.cached:
+                    cached_fill_requests += 1
+                else:
+                    pending_fill_prompt_tokens += planned.fill.prompt_tokens
+                    write_request(_FILL_BATCH_PREFIX, planned.fill)
+
+    return TranslationPlan(
+        chunks=chunks,
+        cached_chunks=cached_chunks,
+        pending_prompt_tokens=pending_prompt_tokens,
+        fill_requests=fill_requests,
+        cached_fill_requests=cached_fill_requests,
+        pending_fill_prompt_tokens=pending_fill_prompt_tokens,
+        batch_path=batch_target,
+        batch_requests=len(batch_ids),
+    )
+
+
+def collect(
+    responses_path: PathLike | str,
+    llm: LLM | None = None,
+    translation_llm: LLM | None = None,
+    fill_llm: LLM | None = None,
+) -> int:
+    """Store the output of a batch job submitted by :func:`plan` in the LLM caches.
+
+    Pass the same LLMs as to ``plan``. The next ``plan`` or ``translate`` run
+    finds the responses by cache key. Returns the number of responses stored;
+    failed or empty batch lines, and fill responses without exactly one
+    complete ``<xml>`` block, are skipped and requested again later.
+    """
+    translation_llm, fill_llm = _resolve_llms(llm, translation_llm, fill_llm)
+    translations: dict[str, str] = {}
+    fills: dict[str, str] = {}
+    for custom_id, response in read_batch_responses(Path(responses_path)).items():
+        if custom_id.startswith(_TRANSLATION_BATCH_PREFIX):
+            translations[custom_id.removeprefix(_TRANSLATION_BATCH_PREFIX)] = response
+        elif custom_id.startswith(_FILL_BATCH_PREFIX):
+            # 与在线填充相同，未通过校验的响应不进入缓存；模板匹配还需原始分块，留到使用时再校验
+            if not isinstance(extract_xml_element(response), str):
+                fills[custom_id.removeprefix(_FILL_BATCH_PREFIX)] = response
+    if translations:
+        runtime_for(translation_llm).store(translations)
+    if fills:
+        runtime_for(fill_llm).store(fills)
+    return len(translations) + len(fills)
+
+
+def _translate_tasks(
+    translator: XMLTranslator,
+    tasks: Iterable[TranslationTask[_ElementContext]],
+    chapter_concurrency: int,
+    concurrency: int,
+    fill_concurrency: int | None,
+    on_fill_failed: Callable[[FillFailedEvent], None] | None,
+    on_llm_event: Callable[[LLMEvent], None],
+) -> Generator[tuple[Element, _ElementContext], None, None]:
+    if chapter_concurrency == 1:
+        interrupter = XMLInterrupter()
+        yield from translator.translate_elements(
+            tasks=tasks,
+            concurrency=concurrency,
+            fill_concurrency=fill_concurrency,
+            interrupt_source_text_segments=interrupter.interrupt_source_text_segments,
+            interrupt_translated_text_segments=interrupter.interrupt_translated_text_segments,
+            interrupt_block_element=interrupter.interrupt_block_element,
+            on_fill_failed=on_fill_failed,
+            on_llm_event=on_llm_event,
+        )
+        return
+
+    def translate_task(task: TranslationTask[_ElementContext]) -> tuple[Element, _ElementContext] | None:
+        # The interrupter keeps state from one segment to the next, so each chapter needs its own
+        interrupter = XMLInterrupter()
+        translated = list(translator.translate_elements(
+            tasks=(task,),
+            concurrency=concurrency,
+            fill_concurrency=fill_concurrency,
+            interrupt_source_text_segments=interrupter.interrupt_source_text_segments,
+            interrupt_translated_text_segments=interrupter.interrupt_translated_text_segments,
+            interrupt_block_element=interrupter.interrupt_block_element,
+            on_fill_failed=on_fill_failed,
+        ))
+        return translated[0] if translated else None
+
+    with translator.observe(on_llm_event):
+        for translated in run_unordered(tasks, translate_task, chapter_concurrency):
+            if translated is not None:
+                yield translated
+
+
+def _plan_tasks(
+    translator: XMLTranslator,
+    tasks: Iterable[TranslationTask[_ElementContext]],
+    chapter_concurrency: int,
+) -> Generator[PlannedTranslation, None, None]:
+    if chapter_concurrency == 1:
+        yield from translator.plan_elements(
+            tasks=tasks,
+            interrupt_source_text_segments=XMLInterrupter().interrupt_source_text_segments,
+        )
+        return
+    for task in tasks:
+        yield from translator.plan_elements(
+            tasks=(task,),
+            interrupt_source_text_segments=XMLInterrupter().interrupt_source_text_segments,
+        )
+
+
+def _create_translator(
+    target_language: str,
+    user_prompt: str | None,
+    max_retries: int,
+    max_group_tokens: int,
+    llm: LLM | None,
+    translation_llm: LLM | None,
+    fill_llm: LLM | None,
+) -> XMLTranslator:
+    translation_llm, fill_llm = _resolve_llms(llm, translation_llm, fill_llm)
+    return XMLTranslator(
+        translation_llm=translation_llm,
+        fill_llm=fill_llm,
+        target_language=target_language,
+        user_prompt=user_prompt,
+        ignore_translated_error=False,
+        max_retries=max_retries,
+        max_fill_displaying_errors=10,
+        max_group_score=max_group_tokens,
+        cache_seed_content=f"{_get_version()}:{target_language}",
+    )
+
+
+def _resolve_llms(llm: LLM | None, translation_llm: LLM | None, fill_llm: LLM | None) -> tuple[LLM, LLM]:
+    translation_llm = translation_llm or llm
+    fill_llm = fill_llm or llm
+    if translation_llm is None:
+        raise ValueError("Either translation_llm or llm must be provided")
+    if fill_llm is None:
+        raise ValueError("Either fill_llm or llm must be provided")
+    return translation_llm, fill_llm
+
 
 def _generate_tasks_from_book(
     zip: Zip,
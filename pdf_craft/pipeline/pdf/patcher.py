@@ -1,11 +1,17 @@
+from concurrent.futures import ProcessPoolExecutor
 from dataclasses import dataclass
+from io import BytesIO
+from itertools import repeat
 from pathlib import Path
-from tempfile import NamedTemporaryFile, TemporaryDirectory
+from tempfile import NamedTemporaryFile
 from typing import Iterable
 
 from pdf_craft.pdf.handler import DefaultPDFHandler, PDFHandler
 
-from .text_layout import BoxTextLayout, PatchTextOptions
+from .text_layout import BoxTextLayout, FittedParagraph, PatchTextOptions
+
+# Per-process layouts for the fitting pool, so each worker keeps its caches.
+_WORKER_LAYOUTS: dict[PatchTextOptions, BoxTextLayout] = {}
 
 
 @dataclass(frozen=True)
@@ -31,8 +37,10 @@ class PDFPatcher:
     """Replace OCR-backed text regions in a PDF with translated text.
 
     The implementation uses pypdf for page preservation and reportlab for a
-    transparent overlay. Both imports are lazy so normal OCR/Markdown users do
-    not need the patching stack at import time.
+    transparent vector overlay of white boxes and text, merged onto the pages
+    that have replacements. Other pages are copied verbatim. Both imports are
+    lazy so normal OCR/Markdown users do not need the patching stack at import
+    time.
     """
 
     def __init__(
@@ -42,12 +50,20 @@ class PDFPatcher:
         options: PatchTextOptions | None = None,
         pdf_handler: PDFHandler | None = None,
         dpi: int = 300,
+        max_workers: int = 1,
     ) -> None:
         """Create a patcher.
 
         ``font_name`` and ``font_size`` remain accepted for compatibility. A
         supplied font size is the maximum fitted size, not a forced size.
+        ``pdf_handler`` and ``dpi`` are likewise kept for compatibility; pages
+        are no longer rendered, so patching does not use them.
+
+        With ``max_workers`` above 1, text fitting before drawing runs on a
+        process pool; it is pure CPU work and dominates dense documents.
         """
+        if max_workers < 1:
+            raise ValueError("max_workers must be at least 1.")
         if options is not None and (font_name is not None or font_size is not None):
             raise ValueError("pass either options or legacy font_name/font_size arguments")
         if options is None:
@@ -64,12 +80,12 @@ class PDFPatcher:
         self._layout = BoxTextLayout(options)
         self._pdf_handler = pdf_handler or DefaultPDFHandler()
         self.dpi = dpi
+        self.max_workers = max_workers
         self.skipped_replacements: tuple[PDFSkippedReplacement, ...] = ()
 
     def patch(self, source_path: Path, target_path: Path, replacements: Iterable[PDFReplacement]) -> None:
         try:
             import pypdf
-            from reportlab.lib.utils import ImageReader
             from reportlab.pdfgen import canvas
         except ImportError as error:
             raise RuntimeError("PDF patching requires the optional 'reportlab' dependency") from error
@@ -85,44 +101,61 @@ class PDFPatcher:
 
         # Preflight all pages before drawing any white rectangles or creating a
         # target file. A failed fit must not masquerade as a successful patch.
-        layouts: dict[int, list[tuple[PDFReplacement, object]]] = {}
+        boxes: list[tuple[int, PDFReplacement, float, float]] = []
         for index, page in enumerate(reader.pages, 1):
-            width = float(page.mediabox.width)
-            height = float(page.mediabox.height)
+            width, height = _displayed_size(page)
             for replacement in replacements_by_page.get(index, []):
-                try:
-                    fitted = self._fit_replacement(replacement, width, height)
-                except ValueError as error:
-                    if self.options.overflow == "skip":
-                        skipped.append(PDFSkippedReplacement(index, replacement.bbox, str(error)))
-                        continue
-                    raise ValueError(
-                        f"page {index}, bbox {replacement.bbox}: {error}"
-                    ) from error
-                layouts.setdefault(index, []).append((replacement, fitted))
-
-        writer = pypdf.PdfWriter()
-        document = self._pdf_handler.open(source_path)
-        try:
-            for index, page in enumerate(reader.pages, 1):
-                width = float(page.mediabox.width)
-                height = float(page.mediabox.height)
-                with TemporaryDirectory() as temp_dir:
-                    overlay_path = Path(temp_dir) / "overlay.pdf"
-                    overlay = canvas.Canvas(str(overlay_path), pagesize=(width, height))
-                    page_layouts = layouts.get(index, [])
-                    render_dpi = page_layouts[0][0].dpi if page_layouts else self.dpi
-                    raw_page = document.render_page(index, render_dpi)
-                    overlay.drawImage(ImageReader(raw_page), 0, 0, width=width, height=height)
-                    for replacement, _ in page_layouts:
-                        self._draw_background(overlay, replacement, width, height)
-                    for replacement, fitted in page_layouts:
-                        self._draw_text(overlay, replacement, fitted, width, height)
-                    overlay.save()
-                    overlay_reader = pypdf.PdfReader(str(overlay_path))
-                    writer.add_page(overlay_reader.pages[0])
-        finally:
-            document.close()
+                _, _, box_width, box_height = self._box_in_points(replacement, width, height)
+                boxes.append((index, replacement, box_width, box_height))
+
+        layouts: dict[int, list[tuple[PDFReplacement, object]]] = {}
+        fitted_boxes = self._fit_boxes([(replacement.text, width, height) for _, replacement, width, height in boxes])
+        for (index, replacement, _, _), fitted in zip(boxes, fitted_boxes):
+            if isinstance(fitted, ValueError):
+                if self.options.overflow == "skip":
+                    skipped.append(PDFSkippedReplacement(index, replacement.bbox, str(fitted)))
+                    continue
+                raise ValueError(
+                    f"page {index}, bbox {replacement.bbox}: {fitted}"
+                ) from fitted
+            layouts.setdefault(index, []).append((replacement, fitted))
+
+        # Pages without replacements are copied verbatim; the others keep their
+        # own content and get a vector overlay merged on top. The incremental
+        # writer appends only the changed objects after the source bytes; it
+        # cannot re-encrypt the changed streams, so encrypted sources are cloned.
+        if reader.is_encrypted:
+            writer = pypdf.PdfWriter(clone_from=reader)
+        else:
+            writer = pypdf.PdfWriter(reader, incremental=True)
+        pages = []
+        for index in sorted(layouts):
+            page = writer.pages[index - 1]
+            if page.rotation % 360:
+                # Replacement boxes come from the page as displayed.
+                page.transfer_rotation_to_content()
+            pages.append((index, page))
+
+        # All overlays go into one in-memory document, one page per patched page.
+        buffer = BytesIO()
+        overlay = canvas.Canvas(buffer)
+        for index, page in pages:
+            width, height = _displayed_size(page)
+            overlay.setPageSize((width, height))
+            for replacement, _ in layouts[index]:
+                self._draw_background(overlay, replacement, width, height)
+            for replacement, fitted in layouts[index]:
+                self._draw_text(overlay, replacement, fitted, width, height)
+            overlay.showPage()
+        overlay.save()
+        if pages:
+            overlay_reader = pypdf.PdfReader(buffer)
+            for (_, page), overlay_page in zip(pages, overlay_reader.pages):
+                page.merge_translated_page(
+                    overlay_page,
+                    tx=float(page.mediabox.left),
+                    ty=float(page.mediabox.bottom),
+                )
 
         target_path.parent.mkdir(parents=True, exist_ok=True)
         with NamedTemporaryFile(dir=target_path.parent, suffix=".pdf", delete=False) as output:
@@ -146,9 +179,29 @@ class PDFPatcher:
         if right > replacement.page_pixel_size[0] or bottom > replacement.page_pixel_size[1]:
             raise ValueError("bbox exceeds page_pixel_size")
 
-    def _fit_replacement(self, replacement: PDFReplacement, width: float, height: float):
-        _, _, box_width, box_height = self._box_in_points(replacement, width, height)
-        return self._layout.fit(replacement.text, box_width, box_height)
+    def _fit_boxes(self, boxes: list[tuple[str, float, float]]) -> list[FittedParagraph | ValueError]:
+        if self.max_workers == 1 or len(boxes) < 2:
+            return [self._fit_box(text, width, height) for text, width, height in boxes]
+
+        # Workers return only the font size: paragraphs are rebuilt here with
+        # one wrap each instead of being pickled back.
+        texts, widths, heights = zip(*boxes)
+        chunksize = max(1, len(boxes) // (self.max_workers * 4))
+        with ProcessPoolExecutor(max_workers=self.max_workers) as executor:
+            font_sizes = list(executor.map(
+                _fit_font_size, repeat(self.options), texts, widths, heights, chunksize=chunksize,
+            ))
+        return [
+            ValueError(font_size) if isinstance(font_size, str)
+            else self._layout.fit_at(text, width, font_size)
+            for (text, width, _), font_size in zip(boxes, font_sizes)
+        ]
+
+    def _fit_box(self, text: str, width: float, height: float) -> FittedParagraph | ValueError:
+        try:
+            return self._layout.fit(text, width, height)
+        except ValueError as error:
+            return error
 
     @staticmethod
     def _box_in_points(replacement: PDFReplacement, width: float, height: float) -> tuple[float, float, float, float]:
@@ -173,3 +226,22 @@ class PDFPatcher:
             x + self.options.horizontal_padding,
             y + box_height - self.options.vertical_padding - fitted.height,
         )
+
+
+def _displayed_size(page) -> tuple[float, float]:
+    width = float(page.mediabox.width)
+    height = float(page.mediabox.height)
+    if page.rotation % 180:
+        return height, width
+    return width, height
+
+
+def _fit_font_size(options: PatchTextOptions, text: str, width: float, height: float) -> float | str:
+    layout = _WORKER_LAYOUTS.get(options)
+    if layout is None:
+        layout = BoxTextLayout(options)
+        _WORKER_LAYOUTS[options] = layout
+    try:
+        return layout.fit(text, width, height).font_size
+    except ValueError as error:
+        return str(error)
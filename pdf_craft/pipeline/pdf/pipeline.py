@@ -1,5 +1,8 @@
 from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, replace
 from pathlib import Path
+from typing import cast
 
 from pdf_craft.extractor.chapter.chapter import Chapter, ParagraphLayout
 from pdf_craft.extractor.chapter.chapter import InlineExpression, Reference
@@ -9,61 +12,146 @@ from pdf_craft.expression import to_markdown_string
 from pdf_craft.document import DocumentPackage
 from pdf_craft.pdf.handler import PDFHandler
 from pdf_craft.pipeline.pdf.patcher import PDFPatcher, PDFReplacement
-from pdf_craft.transformer import ChapterTransformer
+from pdf_craft.transformer import ChapterTransformer, TextBatchTransformer
+
+
+@dataclass(frozen=True)
+class _PatchBlock:
+    page_index: int
+    det: tuple[int, int, int, int]
+    order: int
+    source: str
+    translated: str | None = None
 
 
 class PDFTranslationPipeline:
-    """Apply a replace-only text transformer to an extracted PDF package."""
+    """Apply a replace-only text transformer to an extracted PDF package.
 
-    def __init__(self, pdf_handler: PDFHandler | None = None, patcher: PDFPatcher | None = None, dpi: int = 300) -> None:
+    Plain-text transformers see every distinct block text once per document,
+    so repeated blocks such as running headers are translated a single time.
+    A ``TextBatchTransformer`` receives up to ``batch_size`` texts per call;
+    with ``max_workers`` above 1 calls run concurrently on a thread pool, so
+    the transformer must then be safe to call from several threads.
+    ``patch_workers`` is the process count of the default ``PDFPatcher``.
+    """
+
+    def __init__(
+        self,
+        pdf_handler: PDFHandler | None = None,
+        patcher: PDFPatcher | None = None,
+        dpi: int = 300,
+        *,
+        max_workers: int = 1,
+        batch_size: int = 32,
+        patch_workers: int = 1,
+    ) -> None:
+        if max_workers < 1:
+            raise ValueError("max_workers must be at least 1.")
+        if batch_size < 1:
+            raise ValueError("batch_size must be at least 1.")
         self.pdf_handler = pdf_handler
-        self.patcher = patcher or PDFPatcher(pdf_handler=pdf_handler)
+        self.patcher = patcher or PDFPatcher(pdf_handler=pdf_handler, max_workers=patch_workers)
         self.dpi = dpi
+        self.max_workers = max_workers
+        self.batch_size = batch_size
 
     def translate(
         self,
         pdf_path: Path,
         target_path: Path,
         package: DocumentPackage | Path,
-        transformer: Callable[[str], str] | ChapterTransformer,
+        transformer: Callable[[str], str] | ChapterTransformer | TextBatchTransformer,
     ) -> None:
         package = package if isinstance(package, DocumentPackage) else DocumentPackage.from_path(package)
         package.validate()
-        document = self.pdf_handler.open(pdf_path) if self.pdf_handler else None
-        replacements: list[PDFReplacement] = []
-        try:
-            pages = package.page_pixel_sizes()
-            reader = create_chapters_reader(package.chapters_path)
-            for chapter in reader():
-                structured = not callable(transformer)
-                transformed = transformer.transform(chapter) if structured else chapter
-                callback = transformer if callable(transformer) else (lambda text: text)
-                self._collect_chapter(transformed, callback, document, pages, replacements, structured)
-        finally:
-            if document:
-                document.close()
+        blocks: list[_PatchBlock] = []
+        reader = create_chapters_reader(package.chapters_path)
+        structured = not callable(transformer) and not hasattr(transformer, "transform_batch")
+        for chapter in reader():
+            if structured:
+                chapter = cast(ChapterTransformer, transformer).transform(chapter)
+            blocks.extend(_collect_chapter(chapter, structured))
+        if not structured:
+            translations = self._translate_texts([block.source for block in blocks], transformer)
+            blocks = [
+                replace(block, translated=translations[block.source])
+                for block in blocks
+                if translations[block.source] and translations[block.source] != block.source
+            ]
+        replacements = self._replacements(pdf_path, package.page_pixel_sizes(), blocks)
         self.patcher.patch(pdf_path, target_path, replacements)
 
-    def _collect_chapter(self, chapter: Chapter, transformer, document, pages, replacements, structured: bool = False) -> None:
-        for layout in chapter.layouts:
-            if not isinstance(layout, ParagraphLayout) or layout.ref not in {"text", "sub_title"}:
+    def _translate_texts(self, texts: list[str], transformer) -> dict[str, str]:
+        unique = list(dict.fromkeys(texts))
+        if hasattr(transformer, "transform_batch"):
+            batches = [unique[i:i + self.batch_size] for i in range(0, len(unique), self.batch_size)]
+
+            def call(batch: list[str]) -> list[str]:
+                return _checked_batch(transformer.transform_batch(batch), batch)
+        else:
+            batches = [[text] for text in unique]
+
+            def call(batch: list[str]) -> list[str]:
+                return [transformer(batch[0])]
+        if self.max_workers == 1 or len(batches) <= 1:
+            results = [call(batch) for batch in batches]
+        else:
+            with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+                results = list(executor.map(call, batches))
+        return {
+            source: translated
+            for batch, translated_batch in zip(batches, results)
+            for source, translated in zip(batch, translated_batch)
+        }
+
+    def _replacements(self, pdf_path: Path, pages: dict[int, tuple[int, int]],
+                      blocks: list[_PatchBlock]) -> list[PDFReplacement]:
+        missing = sorted({block.page_index for block in blocks} - pages.keys())
+        if missing:
+            if self.pdf_handler is None:
+                raise ValueError("PDF handler is required to resolve page dimensions")
+            # Page geometry only needs the media box, never a rasterized page
+            document = self.pdf_handler.open(pdf_path)
+            page_rotation = getattr(document, "page_rotation", None)
+            try:
+                for page_index in missing:
+                    width, height = document.page_size(page_index)
+                    # OCR boxes are in displayed orientation, so quarter turns swap the media box sides
+                    if page_rotation is not None and page_rotation(page_index) % 180:
+                        width, height = height, width
+                    pages[page_index] = (round(width * self.dpi), round(height * self.dpi))
+            finally:
+                document.close()
+        return [
+            PDFReplacement(
+                block.page_index, block.det, block.translated or block.source,
+                pages[block.page_index], self.dpi, reading_order=block.order,
+            )
+            for block in blocks
+        ]
+
+
+def _collect_chapter(chapter: Chapter, structured: bool) -> list[_PatchBlock]:
+    blocks: list[_PatchBlock] = []
+    for layout in chapter.layouts:
+        if not isinstance(layout, ParagraphLayout) or layout.ref not in {"text", "sub_title"}:
+            continue
+        for block in layout.blocks:
+            source = _to_patch_text(block.content).strip()
+            if not source:
                 continue
-            for block in layout.blocks:
-                source = _to_patch_text(block.content).strip()
-                if not source:
-                    continue
-                translated = transformer(source)
-                if not translated or (translated == source and not structured):
-                    continue
-                if block.page_index not in pages:
-                    if document is None:
-                        raise ValueError("PDF handler is required to resolve page dimensions")
-                    image = document.render_page(block.page_index, self.dpi)
-                    pages[block.page_index] = image.size
-                replacements.append(PDFReplacement(
-                    block.page_index, block.det, translated, pages[block.page_index], self.dpi,
-                    reading_order=block.order,
-                ))
+            # Structured transformers have already rewritten the chapter, so its text is final
+            blocks.append(_PatchBlock(
+                block.page_index, block.det, block.order, source,
+                translated=source if structured else None,
+            ))
+    return blocks
+
+
+def _checked_batch(translated: list[str], texts: list[str]) -> list[str]:
+    if len(translated) != len(texts):
+        raise ValueError(f"batch transformer returned {len(translated)} texts for {len(texts)} inputs")
+    return translated
 
 
 def _to_patch_text(items) -> str:
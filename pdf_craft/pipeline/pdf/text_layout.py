@@ -1,5 +1,6 @@
 """ReportLab paragraph fitting for OCR source rectangles."""
 
+import math
 from dataclasses import dataclass
 from typing import Any, Literal, cast
 from xml.sax.saxutils import escape
@@ -33,11 +34,19 @@ class FittedParagraph:
 
 
 class BoxTextLayout:
-    """Fit continuous text into a fixed ReportLab rectangle without truncation."""
+    """Fit continuous text into a fixed ReportLab rectangle without truncation.
+
+    Paragraph styles are cached per font size, and the search starts from the
+    previous result when the text density of the next box is similar, as is
+    usual for consecutive boxes of one book.
+    """
 
     def __init__(self, options: PatchTextOptions | None = None) -> None:
         self.options = options or PatchTextOptions()
         self._validate_options()
+        self._styles: dict[float, Any] = {}
+        self._font_ready = False
+        self._hint: tuple[float, int] | None = None
 
     def fit(self, text: str, width: float, height: float) -> FittedParagraph:
         """Return the largest quarter-point Paragraph that completely fits."""
@@ -50,36 +59,90 @@ class BoxTextLayout:
             raise ValueError("bbox is too small after text padding")
 
         self._ensure_font(normalized)
-        minimum = self._paragraph(normalized, self.options.min_font_size)
-        minimum_width, minimum_height = self._natural_size(minimum, available_width)
-        if minimum_width > available_width or minimum_height > available_height:
-            raise ValueError(
-                "replacement text cannot fit bbox at minimum font size "
-                f"{self.options.min_font_size}: required {minimum_width:.2f}x{minimum_height:.2f}, "
-                f"available {available_width:.2f}x{available_height:.2f}"
-            )
-
         low = int(round(self.options.min_font_size * 4))
         high = int(round(self.options.max_font_size * 4))
+        density = len(normalized) / (available_width * available_height)
         best: FittedParagraph | None = None
+        seed = self._seed(density, low, high)
+        if seed is not None:
+            # The predicted size is usually right or one quarter point off, so
+            # probing it and its neighbour often settles the search in two wraps.
+            fitted = self._probe(normalized, seed, available_width, available_height)
+            if fitted is not None:
+                best, low = fitted, seed + 1
+                neighbour = low
+            else:
+                high = seed - 1
+                neighbour = high
+            if low <= neighbour <= high:
+                fitted = self._probe(normalized, neighbour, available_width, available_height)
+                if fitted is not None:
+                    best, low = fitted, neighbour + 1
+                else:
+                    high = neighbour - 1
+        if best is None or best.font_size < self.options.min_font_size:
+            self._check_minimum(normalized, available_width, available_height)
         while low <= high:
             middle = (low + high) // 2
-            font_size = middle / 4
-            paragraph = self._paragraph(normalized, font_size)
-            natural_width, natural_height = self._natural_size(paragraph, available_width)
-            if natural_width <= available_width and natural_height <= available_height:
-                best = FittedParagraph(paragraph, font_size, natural_width, natural_height)
+            fitted = self._probe(normalized, middle, available_width, available_height)
+            if fitted is not None:
+                best = fitted
                 low = middle + 1
             else:
                 high = middle - 1
         if best is None:  # Defensive: min size was already checked above.
             raise ValueError("replacement text cannot fit bbox")
+        self._hint = (density, int(round(best.font_size * 4)))
         return best
 
+    def fit_at(self, text: str, width: float, font_size: float) -> FittedParagraph:
+        """Lay out text at a font size already known to fit, e.g. found by another process."""
+        normalized = " ".join(text.split())
+        self._ensure_font(normalized)
+        paragraph = self._paragraph(normalized, font_size)
+        natural_width, natural_height = self._natural_size(
+            paragraph, width - (2 * self.options.horizontal_padding)
+        )
+        return FittedParagraph(paragraph, font_size, natural_width, natural_height)
+
+    def _check_minimum(self, text: str, width: float, height: float) -> None:
+        minimum = self._paragraph(text, self.options.min_font_size)
+        minimum_width, minimum_height = self._natural_size(minimum, width)
+        if minimum_width > width or minimum_height > height:
+            raise ValueError(
+                "replacement text cannot fit bbox at minimum font size "
+                f"{self.options.min_font_size}: required {minimum_width:.2f}x{minimum_height:.2f}, "
+                f"available {width:.2f}x{height:.2f}"
+            )
+
+    def _seed(self, density: float, low: int, high: int) -> int | None:
+        if self._hint is None:
+            return None
+        # Line count times line height scales with text per area times size
+        # squared, so the fitting size goes with the inverse square root.
+        previous_density, quarter = self._hint
+        predicted = int(quarter * math.sqrt(previous_density / density))
+        return min(max(predicted, low), high)
+
+    def _probe(self, text: str, quarter: int, width: float, height: float) -> FittedParagraph | None:
+        font_size = quarter / 4
+        paragraph = self._paragraph(text, font_size)
+        natural_width, natural_height = self._natural_size(paragraph, width)
+        if natural_width <= width and natural_height <= height:
+            return FittedParagraph(paragraph, font_size, natural_width, natural_height)
+        return None
+
     def _paragraph(self, text: str, font_size: float):
+        from reportlab.platypus import Paragraph
+
+        return Paragraph(escape(text), self._style(font_size))
+
+    def _style(self, font_size: float):
+        style = self._styles.get(font_size)
+        if style is not None:
+            return style
         from reportlab.lib.enums import TA_CENTER, TA_JUSTIFY, TA_LEFT, TA_RIGHT
         from reportlab.lib.styles import ParagraphStyle
-        from reportlab.platypus import Paragraph
 
         alignment = {
             "left": TA_LEFT,
@@ -95,7 +158,8 @@ class BoxTextLayout:
             alignment=cast(Any, alignment),
             wordWrap="CJK",
         )
-        return Paragraph(escape(text), style)
+        self._styles[font_size] = style
+        return style
 
     @staticmethod
     def _natural_size(paragraph, width: float) -> tuple[float, float]:
@@ -104,6 +168,19 @@ class BoxTextLayout:
         return paragraph.wrap(width, 1_000_000)
 
     def _ensure_font(self, text: str) -> None:
+        if not self._font_ready:
+            self._register_font()
+            self._font_ready = True
+        if any(ord(character) > 255 for character in text) and self.options.font_name in {
+            "Courier", "Courier-Bold", "Courier-Oblique", "Courier-BoldOblique",
+            "Helvetica", "Helvetica-Bold", "Helvetica-Oblique", "Helvetica-BoldOblique",
+            "Times-Roman", "Times-Bold", "Times-Italic", "Times-BoldItalic",
+        }:
+            raise ValueError(
+                f"font {self.options.font_name} cannot reliably draw non-Latin replacement text"
+            )
+
+    def _register_font(self) -> None:
         from reportlab.pdfbase import pdfmetrics
         from reportlab.pdfbase.cidfonts import UnicodeCIDFont
 
@@ -116,14 +193,6 @@ class BoxTextLayout:
             pdfmetrics.getFont(self.options.font_name)
         except KeyError as error:
             raise ValueError(f"PDF patch font is unavailable: {self.options.font_name}") from error
-        if any(ord(character) > 255 for character in text) and self.options.font_name in {
-            "Courier", "Courier-Bold", "Courier-Oblique", "Courier-BoldOblique",
-            "Helvetica", "Helvetica-Bold", "Helvetica-Oblique", "Helvetica-BoldOblique",
-            "Times-Roman", "Times-Bold", "Times-Italic", "Times-BoldItalic",
-        }:
-            raise ValueError(
-                f"font {self.options.font_name} cannot reliably draw non-Latin replacement text"
-            )
 
     def _validate_options(self) -> None:
         options = self.options
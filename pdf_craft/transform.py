@@ -14,10 +14,10 @@ from .error import (
     is_inline_error,
     to_interrupted_error,
 )
-from .llm import LLM
+from .llm import LLM, LLMEvent
 from .metering import AbortedCheck, OCRTokensMetering
 from .ocr_config import OCRConfig, ensure_ocr_config
-from .pdf import OCR, DeepSeekOCRSize, OCREvent, PDFHandler
+from .pdf import OCR, DeepSeekOCRSize, OCRCache, OCREvent, PageStore, PDFHandler
 from .extractor.chapter import generate_chapter_files
 from .to_path import to_path
 from .extractor.toc import analyse_toc
@@ -33,10 +33,15 @@ class Transform:
         pdf_handler: PDFHandler | None = None,
         local_only: bool = False,
         ocr: OCRConfig | None = None,
+        ocr_cache_path: PathLike | str | None = None,
+        ocr_cache_max_size: int | None = None,
     ) -> None:
         self._ocr: OCR = OCR(
             ocr=ensure_ocr_config(ocr, models_cache_path, local_only),
             pdf_handler=pdf_handler,
+            cache=OCRCache(to_path(ocr_cache_path), ocr_cache_max_size)
+            if ocr_cache_path is not None
+            else None,
         )
 
     def predownload(self, revision: str | None = None) -> None:
@@ -69,6 +74,7 @@ class Transform:
         max_ocr_tokens: int | None = None,
         max_ocr_output_tokens: int | None = None,
         on_ocr_event: Callable[[OCREvent], None] = lambda _: None,
+        on_llm_event: Callable[[LLMEvent], None] | None = None,
         steps: Sequence[TranslationStep | PackageTransformer] = (),
     ) -> OCRTokensMetering:  # pyright: ignore[reportReturnType]
         # Compatibility wrapper.  PDFCraft owns the production workflow.
@@ -88,6 +94,7 @@ class Transform:
                         ignore_pdf_errors=ignore_pdf_errors, ignore_ocr_errors=ignore_ocr_errors,
                         aborted=aborted, max_ocr_tokens=max_ocr_tokens,
                         max_ocr_output_tokens=max_ocr_output_tokens, on_ocr_event=on_ocr_event,
+                        on_llm_event=on_llm_event,
                     ),
                     steps=steps,
                 )
@@ -118,6 +125,7 @@ class Transform:
         max_ocr_tokens: int | None = None,
         max_ocr_output_tokens: int | None = None,
         on_ocr_event: Callable[[OCREvent], None] = lambda _: None,
+        on_llm_event: Callable[[LLMEvent], None] | None = None,
         steps: Sequence[TranslationStep | PackageTransformer] = (),
     ) -> OCRTokensMetering:  # pyright: ignore[reportReturnType]
         from .craft import ExtractionOptions, PDFCraft
@@ -135,6 +143,7 @@ class Transform:
                         ignore_pdf_errors=ignore_pdf_errors, ignore_ocr_errors=ignore_ocr_errors,
                         aborted=aborted, max_ocr_tokens=max_ocr_tokens,
                         max_ocr_output_tokens=max_ocr_output_tokens, on_ocr_event=on_ocr_event,
+                        on_llm_event=on_llm_event,
                     ),
                     steps=steps,
                 )
@@ -171,7 +180,11 @@ class Transform:
         max_tokens: int | None,
         max_output_tokens: int | None,
         on_ocr_event: Callable[[OCREvent], None],
+        on_llm_event: Callable[[LLMEvent], None] | None = None,
         page_indexes: Container[int] | None = None,
+        ocr_workers: int = 1,
+        prefetch_pages: int = 0,
+        packed_pages: bool = False,
     ):
         asserts_path = analysing_path / "assets"
         pages_path = analysing_path / "ocr"
@@ -206,19 +219,24 @@ class Transform:
             max_tokens=max_tokens,
             max_output_tokens=max_output_tokens,
             page_indexes=page_indexes if page_indexes is not None else range(1, 2**31),
+            ocr_workers=ocr_workers,
+            prefetch_pages=prefetch_pages,
+            packed_pages=packed_pages,
         ):
             on_ocr_event(event)
             metering.input_tokens += event.input_tokens
             metering.output_tokens += event.output_tokens
 
+        pages = PageStore(pages_path)
         toc = analyse_toc(
-            pages_path=pages_path,
+            pages=pages,
             toc_path=toc_path,
             toc_llm=toc_llm,
             toc_assumed=toc_assumed,
+            on_llm_event=on_llm_event,
         )
         generate_chapter_files(
-            pages_path=pages_path,
+            pages=pages,
             chapters_path=chapters_path,
             toc=toc,
         )
@@ -1,6 +1,6 @@
 from .xml_translator.xml_translator import FillFailedEvent, SubmitKind, TranslationTask, XMLTranslator
-from .protocol import ChapterTransformer
+from .protocol import ChapterTransformer, TextBatchTransformer
 from .chapter_xml import ChapterXMLTransformer
-from .package import ChapterPackageTransformer, PackageTransformer
+from .package import ChapterPackageTransformer, ChapterProgress, PackageTransformer
 
-__all__ = ["ChapterTransformer", "ChapterXMLTransformer", "ChapterPackageTransformer", "PackageTransformer", "FillFailedEvent", "SubmitKind", "TranslationTask", "XMLTranslator"]
+__all__ = ["ChapterTransformer", "ChapterXMLTransformer", "ChapterPackageTransformer", "ChapterProgress", "PackageTransformer", "FillFailedEvent", "SubmitKind", "TextBatchTransformer", "TranslationTask", "XMLTranslator"]
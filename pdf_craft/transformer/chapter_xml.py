@@ -24,6 +24,13 @@ class ChapterXMLTransformer:
         """Return a transformer using the requested XML submission mode."""
         return ChapterXMLTransformer(self._translator, mode)
 
+    def fingerprint(self) -> str | None:
+        """Identify the translation settings, or None when the translator cannot."""
+        fingerprint = getattr(self._translator, "fingerprint", None)
+        if fingerprint is None:
+            return None
+        return f"chapter-xml:{self._mode.name}:{fingerprint()}"
+
     def transform(self, chapter: Chapter) -> Chapter:
         translated, _ = self._translator.translate_element(
             TranslationTask(element=encode(chapter), action=self._mode, payload=chapter)
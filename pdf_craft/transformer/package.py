@@ -1,26 +1,61 @@
 """Transformers operating on render-ready document packages."""
 
+import hashlib
+import json
+import os
 from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass
 from pathlib import Path
-from shutil import copy2, copytree
+from shutil import copy2, copytree, rmtree
 from typing import Protocol
 from xml.etree.ElementTree import Element
 
 from pdf_craft.common.xml import read_xml, save_xml
 from pdf_craft.document import DocumentPackage
 from pdf_craft.extractor.chapter.chapter import decode, encode
+from pdf_craft.metering import AbortedCheck, check_aborted
 from pdf_craft.transformer.protocol import ChapterTransformer
 from pdf_craft.transformer.xml_translator.xml_translator import SubmitKind
 
 
+_FINGERPRINTS_FILE_NAME = "fingerprints.json"
+
+
 class PackageTransformer(Protocol):
     """A format-neutral transformation from one package to another."""
 
     def transform(self, package: DocumentPackage, output_path: Path) -> DocumentPackage: ...
 
 
+@dataclass(frozen=True)
+class ChapterProgress:
+    """Reported once per chapter, in completion order."""
+
+    chapter_path: Path
+    completed: int
+    total: int
+
+
 class ChapterPackageTransformer:
-    """Copy a package and transform its chapter XML files independently."""
+    """Copy a package and transform its chapter XML files independently.
+
+    Chapters and assets of the output are hard links to the source files
+    (falling back to copies across file systems). Package files are only ever
+    replaced, never rewritten in place, so a chapter is materialized as a new
+    file only when its transformed XML differs from the source.
+
+    With ``max_workers`` above 1 chapters run concurrently on a thread pool, so
+    the chapter transformer must be safe to call from several threads. Each
+    chapter is written atomically as soon as it finishes. On abort or failure
+    the remaining chapters are cancelled and the partial output is removed.
+
+    With ``incremental`` an existing output package is updated instead of
+    rejected. Each output chapter records a fingerprint of its source XML and
+    the chapter transformer's ``fingerprint()``; chapters whose fingerprint is
+    unchanged reuse the previous output without calling the transformer.
+    Transformers without ``fingerprint()`` are always re-run.
+    """
 
     def __init__(
         self,
@@ -28,29 +63,166 @@ class ChapterPackageTransformer:
         *,
         mode: SubmitKind = SubmitKind.REPLACE,
         toc_transformer: Callable[[Element], Element] | None = None,
+        max_workers: int = 1,
+        on_progress: Callable[[ChapterProgress], None] | None = None,
+        aborted: AbortedCheck = lambda: False,
+        incremental: bool = False,
     ) -> None:
+        if max_workers < 1:
+            raise ValueError("max_workers must be at least 1.")
         if mode != SubmitKind.REPLACE and hasattr(chapter_transformer, "with_mode"):
             chapter_transformer = getattr(chapter_transformer, "with_mode")(mode)
         self.chapter_transformer = chapter_transformer
         self.mode = mode
         self.toc_transformer = toc_transformer
+        self.max_workers = max_workers
+        self.on_progress = on_progress
+        self.aborted = aborted
+        self.incremental = incremental
 
     def transform(self, package: DocumentPackage, output_path: Path) -> DocumentPackage:
         package.validate()
+        _recover_replaced_output(output_path)
+        previous: dict[str, str] = {}
         if output_path.exists():
-            raise FileExistsError(f"output package already exists: {output_path}")
-        output_path.mkdir(parents=True)
-        copytree(package.chapters_path, output_path / "chapters")
-        copytree(package.assets_path, output_path / "assets")
-        for source in (package.toc_path, package.cover_path, package.metadata_path):
-            if source is not None and source.exists():
-                copy2(source, output_path / source.name)
-
-        for path in sorted((output_path / "chapters").glob("chapter*.xml")):
-            chapter = decode(read_xml(path))
-            transformed = self.chapter_transformer.transform(chapter)
-            save_xml(encode(transformed), path)
-
-        if self.toc_transformer is not None and package.toc_path is not None and package.toc_path.exists():
-            save_xml(self.toc_transformer(read_xml(output_path / package.toc_path.name)), output_path / package.toc_path.name)
+            if not self.incremental or not (output_path / _FINGERPRINTS_FILE_NAME).exists():
+                raise FileExistsError(f"output package already exists: {output_path}")
+            previous = _read_fingerprints(output_path)
+
+        # 先在旁路目录中生成，成功后再替换，失败时旧的输出保持不变
+        staging_path = output_path.with_name(f"{output_path.name}.partial")
+        rmtree(staging_path, ignore_errors=True)
+        staging_path.mkdir(parents=True)
+        try:
+            copytree(package.chapters_path, staging_path / "chapters", copy_function=_link_or_copy)
+            copytree(package.assets_path, staging_path / "assets", copy_function=_link_or_copy)
+            for source in (package.toc_path, package.cover_path, package.metadata_path):
+                if source is not None and source.exists():
+                    copy2(source, staging_path / source.name)
+
+            fingerprints = self._transform_chapters(
+                paths=sorted((staging_path / "chapters").glob("chapter*.xml")),
+                output_path=output_path,
+                previous=previous,
+            )
+            if self.toc_transformer is not None and package.toc_path is not None and package.toc_path.exists():
+                save_xml(self.toc_transformer(read_xml(staging_path / package.toc_path.name)), staging_path / package.toc_path.name)
+            if self.incremental:
+                (staging_path / _FINGERPRINTS_FILE_NAME).write_text(
+                    json.dumps({"schema": 1, "chapters": fingerprints}, indent=2),
+                    encoding="utf-8",
+                )
+        except BaseException:
+            # 半成品包无法使用，直接丢弃，下次可以同一路径重跑
+            rmtree(staging_path, ignore_errors=True)
+            raise
+
+        # 旧输出先移到一旁再换入新包，任何时刻崩溃都至少留下一份完整的包
+        replaced_path = _replaced_path(output_path)
+        if output_path.exists():
+            output_path.rename(replaced_path)
+        staging_path.rename(output_path)
+        rmtree(replaced_path, ignore_errors=True)
         return DocumentPackage.from_path(output_path).validate()
+
+    def _transform_chapters(
+        self,
+        paths: list[Path],
+        output_path: Path,
+        previous: dict[str, str],
+    ) -> dict[str, str]:
+        fingerprints: dict[str, str] = {}
+        identity = self._identity() if self.incremental else None
+        total = len(paths)
+
+        def run(path: Path) -> None:
+            fingerprint = self._transform_chapter(path, output_path, identity, previous)
+            if fingerprint is not None:
+                fingerprints[path.name] = fingerprint
+
+        if self.max_workers == 1 or total <= 1:
+            for completed, path in enumerate(paths, start=1):
+                run(path)
+                self._report(output_path / "chapters" / path.name, completed, total)
+            return fingerprints
+
+        executor = ThreadPoolExecutor(
+            max_workers=min(self.max_workers, total),
+            thread_name_prefix="pdf-craft-chapters",
+        )
+        try:
+            futures = {executor.submit(run, path): path for path in paths}
+            for completed, future in enumerate(as_completed(futures), start=1):
+                future.result()
+                self._report(output_path / "chapters" / futures[future].name, completed, total)
+        finally:
+            executor.shutdown(wait=True, cancel_futures=True)
+        return fingerprints
+
+    def _transform_chapter(
+        self,
+        path: Path,
+        output_path: Path,
+        identity: str | None,
+        previous: dict[str, str],
+    ) -> str | None:
+        check_aborted(self.aborted)
+        fingerprint: str | None = None
+        if identity is not None:
+            sha256 = hashlib.sha256(identity.encode("utf-8"))
+            sha256.update(b"\0")
+            sha256.update(path.read_bytes())
+            fingerprint = sha256.hexdigest()
+            previous_chapter_path = output_path / "chapters" / path.name
+            if previous.get(path.name) == fingerprint and previous_chapter_path.exists():
+                path.unlink()
+                _link_or_copy(str(previous_chapter_path), str(path))
+                return fingerprint
+
+        chapter = decode(read_xml(path))
+        transformed = self.chapter_transformer.transform(chapter)
+        save_xml(encode(transformed), path, skip_unchanged=True)
+        return fingerprint
+
+    def _identity(self) -> str | None:
+        fingerprint = getattr(self.chapter_transformer, "fingerprint", None)
+        if fingerprint is None:
+            return None
+        return fingerprint()
+
+    def _report(self, path: Path, completed: int, total: int) -> None:
+        if self.on_progress is not None:
+            self.on_progress(ChapterProgress(path, completed, total))
+
+
+def _replaced_path(output_path: Path) -> Path:
+    return output_path.with_name(f"{output_path.name}.replaced")
+
+
+def _recover_replaced_output(output_path: Path) -> None:
+    replaced_path = _replaced_path(output_path)
+    if not replaced_path.exists():
+        return
+    if output_path.exists():
+        # 新包已换入，只是旧包没来得及删除
+        rmtree(replaced_path)
+    else:
+        replaced_path.rename(output_path)
+
+
+def _read_fingerprints(output_path: Path) -> dict[str, str]:
+    try:
+        data = json.loads((output_path / _FINGERPRINTS_FILE_NAME).read_text(encoding="utf-8"))
+        chapters = data["chapters"] if data.get("schema") == 1 else {}
+    except (OSError, ValueError, KeyError, AttributeError):
+        return {}
+    if not isinstance(chapters, dict):
+        return {}
+    return {str(name): str(value) for name, value in chapters.items()}
+
+
+def _link_or_copy(source: str, target: str) -> None:
+    try:
+        os.link(source, target)
+    except OSError:
+        copy2(source, target)
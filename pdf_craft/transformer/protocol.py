@@ -4,3 +4,10 @@ from pdf_craft.extractor.chapter.chapter import Chapter
 class ChapterTransformer(Protocol):
     """Format-neutral transformation contract used by document pipelines."""
     def transform(self, chapter: Chapter) -> Chapter: ...
+
+class TextBatchTransformer(Protocol):
+    """Plain-text transformation applied to several texts per call.
+
+    Returns exactly one result per input text, in input order.
+    """
+    def transform_batch(self, texts: list[str]) -> list[str]: ...
@@ -1,3 +1,3 @@
-from .xml_translator import FillFailedEvent, SubmitKind, TranslationTask, XMLTranslator
+from .xml_translator import FillFailedEvent, PlannedRequest, PlannedTranslation, SubmitKind, TranslationTask, XMLTranslator
 
-__all__ = ["FillFailedEvent", "SubmitKind", "TranslationTask", "XMLTranslator"]
+__all__ = ["FillFailedEvent", "PlannedRequest", "PlannedTranslation", "SubmitKind", "TranslationTask", "XMLTranslator"]
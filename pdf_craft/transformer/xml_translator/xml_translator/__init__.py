@@ -1,3 +1,3 @@
 from .callbacks import FillFailedEvent
 from .submitter import SubmitKind
-from .translator import TranslationTask, XMLTranslator
+from .translator import PlannedRequest, PlannedTranslation, TranslationTask, XMLTranslator, extract_xml_element
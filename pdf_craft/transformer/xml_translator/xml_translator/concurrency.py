@@ -1,46 +1,40 @@
+import asyncio
 from collections import deque
-from collections.abc import Callable, Iterable
-from concurrent.futures import Future, ThreadPoolExecutor
+from collections.abc import Awaitable, Callable, Iterable
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
 from typing import TypeVar
 
 P = TypeVar("P")
+M = TypeVar("M")
 R = TypeVar("R")
 
 
-def run_concurrency(
+def run_unordered(
     parameters: Iterable[P],
     execute: Callable[[P], R],
     concurrency: int,
 ) -> Iterable[R]:
-    assert concurrency >= 1, "the concurrency must be at least 1"
-    # Fast path: concurrency == 1, no thread overhead
-    if concurrency == 1:
-        for param in parameters:
-            yield execute(param)
-        return
+    """Yield ``execute(param)`` for every parameter, in completion order.
 
+    Parameters are pulled from the caller's thread, and at most ``concurrency``
+    of them are in flight at once.
+    """
+    assert concurrency >= 1, "the concurrency must be at least 1"
     executor = ThreadPoolExecutor(max_workers=concurrency)
     did_shutdown = False
     try:
-        futures: deque[Future[R]] = deque()
+        pending: set[Future[R]] = set()
         params_iter = iter(parameters)
-        for _ in range(concurrency):
-            try:
-                param = next(params_iter)
-                future = executor.submit(execute, param)
-                futures.append(future)
-            except StopIteration:
+        while True:
+            for param in params_iter:
+                pending.add(executor.submit(execute, param))
+                if len(pending) >= concurrency:
+                    break
+            if not pending:
                 break
-
-        while futures:
-            future = futures.popleft()
-            yield future.result()
-            try:
-                param = next(params_iter)
-                new_future = executor.submit(execute, param)
-                futures.append(new_future)
-            except StopIteration:
-                pass
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                yield future.result()
 
     except KeyboardInterrupt:
         executor.shutdown(wait=False, cancel_futures=True)
@@ -50,3 +44,52 @@ def run_concurrency(
     finally:
         if not did_shutdown:
             executor.shutdown(wait=True)
+
+
+def run_async_pipeline(
+    loop: asyncio.AbstractEventLoop,
+    parameters: Iterable[P],
+    first: Callable[[P], Awaitable[M]],
+    second: Callable[[M], Awaitable[R]],
+    first_concurrency: int,
+    second_concurrency: int,
+) -> Iterable[R]:
+    """Yield ``await second(await first(param))`` for every parameter, in input order.
+
+    Both stages are coroutines run on ``loop``, which must be running on another
+    thread, so the next item runs ``first`` while the previous one runs ``second``
+    even when both concurrencies are 1. Parameters are still pulled from the
+    caller's thread; the concurrencies only cap how many items are in each stage
+    at once, without a thread per item.
+    """
+    assert first_concurrency >= 1 and second_concurrency >= 1, "the concurrency must be at least 1"
+    first_slots = asyncio.Semaphore(first_concurrency)
+    second_slots = asyncio.Semaphore(second_concurrency)
+
+    async def execute(param: P) -> R:
+        async with first_slots:
+            middle = await first(param)
+        async with second_slots:
+            return await second(middle)
+
+    futures: deque[Future[R]] = deque()
+    try:
+        window = first_concurrency + second_concurrency
+        params_iter = iter(parameters)
+        for param in params_iter:
+            futures.append(asyncio.run_coroutine_threadsafe(execute(param), loop))
+            if len(futures) >= window:
+                break
+
+        while futures:
+            future = futures.popleft()
+            yield future.result()
+            for param in params_iter:
+                futures.append(asyncio.run_coroutine_threadsafe(execute(param), loop))
+                break
+
+    finally:
+        # 提前退出（异常或调用方不再迭代）时取消仍在进行的请求
+        for future in futures:
+            future.cancel()
+
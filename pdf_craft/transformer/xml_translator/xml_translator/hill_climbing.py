@@ -2,12 +2,11 @@ from collections.abc import Generator
 from dataclasses import dataclass
 from xml.etree.ElementTree import Element
 
-from tiktoken import Encoding
-
 from pdf_craft.transformer.xml_translator.segment import BlockSegment, BlockSubmitter, TextSegment, search_text_segments
 from pdf_craft.transformer.xml_translator.xml import plain_text
 from .common import DATA_ORIGIN_LEN_KEY
 from .stream_mapper import InlineSegmentMapping
+from .tokens import TokenCache
 from .validation import LEVEL_DEPTH, generate_error_message, nest_as_errors_group, truncate_errors_group
 
 
@@ -22,11 +21,11 @@ class _BlockStatus:
 class HillClimbing:
     def __init__(
         self,
-        encoding: Encoding,
+        encoding: TokenCache,
         max_fill_displaying_errors: int,
         block_segment: BlockSegment,
     ) -> None:
-        self._encoding: Encoding = encoding
+        self._encoding: TokenCache = encoding
         self._max_fill_displaying_errors: int = max_fill_displaying_errors
         self._block_statuses: dict[int, _BlockStatus] = {}
         self._block_segment: BlockSegment = block_segment
@@ -35,8 +34,7 @@ class HillClimbing:
         element = self._block_segment.create_element()
         for child_element in element:
             text = plain_text(child_element)
-            tokens = self._encoding.encode(text)
-            child_element.set(DATA_ORIGIN_LEN_KEY, str(len(tokens)))
+            child_element.set(DATA_ORIGIN_LEN_KEY, str(self._encoding.count(text)))
         return element
 
     def gen_mappings(self) -> Generator[InlineSegmentMapping | None, None, None]:
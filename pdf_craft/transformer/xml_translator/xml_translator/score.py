@@ -2,10 +2,9 @@ from collections.abc import Generator
 from dataclasses import dataclass
 from enum import Enum, auto
 
-from tiktoken import Encoding
-
 from pdf_craft.transformer.xml_translator.segment import InlineSegment, TextSegment
 from .common import DATA_ORIGIN_LEN_KEY
+from .tokens import TokenCache
 
 _ID_WEIGHT = 80
 _ELLIPSIS = "..."
@@ -20,7 +19,7 @@ class ScoreSegment:
     score: int
 
 
-def expand_to_score_segments(encoding: Encoding, inline_segment: InlineSegment) -> Generator[ScoreSegment, None, None]:
+def expand_to_score_segments(encoding: TokenCache, inline_segment: InlineSegment) -> Generator[ScoreSegment, None, None]:
     for i, score_segment in enumerate(_do_expand_inline_segment(inline_segment)):
         xml_text = "".join(
             _render_score_segment(
@@ -29,14 +28,14 @@ def expand_to_score_segments(encoding: Encoding, inline_segment: InlineSegment)
             )
         )
         score_segment.text_tokens = encoding.encode(score_segment.text_segment.text)
-        score_segment.score = len(encoding.encode(xml_text)) + sum(
+        score_segment.score = encoding.count(xml_text) + sum(
             _ID_WEIGHT for parent in score_segment.left_parents if parent.id is not None
         )
         yield score_segment
 
 
 def truncate_score_segment(
-    encoding: Encoding,
+    encoding: TokenCache,
     score_segment: ScoreSegment,
     remain_head: bool,
     remain_score: int,
@@ -1,52 +1,67 @@
-from collections.abc import Callable, Generator, Iterable, Iterator
+import asyncio
+from collections.abc import Awaitable, Callable, Generator, Iterable, Iterator
 from typing import TypeVar
 from xml.etree.ElementTree import Element
 
 from resource_segmentation import Group, Resource, Segment, split
-from tiktoken import Encoding
 
 from pdf_craft.transformer.xml_translator.segment import InlineSegment, TextSegment, search_inline_segments, search_text_segments
 from .callbacks import Callbacks
-from .concurrency import run_concurrency
+from .concurrency import run_async_pipeline
 from .score import ScoreSegment, expand_to_score_segments, truncate_score_segment
+from .tokens import TokenCache
 
 _PAGE_INCISION = 0
 _BLOCK_INCISION = 1
 _T = TypeVar("_T")
+_S = TypeVar("_S")
 
 _ResourcePayload = tuple[InlineSegment, list[ScoreSegment]]
 
 
 InlineSegmentMapping = tuple[Element, list[TextSegment]]
-InlineSegmentGroupMap = Callable[[list[InlineSegment]], list[InlineSegmentMapping | None]]
+InlineSegmentGroupFill = Callable[[_S], Awaitable[list[InlineSegmentMapping | None]]]
 
 
 class XMLStreamMapper:
-    def __init__(self, encoding: Encoding, max_group_score: int) -> None:
-        self._encoding: Encoding = encoding
+    def __init__(self, encoding: TokenCache, max_group_score: int) -> None:
+        self._encoding: TokenCache = encoding
         self._max_group_score: int = max_group_score
 
     def map_stream(
         self,
         elements: Iterator[Element],
         callbacks: Callbacks,
-        map: InlineSegmentGroupMap,
+        loop: asyncio.AbstractEventLoop,
+        translate: Callable[[list[InlineSegment]], Awaitable[_S]],
+        fill: InlineSegmentGroupFill[_S],
         concurrency: int,
+        fill_concurrency: int,
     ) -> Generator[tuple[Element, list[InlineSegmentMapping]], None, None]:
+        """Map each group with ``await fill(await translate(segments))`` on ``loop``.
+
+        The two calls run as separate pipeline stages with their own
+        concurrency, so one group is filled while the next is translated.
+        """
         current_element: Element | None = None
         mapping_buffer: list[InlineSegmentMapping] = []
 
-        def execute(group: Group[_ResourcePayload]):
-            head, body, tail = self._truncate_and_transform_group(group)
-            head = [segment.clone() for segment in head]
-            tail = [segment.clone() for segment in tail]
-            target_body = map(head + body + tail)[len(head) : len(head) + len(body)]
+        async def execute_translate(group: Group[_ResourcePayload]):
+            head_count, body, segments = self._group_segments(group)
+            return head_count, body, await translate(segments)
+
+        async def execute_fill(translated: tuple[int, list[InlineSegment], _S]):
+            head_count, body, payload = translated
+            target_body = (await fill(payload))[head_count : head_count + len(body)]
             return zip(body, target_body, strict=False)
 
-        for mapping_pairs in run_concurrency(
+        for mapping_pairs in run_async_pipeline(
+            loop=loop,
             parameters=self._split_into_serial_groups(elements, callbacks),
-            execute=execute,
-            concurrency=concurrency,
+            first=execute_translate,
+            second=execute_fill,
+            first_concurrency=concurrency,
+            second_concurrency=fill_concurrency,
         ):
             for origin, target in mapping_pairs:
                 origin_element = origin.head.root
@@ -68,6 +83,18 @@ class XMLStreamMapper:
         if current_element is not None:
             yield current_element, mapping_buffer
 
+    def iter_groups(self, elements: Iterable[Element], callbacks: Callbacks) -> Generator[list[InlineSegment], None, None]:
+        """Yield what ``map_stream`` would pass to ``translate``, without translating."""
+        for group in self._split_into_serial_groups(elements, callbacks):
+            _, _, segments = self._group_segments(group)
+            yield segments
+
+    def _group_segments(self, group: Group[_ResourcePayload]) -> tuple[int, list[InlineSegment], list[InlineSegment]]:
+        head, body, tail = self._truncate_and_transform_group(group)
+        head = [segment.clone() for segment in head]
+        tail = [segment.clone() for segment in tail]
+        return len(head), body, head + body + tail
+
     def _split_into_serial_groups(self, elements: Iterable[Element], callbacks: Callbacks):
         def generate():
             for element in elements:
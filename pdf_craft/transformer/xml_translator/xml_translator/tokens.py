@@ -0,0 +1,50 @@
+import threading
+from collections import OrderedDict
+from collections.abc import Sequence
+
+from tiktoken import Encoding
+
+DEFAULT_MAX_ENTRIES = 16384
+
+
+class TokenCache:
+    """Memoizes ``Encoding.encode`` by string with a bounded LRU.
+
+    Chunk scoring, fill requests and retry diagnostics encode the same
+    segment texts over and over. One cache is shared by all of them within an
+    ``XMLTranslator`` and is safe to use from its worker threads.
+    """
+
+    def __init__(self, encoding: Encoding, max_entries: int = DEFAULT_MAX_ENTRIES) -> None:
+        self._encoding: Encoding = encoding
+        self._max_entries: int = max_entries
+        self._tokens: OrderedDict[str, tuple[int, ...]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    @property
+    def encoding(self) -> Encoding:
+        return self._encoding
+
+    def encode(self, text: str) -> list[int]:
+        return list(self._lookup(text))
+
+    def count(self, text: str) -> int:
+        return len(self._lookup(text))
+
+    def decode(self, tokens: Sequence[int]) -> str:
+        return self._encoding.decode(list(tokens))
+
+    def _lookup(self, text: str) -> tuple[int, ...]:
+        with self._lock:
+            tokens = self._tokens.get(text)
+            if tokens is not None:
+                self._tokens.move_to_end(text)
+                return tokens
+        # 编码不持锁，多个线程可能重复编码同一文本，但结果相同
+        tokens = tuple(self._encoding.encode(text))
+        with self._lock:
+            self._tokens[text] = tokens
+            self._tokens.move_to_end(text)
+            while len(self._tokens) > self._max_entries:
+                self._tokens.popitem(last=False)
+        return tokens
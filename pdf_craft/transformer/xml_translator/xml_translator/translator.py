@@ -1,20 +1,30 @@
 # pylint: disable=protected-access,unused-argument
+import hashlib
+import json
+import warnings
 from collections.abc import Callable, Generator, Iterable
+from contextlib import ExitStack, contextmanager
 from dataclasses import dataclass
+from functools import partial
 from typing import Generic, TypeVar
 from xml.etree.ElementTree import Element
 
-from pdf_craft.llm import LLM, Message, MessageRole, runtime_for
-from pdf_craft.llm.loop import ProtocolRetry, ProtocolSuccess, RepairLoopOptions, run_repair_loop
+from pdf_craft.llm import LLM, LLMEvent, Message, MessageRole, PreparedRequest, runtime_for
+from pdf_craft.llm.event_loop import shared_event_loop
+from pdf_craft.llm.loop import AsyncRepairLoopOptions, ProtocolRetry, ProtocolSuccess, arun_repair_loop
 from pdf_craft.transformer.xml_translator.segment import BlockSegment, InlineSegment, TextSegment
 from pdf_craft.transformer.xml_translator.xml import decode_friendly, encode_friendly
 from .callbacks import Callbacks, FillFailedEvent, warp_callbacks
 from .hill_climbing import HillClimbing
 from .stream_mapper import InlineSegmentMapping, XMLStreamMapper
 from .submitter import SubmitKind, submit
+from .tokens import TokenCache
 
 T = TypeVar("T")
 
+# 翻译或填充的处理逻辑改变输出时递增，使增量运行不再复用旧章节；模板文本已直接计入指纹
+_FINGERPRINT_VERSION = 2
+
 
 @dataclass
 class TranslationTask(Generic[T]):
@@ -23,6 +33,26 @@ class TranslationTask(Generic[T]):
     payload: T
 
 
+@dataclass(frozen=True)
+class PlannedRequest:
+    model: str
+    request: PreparedRequest
+    cached: bool
+    prompt_tokens: int
+
+
+@dataclass(frozen=True)
+class PlannedTranslation:
+    """The requests of one chunk, as ``translate_elements`` would first send them.
+
+    ``fill`` is known only once the translation is cached, and stays ``None``
+    for chunks that need no fill request.
+    """
+
+    translation: PlannedRequest
+    fill: PlannedRequest | None
+
+
 class XMLTranslator:
     def __init__(
         self,
@@ -46,27 +76,69 @@ class XMLTranslator:
         self._max_retries: int = max_retries
         self._max_fill_displaying_errors: int = max_fill_displaying_errors
         self._cache_seed_content: str | None = cache_seed_content
+        self._max_group_score: int = max_group_score
+        # 同一译者内分组打分、填充请求与重试提示反复编码相同文本，共享一份 token 缓存
+        self._translation_tokens: TokenCache = TokenCache(translation_llm.encoding)
+        self._fill_tokens: TokenCache = (
+            self._translation_tokens
+            if fill_llm.encoding is translation_llm.encoding
+            else TokenCache(fill_llm.encoding)
+        )
         self._stream_mapper: XMLStreamMapper = XMLStreamMapper(
-            encoding=translation_llm.encoding,
+            encoding=self._translation_tokens,
             max_group_score=max_group_score,
         )
 
+    def fingerprint(self) -> str:
+        """Hash of every setting that can change the translated output."""
+        payload = {
+            "version": _FINGERPRINT_VERSION,
+            "translation_prompt": self._translation_messages("")[0].message,
+            "fill_prompt": self._fill_llm.template("fill").render(),
+            "translation_llm": _llm_identity(self._translation_llm),
+            "fill_llm": _llm_identity(self._fill_llm),
+            "target_language": self._target_language,
+            "user_prompt": self._user_prompt,
+            "ignore_translated_error": self._ignore_translated_error,
+            "max_fill_displaying_errors": self._max_fill_displaying_errors,
+            "max_group_score": self._max_group_score,
+            "cache_seed_content": self._cache_seed_content,
+        }
+        return hashlib.sha256(
+            json.dumps(payload, sort_keys=True, ensure_ascii=False).encode("utf-8")
+        ).hexdigest()
+
+    @contextmanager
+    def observe(self, on_llm_event: Callable[[LLMEvent], None]) -> Generator[None, None, None]:
+        """Report every request of this translator while the block is active.
+
+        Use it instead of ``on_llm_event`` when several ``translate_elements``
+        calls run at once, otherwise each event is reported once per call.
+        """
+        # 翻译与填充各自的 runtime 都上报到同一个回调，LLMEvent.protocol 可区分二者
+        with self._translation_runtime.observe(on_llm_event), self._fill_runtime.observe(on_llm_event):
+            yield
+
     def translate_element(
         self,
         task: TranslationTask[T],
         concurrency: int = 1,
+        fill_concurrency: int | None = None,
         interrupt_source_text_segments: Callable[[Iterable[TextSegment]], Iterable[TextSegment]] | None = None,
         interrupt_translated_text_segments: Callable[[Iterable[TextSegment]], Iterable[TextSegment]] | None = None,
         interrupt_block_element: Callable[[Element], Element] | None = None,
         on_fill_failed: Callable[[FillFailedEvent], None] | None = None,
+        on_llm_event: Callable[[LLMEvent], None] | None = None,
     ) -> tuple[Element, T]:
         for translated in self.translate_elements(
             tasks=((task),),
             concurrency=concurrency,
+            fill_concurrency=fill_concurrency,
             interrupt_source_text_segments=interrupt_source_text_segments,
             interrupt_translated_text_segments=interrupt_translated_text_segments,
             interrupt_block_element=interrupt_block_element,
             on_fill_failed=on_fill_failed,
+            on_llm_event=on_llm_event,
         ):
             return translated
 
@@ -76,11 +148,14 @@ class XMLTranslator:
         self,
         tasks: Iterable[TranslationTask[T]],
         concurrency: int = 1,
+        fill_concurrency: int | None = None,
         interrupt_source_text_segments: Callable[[Iterable[TextSegment]], Iterable[TextSegment]] | None = None,
         interrupt_translated_text_segments: Callable[[Iterable[TextSegment]], Iterable[TextSegment]] | None = None,
         interrupt_block_element: Callable[[Element], Element] | None = None,
         on_fill_failed: Callable[[FillFailedEvent], None] | None = None,
+        on_llm_event: Callable[[LLMEvent], None] | None = None,
     ) -> Generator[tuple[Element, T], None, None]:
+        self._warn_capped_concurrency(concurrency, fill_concurrency or concurrency)
         element2task: dict[int, TranslationTask[T]] = {}
         callbacks = warp_callbacks(
             interrupt_source_text_segments=interrupt_source_text_segments,
@@ -94,46 +169,132 @@ class XMLTranslator:
                 element2task[id(task.element)] = task
                 yield task.element
 
-        for element, mappings in self._stream_mapper.map_stream(
-            elements=generate_elements(),
-            callbacks=callbacks,
-            concurrency=concurrency,
-            map=lambda inline_segments: self._translate_inline_segments(
-                inline_segments=inline_segments,
+        with ExitStack() as stack:
+            if on_llm_event is not None:
+                stack.enter_context(self.observe(on_llm_event))
+            # 翻译与填充请求都是共享事件循环上的协程，并发数不再对应线程数，各章节也共用同一个连接池
+            event_loop = shared_event_loop()
+            for element, mappings in self._stream_mapper.map_stream(
+                elements=generate_elements(),
                 callbacks=callbacks,
-            ),
+                loop=event_loop.loop,
+                concurrency=concurrency,
+                fill_concurrency=fill_concurrency or concurrency,
+                translate=self._translate_inline_segments,
+                fill=partial(self._fill_inline_segments, callbacks=callbacks),
+            ):
+                task = element2task.get(id(element), None)
+                if task:
+                    translated_element = submit(
+                        element=element,
+                        action=task.action,
+                        mappings=mappings,
+                    )
+                    yield translated_element, task.payload
+
+    def _warn_capped_concurrency(self, concurrency: int, fill_concurrency: int) -> None:
+        # 超出 LLM 并发上限的部分只会排队，明确提示而不是静默降级
+        for name, requested, runtime in (
+            ("concurrency", concurrency, self._translation_runtime),
+            ("fill_concurrency", fill_concurrency, self._fill_runtime),
         ):
-            task = element2task.get(id(element), None)
-            if task:
-                translated_element = submit(
-                    element=element,
-                    action=task.action,
-                    mappings=mappings,
+            if requested > runtime.max_concurrency:
+                warnings.warn(
+                    f"{name}={requested} exceeds the LLM concurrency limit of {runtime.max_concurrency} "
+                    f"for {runtime.config.url}; raise LLM(max_concurrency=...) to run more requests at once.",
+                    stacklevel=3,
                 )
-                yield translated_element, task.payload
 
-    def _translate_inline_segments(
+    def plan_elements(
         self,
-        inline_segments: list[InlineSegment],
-        callbacks: Callbacks,
-    ) -> list[InlineSegmentMapping | None]:
-        hill_climbing = HillClimbing(
-            encoding=self._fill_llm.encoding,
+        tasks: Iterable[TranslationTask[T]],
+        interrupt_source_text_segments: Callable[[Iterable[TextSegment]], Iterable[TextSegment]] | None = None,
+    ) -> Generator[PlannedTranslation, None, None]:
+        """Split ``tasks`` into chunks like ``translate_elements`` and check each against the cache.
+
+        No LLM is called. Pass the same ``interrupt_source_text_segments`` as the
+        real run, otherwise chunks and cache keys will not match.
+        """
+        callbacks = warp_callbacks(
+            interrupt_source_text_segments=interrupt_source_text_segments,
+            interrupt_translated_text_segments=None,
+            interrupt_block_element=None,
+            on_fill_failed=None,
+        )
+        for inline_segments in self._stream_mapper.iter_groups((task.element for task in tasks), callbacks):
+            source_text = "".join(self._render_source_text_parts(inline_segments))
+            with self._translation_runtime.context(cache_seed_content=self._cache_seed_content) as ctx:
+                request = ctx.prepare(self._translation_messages(source_text))
+            translated_text = self._translation_runtime.cached(request)
+            translation = PlannedRequest(
+                model=self._translation_llm.model,
+                request=request,
+                cached=translated_text is not None,
+                prompt_tokens=self._count_prompt_tokens(self._translation_tokens, request),
+            )
+            fill: PlannedRequest | None = None
+            if translated_text is not None:
+                fill = self._plan_fill(_TranslatedGroup(
+                    inline_segments=inline_segments,
+                    hill_climbing=self._create_hill_climbing(inline_segments),
+                    source_text=source_text,
+                    translated_text=translated_text,
+                ))
+            yield PlannedTranslation(translation=translation, fill=fill)
+
+    def _plan_fill(self, translated: "_TranslatedGroup") -> PlannedRequest | None:
+        # 与 _fill_inline_segments 的调用顺序保持一致，保证首次填充请求的模板相同
+        if self._fill_trivially(translated):
+            return None
+        with self._fill_runtime.context(cache_seed_content=self._cache_seed_content) as ctx:
+            request = ctx.prepare(
+                self._fill_messages(translated.hill_climbing, translated.source_text, translated.translated_text),
+                retry_index=0,
+                retry_max=self._max_fill_attempts() - 1,
+            )
+        return PlannedRequest(
+            model=self._fill_llm.model,
+            request=request,
+            cached=self._fill_runtime.cached(request) is not None,
+            prompt_tokens=self._count_prompt_tokens(self._fill_tokens, request),
+        )
+
+    def _count_prompt_tokens(self, tokens: TokenCache, request: PreparedRequest) -> int:
+        return sum(tokens.count(message.message) for message in request.messages)
+
+    async def _translate_inline_segments(self, inline_segments: list[InlineSegment]) -> "_TranslatedGroup":
+        hill_climbing = self._create_hill_climbing(inline_segments)
+        source_text = "".join(self._render_source_text_parts(inline_segments))
+        return _TranslatedGroup(
+            inline_segments=inline_segments,
+            hill_climbing=hill_climbing,
+            source_text=source_text,
+            translated_text=await self._translate_text(source_text),
+        )
+
+    def _create_hill_climbing(self, inline_segments: list[InlineSegment]) -> HillClimbing:
+        return HillClimbing(
+            encoding=self._fill_tokens,
             max_fill_displaying_errors=self._max_fill_displaying_errors,
             block_segment=BlockSegment(
                 root_tag="xml",
                 inline_segments=inline_segments,
             ),
         )
-        source_text = "".join(self._render_source_text_parts(inline_segments))
-        translated_text = self._translate_text(source_text)
 
-        self._request_and_submit(
-            hill_climbing=hill_climbing,
-            source_text=source_text,
-            translated_text=translated_text,
-            callbacks=callbacks,
-        )
+    async def _fill_inline_segments(
+        self,
+        translated: "_TranslatedGroup",
+        callbacks: Callbacks,
+    ) -> list[InlineSegmentMapping | None]:
+        hill_climbing = translated.hill_climbing
+        if not self._fill_trivially(translated):
+            await self._request_and_submit(
+                hill_climbing=hill_climbing,
+                source_text=translated.source_text,
+                translated_text=translated.translated_text,
+                callbacks=callbacks,
+            )
         mappings: list[InlineSegmentMapping | None] = []
         for mapping in hill_climbing.gen_mappings():
             if mapping:
@@ -144,6 +305,22 @@ class XMLTranslator:
 
         return mappings
 
+    def _fill_trivially(self, translated: "_TranslatedGroup") -> bool:
+        # 只有一个不含内联子标签的段落时，译文到 XML 的映射是唯一的，无需再请求填充模型
+        if len(translated.inline_segments) != 1:
+            return False
+        inline_segment = translated.inline_segments[0]
+        if not all(isinstance(child, TextSegment) for child in inline_segment.children):
+            return False
+        text = translated.translated_text.strip()
+        if not text:
+            return False
+        element = Element("xml")
+        child_element = inline_segment.create_element()
+        child_element.text = text
+        element.append(child_element)
+        return translated.hill_climbing.submit(element) is None
+
     def _render_source_text_parts(self, inline_segments: list[InlineSegment]):
         for i, inline_segment in enumerate(inline_segments):
             if i > 0:
@@ -151,43 +328,30 @@ class XMLTranslator:
             for text_segment in inline_segment:
                 yield text_segment.text
 
-    def _translate_text(self, text: str) -> str:
+    async def _translate_text(self, text: str) -> str:
         with self._translation_runtime.context(cache_seed_content=self._cache_seed_content) as ctx:
-            return ctx.request(
-                input=[
-                    Message(
-                        role=MessageRole.SYSTEM,
-                        message=self._translation_llm.template("translate").render(
-                            target_language=self._target_language,
-                            user_prompt=self._user_prompt,
-                        ),
-                    ),
-                    Message(role=MessageRole.USER, message=text),
-                ]
-            )
+            return await ctx.arequest(input=self._translation_messages(text))
 
-    def _request_and_submit(
+    def _translation_messages(self, text: str) -> list[Message]:
+        return [
+            Message(
+                role=MessageRole.SYSTEM,
+                message=self._translation_llm.template("translate").render(
+                    target_language=self._target_language,
+                    user_prompt=self._user_prompt,
+                ),
+            ),
+            Message(role=MessageRole.USER, message=text),
+        ]
+
+    async def _request_and_submit(
         self,
         hill_climbing: HillClimbing,
         source_text: str,
         translated_text: str,
         callbacks: Callbacks,
     ) -> None:
-        user_message = (
-            f"Source text:\n{source_text}\n\n"
-            f"XML template:\n```XML\n{encode_friendly(hill_climbing.request_element())}\n```\n\n"
-            f"Translated text:\n{translated_text}"
-        )
-        fixed_messages: list[Message] = [
-            Message(
-                role=MessageRole.SYSTEM,
-                message=self._fill_llm.template("fill").render(),
-            ),
-            Message(
-                role=MessageRole.USER,
-                message=user_message,
-            ),
-        ]
+        fixed_messages = self._fill_messages(hill_climbing, source_text, translated_text)
         with self._fill_runtime.context(cache_seed_content=self._cache_seed_content) as llm_context:
             translator = self
             last_error: str | None = None
@@ -200,6 +364,9 @@ class XMLTranslator:
                         last_error = None
                         return ProtocolSuccess(None, state)
                     last_error = error
+                    if attempt == 0:
+                        # 未通过校验的首次响应不得进入缓存，否则每次重跑都会先重放它并白白消耗一次尝试
+                        llm_context.discard()
                     callbacks.on_fill_failed(FillFailedEvent(error, attempt + 1, False))
                     return ProtocolRetry(error, state, include_response=True, reset_history=True)
 
@@ -218,29 +385,73 @@ class XMLTranslator:
                     ))
                     return None
 
-            run_repair_loop(RepairLoopOptions(
+            # 只缓存首次请求且仅在其通过校验时：其消息可以提前算出，因此也能由离线批量任务预先填入缓存
+            await arun_repair_loop(AsyncRepairLoopOptions(
                 messages=fixed_messages,
-                request=lambda current, index, maximum: llm_context.request(
-                    current, retry_index=index, retry_max=maximum, use_cache=False),
+                request=lambda current, index, maximum: llm_context.arequest(
+                    current, retry_index=index, retry_max=maximum, use_cache=index == 0),
                 protocol=_XMLProtocol(), state=None,
-                max_attempts=max(1, self._max_retries),
+                max_attempts=self._max_fill_attempts(),
             ))
 
+    def _fill_messages(self, hill_climbing: HillClimbing, source_text: str, translated_text: str) -> list[Message]:
+        user_message = (
+            f"Source text:\n{source_text}\n\n"
+            f"XML template:\n```XML\n{encode_friendly(hill_climbing.request_element())}\n```\n\n"
+            f"Translated text:\n{translated_text}"
+        )
+        return [
+            Message(
+                role=MessageRole.SYSTEM,
+                message=self._fill_llm.template("fill").render(),
+            ),
+            Message(
+                role=MessageRole.USER,
+                message=user_message,
+            ),
+        ]
+
+    def _max_fill_attempts(self) -> int:
+        return max(1, self._max_retries)
+
     def _extract_xml_element(self, text: str) -> Element | str:
-        first_xml_element: Element | None = None
-        all_xml_elements: int = 0
+        return extract_xml_element(text)
+
+
+@dataclass
+class _TranslatedGroup:
+    inline_segments: list[InlineSegment]
+    hill_climbing: HillClimbing
+    source_text: str
+    translated_text: str
+
 
-        for xml_element in decode_friendly(text, tags="xml"):
-            if first_xml_element is None:
-                first_xml_element = xml_element
-            all_xml_elements += 1
+def extract_xml_element(text: str) -> Element | str:
+    """Return the single ``<xml>`` block of a fill response, or the error to report to the LLM."""
+    first_xml_element: Element | None = None
+    all_xml_elements: int = 0
 
+    for xml_element in decode_friendly(text, tags="xml"):
         if first_xml_element is None:
-            return "No complete <xml>...</xml> block found. Please ensure you have properly closed the XML with </xml> tag."  # noqa: E501
+            first_xml_element = xml_element
+        all_xml_elements += 1
 
-        if all_xml_elements > 1:
-            return (
-                f"Found {all_xml_elements} <xml>...</xml> blocks. "
-                "Please return only one XML block without any examples or explanations."
-            )
-        return first_xml_element
+    if first_xml_element is None:
+        return "No complete <xml>...</xml> block found. Please ensure you have properly closed the XML with </xml> tag."  # noqa: E501
+
+    if all_xml_elements > 1:
+        return (
+            f"Found {all_xml_elements} <xml>...</xml> blocks. "
+            "Please return only one XML block without any examples or explanations."
+        )
+    return first_xml_element
+
+
+def _llm_identity(llm: LLM) -> dict[str, object]:
+    return {
+        "url": llm.url,
+        "model": llm.model,
+        "token_encoding": llm.token_encoding,
+        "temperature": llm.temperature,
+        "top_p": llm.top_p,
+    }
@@ -3,8 +3,6 @@ from dataclasses import dataclass
 from typing import Generic, TypeVar, cast
 from xml.etree.ElementTree import Element
 
-from tiktoken import Encoding
-
 from pdf_craft.transformer.xml_translator.segment import (
     BlockContentError,
     BlockError,
@@ -20,6 +18,7 @@ from pdf_craft.transformer.xml_translator.segment import (
 )
 from ..utils import ensure_list
 from pdf_craft.transformer.xml_translator.xml import plain_text
+from .tokens import TokenCache
 
 _LEVEL_WEIGHT = 3
 _MAX_TEXT_HINT_TOKENS_COUNT = 6
@@ -92,7 +91,7 @@ def truncate_errors_group(errors_group: ErrorsGroup, max_errors: int) -> ErrorsG
     )
 
 
-def generate_error_message(encoding: Encoding, errors_group: ErrorsGroup, omitted_count: int = 0) -> None | str:
+def generate_error_message(encoding: TokenCache, errors_group: ErrorsGroup, omitted_count: int = 0) -> None | str:
     message_lines: list[str] = []
     for upper_error in errors_group.upper_errors:
         message_lines.append(_format_block_error(upper_error.error))
@@ -341,7 +340,7 @@ def _format_block_error(error: BlockError | FoundInvalidIDError) -> str:
         return "Unknown block error. Fix: Review the block structure."
 
 
-def _format_inline_error(encoding: Encoding, error: InlineError | FoundInvalidIDError, block_id: int) -> str:
+def _format_inline_error(encoding: TokenCache, error: InlineError | FoundInvalidIDError, block_id: int) -> str:
     if isinstance(error, InlineLostIDError):
         selector = _build_inline_selector(encoding, error.stack, block_id, element=error.element)
         return f"Element at `{selector}` is missing an ID attribute. Fix: Add the required ID attribute."
@@ -416,7 +415,7 @@ def _format_inline_error(encoding: Encoding, error: InlineError | FoundInvalidID
 
 
 def _build_inline_selector(
-    encoding: Encoding,
+    encoding: TokenCache,
     stack: list[Element],
     block_id: int,
     element: Element | None = None,
@@ -448,7 +447,7 @@ def _build_inline_selector(
     return selector
 
 
-def _extract_text_hint(encoding: Encoding, element: Element) -> str:
+def _extract_text_hint(encoding: TokenCache, element: Element) -> str:
     text = plain_text(element).strip()
     if text:
         tokens = encoding.encode(text)
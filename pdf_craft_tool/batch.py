@@ -0,0 +1,40 @@
+"""Local stand-in for an OpenAI-compatible batch API.
+
+Reads a batch input file written by ``epub translate --dry-run --batch-output``,
+sends each request to a chat-completion endpoint and writes a batch output
+file that ``epub collect`` can import. A real batch service can replace it.
+"""
+
+import json
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any
+
+import openai
+
+from pdf_craft import LLM
+from pdf_craft.llm import batch_response_record
+
+
+def run_batch(requests_path: Path, responses_path: Path, llm: LLM, concurrency: int = 1) -> int:
+    """Execute every request line against ``llm``'s endpoint; return the number of failures."""
+    client = openai.OpenAI(api_key=llm.key, base_url=llm.url, timeout=llm.timeout)
+    with open(requests_path, "r", encoding="utf-8") as file:
+        records = [json.loads(line) for line in file if line.strip()]
+
+    def execute(record: dict[str, Any]) -> dict[str, Any]:
+        try:
+            completion = client.chat.completions.create(**record["body"])
+        except openai.OpenAIError as error:
+            return {"custom_id": record["custom_id"], "response": None,
+                    "error": {"code": type(error).__name__, "message": str(error)}}
+        return batch_response_record(record["custom_id"], completion.choices[0].message.content or "")
+
+    failures = 0
+    with ThreadPoolExecutor(max_workers=max(1, concurrency)) as executor, \
+            open(responses_path, "w", encoding="utf-8") as file:
+        for response in executor.map(execute, records):
+            if response["error"] is not None:
+                failures += 1
+            file.write(json.dumps(response, ensure_ascii=False) + "\n")
+    return failures
@@ -0,0 +1,119 @@
+"""Micro-benchmarks for hot paths that run once per OCR block."""
+
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable
+
+from pypdf import PdfReader
+
+from pdf_craft.pdf.ngrams import RepetitionRule, find_repetitive_ngrams
+
+from .smoke.assets import discover_assets
+
+# page_extractor 对每个 OCR 块检查的两组阈值
+_RULES = (
+    RepetitionRule(min_ngram=2, max_ngram=5, repeat_threshold=16),
+    RepetitionRule(min_ngram=6, max_ngram=20, repeat_threshold=8),
+)
+
+
+@dataclass(frozen=True)
+class RepetitionBenchmark:
+    blocks: int
+    characters: int
+    reference_seconds: float
+    current_seconds: float
+    mismatches: int
+
+
+def reference_has_repetitive_ngrams(
+    text: str,
+    min_ngram: int,
+    max_ngram: int,
+    repeat_threshold: int,
+) -> bool:
+    """The tuple-comparing detector that ``find_repetitive_ngrams`` replaced."""
+    if not text:
+        return False
+
+    chars = list(text)
+    if len(chars) < min_ngram * repeat_threshold:
+        return False
+
+    for n in range(min_ngram, min(max_ngram + 1, len(chars) // repeat_threshold + 1)):
+        for i in range(len(chars) - n * repeat_threshold + 1):
+            ngram = tuple(chars[i : i + n])
+            consecutive_count = 1
+            pos = i + n
+            while pos + n <= len(chars):
+                next_ngram = tuple(chars[pos : pos + n])
+                if next_ngram == ngram:
+                    consecutive_count += 1
+                    pos += n
+                else:
+                    break
+
+            if consecutive_count >= repeat_threshold:
+                return True
+
+    return False
+
+
+def benchmark_repetition(assets_root: Path, rounds: int = 3) -> RepetitionBenchmark:
+    blocks = repetition_samples(assets_root)
+
+    def reference(text: str) -> list[bool]:
+        return [
+            reference_has_repetitive_ngrams(
+                text, rule.min_ngram, rule.max_ngram, rule.repeat_threshold
+            )
+            for rule in _RULES
+        ]
+
+    def current(text: str) -> list[bool]:
+        return find_repetitive_ngrams(text, _RULES)
+
+    mismatches = sum(1 for text in blocks if reference(text) != current(text))
+    return RepetitionBenchmark(
+        blocks=len(blocks),
+        characters=sum(len(text) for text in blocks),
+        reference_seconds=_best_of(rounds, reference, blocks),
+        current_seconds=_best_of(rounds, current, blocks),
+        mismatches=mismatches,
+    )
+
+
+def repetition_samples(assets_root: Path) -> list[str]:
+    """Text blocks from the PDF assets plus degenerate OCR-like output built from them."""
+    blocks: list[str] = []
+    for asset in discover_assets(assets_root):
+        if asset.format != "pdf":
+            continue
+        for page in PdfReader(asset.path).pages:
+            text = page.extract_text() or ""
+            blocks.extend(block.strip() for block in text.split("\n\n") if block.strip())
+
+    seed = "".join(blocks)[:64] or "pdf-craft"
+    degenerate: list[str] = []
+    for size in (2, 3, 5, 7, 12, 20):
+        unit = (seed * 20)[:size]
+        # 刚好低于阈值的重复最耗时：旧实现会沿着每个起点逐段比较到底
+        degenerate.append(seed + unit * 15 + seed)
+        degenerate.append(seed + unit * 7 + seed)
+        degenerate.append(unit * 400)
+    return blocks + degenerate
+
+
+def _best_of(
+    rounds: int,
+    detect: Callable[[str], list[bool]],
+    blocks: list[str],
+) -> float:
+    best = float("inf")
+    for _ in range(max(1, rounds)):
+        start = time.perf_counter()
+        for text in blocks:
+            detect(text)
+        best = min(best, time.perf_counter() - start)
+    return best
@@ -7,6 +7,7 @@ from pathlib import Path
 from typing import Any, cast
 
 from pdf_craft import (
+    LLM,
     ChapterPackageTransformer,
     ExtractionOptions,
     PDFCraft,
@@ -28,6 +29,8 @@ from .runtime import (
     ocr_values_from_env,
     llm_values_from_env,
 )
+from .batch import run_batch
+from .bench import benchmark_repetition
 from .paths import DEFAULT_OUTPUT_ROOT, create_run_directory
 from .smoke import SmokeRun, expand_matrix, run_smoke
 from .smoke.assets import discover_assets
@@ -93,8 +96,29 @@ def _parser() -> argparse.ArgumentParser:
     epub_translate.add_argument("--output", type=Path, help="translated file; defaults inside --work-dir")
     _add_work_dir(epub_translate, "isolated run directory")
     _add_translation_options(epub_translate)
+    epub_translate.add_argument("--chapter-concurrency", type=int, default=1,
+                                help="chapters translated at once; chunks never span chapters above 1")
+    epub_translate.add_argument("--dry-run", action="store_true",
+                                help="report cached chunks and pending tokens without calling the LLM")
+    epub_translate.add_argument("--batch-output", type=Path,
+                                help="with --dry-run, write pending translation requests as batch JSONL")
     epub_translate.set_defaults(handler=_translate_epub)
 
+    epub_batch = epub_commands.add_parser("batch", help="run a batch input file as a local stand-in batch API")
+    epub_batch.add_argument("requests", type=Path)
+    epub_batch.add_argument("responses", type=Path)
+    epub_batch.add_argument("--llm", default="translation", metavar="PROFILE",
+                            help="profile whose endpoint and credentials serve every request")
+    epub_batch.add_argument("--concurrency", type=int, default=1)
+    epub_batch.set_defaults(handler=_run_epub_batch)
+
+    epub_collect = epub_commands.add_parser("collect", help="store batch responses in the translation caches")
+    epub_collect.add_argument("responses", type=Path)
+    epub_collect.add_argument("--work-dir", type=Path, required=True, help="work directory of the dry run")
+    epub_collect.add_argument("--translation-llm", default="translation", metavar="PROFILE")
+    epub_collect.add_argument("--fill-llm", default="fill", metavar="PROFILE")
+    epub_collect.set_defaults(handler=_collect_epub)
+
     smoke = commands.add_parser("smoke", help="run parameterized smoke conversions and reports")
     smoke_commands = smoke.add_subparsers(dest="smoke_command", required=True)
     assets = smoke_commands.add_parser("assets", help="list discovered PDF and EPUB assets")
@@ -117,6 +141,13 @@ def _parser() -> argparse.ArgumentParser:
     matrix.add_argument("--output-root", type=Path, default=DEFAULT_OUTPUT_ROOT / "smoke")
     matrix.add_argument("--dry-run", action="store_true")
     matrix.set_defaults(handler=_run_matrix)
+
+    bench = commands.add_parser("bench", help="micro-benchmark hot paths on the test assets")
+    bench_commands = bench.add_subparsers(dest="bench_command", required=True)
+    repetition = bench_commands.add_parser("repetition", help="OCR repetition detector vs. the previous implementation")
+    repetition.add_argument("--assets-root", type=Path, default=Path("tests/assets"))
+    repetition.add_argument("--rounds", type=int, default=3)
+    repetition.set_defaults(handler=_bench_repetition)
     return parser
 
 
@@ -150,6 +181,7 @@ def _add_translation_options(parser: argparse.ArgumentParser) -> None:
     parser.add_argument("--max-retries", type=int, default=3)
     parser.add_argument("--max-group-tokens", type=int, default=2600)
     parser.add_argument("--concurrency", type=int, default=1)
+    parser.add_argument("--fill-concurrency", type=int, help="defaults to --concurrency")
     parser.add_argument("--translation-llm", default="translation", metavar="PROFILE")
     parser.add_argument("--fill-llm", default="fill", metavar="PROFILE")
 
@@ -227,25 +259,66 @@ def _render_package(args: argparse.Namespace) -> None:
 
 def _translate_epub(args: argparse.Namespace) -> None:
     load_project_env(_project_root())
-    work_dir = _work_dir(args.source, args.work_dir, "translate")
+    if args.batch_output and not args.dry_run:
+        raise SystemExit("--batch-output requires --dry-run")
+    # 试运行、collect 与随后的正式翻译共用同一 --work-dir 中的缓存
+    work_dir = _work_dir(args.source, args.work_dir, "translate", reuse=True)
+    translation_llm, fill_llm = _epub_llms(args, work_dir)
+    if args.dry_run:
+        plan = PDFCraft().plan_epub_translation(
+            args.source, target_language=args.target_language,
+            submit=SubmitKind[args.submit.replace("-", "_").upper()],
+            user_prompt=args.prompt, max_retries=args.max_retries, max_group_tokens=args.max_group_tokens,
+            translation_llm=translation_llm, fill_llm=fill_llm, batch_path=args.batch_output,
+            chapter_concurrency=args.chapter_concurrency,
+        )
+        print(f"Chunks: total={plan.chunks}, cached={plan.cached_chunks}, pending={plan.pending_chunks}")
+        print(f"Pending prompt tokens: {plan.pending_prompt_tokens}")
+        print(f"Fill requests: known={plan.fill_requests}, cached={plan.cached_fill_requests}, "
+              f"pending={plan.pending_fill_requests}, pending prompt tokens={plan.pending_fill_prompt_tokens}")
+        if plan.batch_path is not None:
+            print(f"Batch: {plan.batch_path} ({plan.batch_requests} requests)")
+        return
     output = args.output or work_dir / "book.epub"
     if output.exists():
         raise SystemExit(f"Output already exists: {output}")
     output.parent.mkdir(parents=True, exist_ok=True)
-    translation_llm = create_llm_from_env(args.translation_llm,
-        cache_path=work_dir / "translation-cache", log_dir_path=work_dir / "translation-logs")
-    fill_llm = translation_llm if args.fill_llm == args.translation_llm else create_llm_from_env(args.fill_llm,
-        cache_path=work_dir / "fill-cache", log_dir_path=work_dir / "fill-logs")
     PDFCraft().translate_epub(
         args.source, output, target_language=args.target_language,
         submit=SubmitKind[args.submit.replace("-", "_").upper()],
         user_prompt=args.prompt, max_retries=args.max_retries,
         max_group_tokens=args.max_group_tokens, concurrency=args.concurrency,
+        fill_concurrency=args.fill_concurrency, chapter_concurrency=args.chapter_concurrency,
         translation_llm=translation_llm, fill_llm=fill_llm,
     )
     print(f"Output: {output}")
 
 
+def _run_epub_batch(args: argparse.Namespace) -> None:
+    load_project_env(_project_root())
+    llm = create_llm_from_env(args.llm, cache_path=args.responses.parent / "batch-cache",
+                              log_dir_path=args.responses.parent / "batch-logs")
+    failures = run_batch(args.requests, args.responses, llm, concurrency=args.concurrency)
+    print(f"Responses: {args.responses} ({failures} failed)")
+
+
+def _collect_epub(args: argparse.Namespace) -> None:
+    load_project_env(_project_root())
+    if not args.work_dir.is_dir():
+        raise SystemExit(f"Missing work directory: {args.work_dir}")
+    translation_llm, fill_llm = _epub_llms(args, args.work_dir)
+    stored = PDFCraft().collect_epub_translation(args.responses, translation_llm=translation_llm, fill_llm=fill_llm)
+    print(f"Stored responses: {stored}")
+
+
+def _epub_llms(args: argparse.Namespace, work_dir: Path) -> tuple[LLM, LLM]:
+    translation_llm = create_llm_from_env(args.translation_llm,
+        cache_path=work_dir / "translation-cache", log_dir_path=work_dir / "translation-logs")
+    fill_llm = translation_llm if args.fill_llm == args.translation_llm else create_llm_from_env(args.fill_llm,
+        cache_path=work_dir / "fill-cache", log_dir_path=work_dir / "fill-logs")
+    return translation_llm, fill_llm
+
+
 def _list_assets(args: argparse.Namespace) -> None:
     print(json.dumps([
         asset.__dict__ | {"path": str(asset.path)} for asset in discover_assets(args.assets_root)
@@ -309,6 +382,16 @@ def _run_matrix(args: argparse.Namespace) -> None:
         print(run_smoke(run, assets_root=args.assets_root, output_root=args.output_root, dry_run=args.dry_run))
 
 
+def _bench_repetition(args: argparse.Namespace) -> None:
+    result = benchmark_repetition(args.assets_root, rounds=args.rounds)
+    print(f"Blocks: {result.blocks} ({result.characters} characters)")
+    print(f"Reference: {result.reference_seconds * 1000:.1f} ms")
+    print(f"Current: {result.current_seconds * 1000:.1f} ms")
+    print(f"Speedup: {result.reference_seconds / max(result.current_seconds, 1e-9):.1f}x")
+    if result.mismatches:
+        raise SystemExit(f"{result.mismatches} blocks disagree with the reference implementation")
+
+
 def _matrix_run_needs_env(run: SmokeRun) -> bool:
     if run.backend and run.ocr is None:
         return True
@@ -388,10 +471,10 @@ def _render(craft: PDFCraft, package: DocumentPackage, format_name: str, output:
         craft.render_epub(package, output)
 
 
-def _work_dir(source: Path, requested: Path | None, operation: str) -> Path:
+def _work_dir(source: Path, requested: Path | None, operation: str, reuse: bool = False) -> Path:
     if requested is not None:
         path = requested
-        path.mkdir(parents=True, exist_ok=False)
+        path.mkdir(parents=True, exist_ok=reuse)
         return path
     return create_run_directory(DEFAULT_OUTPUT_ROOT / "manual", f"{source.stem}-{operation}")
 
@@ -0,0 +1,78 @@
+import hashlib
+import threading
+import time
+import unittest
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from unittest.mock import patch
+
+from PIL import Image
+
+from pdf_craft.common import AssetHub
+
+
+class TestAssetHub(unittest.TestCase):
+    def test_hash_names_the_png_file_content(self):
+        image = Image.new("RGB", (50, 50), "white")
+        image.paste((255, 0, 0), (10, 10, 20, 20))
+        with TemporaryDirectory() as temp_dir:
+            asset_path = Path(temp_dir)
+            image_hash = AssetHub(asset_path).clip(image, (5, 5, 25, 25))
+            files = list(asset_path.iterdir())
+            self.assertEqual([path.name for path in files], [f"{image_hash}.png"])
+            self.assertEqual(hashlib.sha256(files[0].read_bytes()).hexdigest(), image_hash)
+
+    def test_known_hashes_skip_the_disk(self):
+        image = Image.new("RGB", (50, 50), "white")
+        with TemporaryDirectory() as temp_dir:
+            hub = AssetHub(Path(temp_dir))
+            with patch.object(AssetHub, "_write", autospec=True) as write:
+                hashes = {hub.clip(image, (0, 0, 10, 10)) for _ in range(5)}
+            self.assertEqual(len(hashes), 1)
+            self.assertEqual(write.call_count, 1)
+
+    def test_background_writes_are_visible_after_flush(self):
+        image = Image.new("RGB", (50, 50), "white")
+        image.paste((0, 0, 255), (0, 0, 25, 50))
+        with TemporaryDirectory() as temp_dir:
+            asset_path = Path(temp_dir) / "assets"
+            hub = AssetHub(asset_path, background_writes=True)
+            try:
+                left = hub.clip(image, (0, 0, 25, 50))
+                right = hub.clip(image, (25, 0, 50, 50))
+                hub.flush()
+                self.assertEqual(
+                    sorted(path.name for path in asset_path.iterdir()),
+                    sorted([f"{left}.png", f"{right}.png"]),
+                )
+            finally:
+                hub.close()
+
+    def test_concurrent_flushes_both_wait_for_earlier_writes(self):
+        image = Image.new("RGB", (50, 50), "white")
+        release = threading.Event()
+        original_write = AssetHub._write  # pylint: disable=protected-access
+
+        def slow_write(hub, image_hash, data):
+            release.wait(timeout=5)
+            original_write(hub, image_hash, data)
+
+        with TemporaryDirectory() as temp_dir:
+            asset_path = Path(temp_dir) / "assets"
+            hub = AssetHub(asset_path, background_writes=True)
+            try:
+                with patch.object(AssetHub, "_write", slow_write):
+                    image_hash = hub.clip(image, (0, 0, 10, 10))
+                    first = threading.Thread(target=hub.flush)
+                    first.start()
+                    time.sleep(0.05)
+                    threading.Timer(0.1, release.set).start()
+                    hub.flush()
+                    self.assertTrue((asset_path / f"{image_hash}.png").exists())
+                    first.join()
+            finally:
+                hub.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,10 +1,16 @@
 import tempfile
+import threading
+import time
 import unittest
 from pathlib import Path
+from types import SimpleNamespace
 from unittest.mock import patch
 from typing import cast
 from PIL import Image
+from pypdf import PdfReader, PdfWriter
+from doc_page_extractor.extraction_context import TokenLimitError
 
+from pdf_craft.craft import ExtractionOptions, PDFCraft
 from pdf_craft.document import DocumentPackage
 from pdf_craft.extractor import PDFExtractor
 from pdf_craft.pipeline.pdf.pipeline import PDFTranslationPipeline
@@ -13,10 +19,11 @@ from pdf_craft.transformer import ChapterXMLTransformer
 from pdf_craft.renderer import EpubRenderer, MarkdownRenderer
 from pdf_craft.extractor.chapter.chapter import BlockLayout, Chapter, InlineExpression, ParagraphLayout, Reference
 from pdf_craft.expression import ExpressionKind
-from pdf_craft.ocr_config import DeepSeekOCRLocalConfig
+from pdf_craft.ocr_config import DeepSeekOCRLocalConfig, DeepSeekOCRVendorConfig
 from pdf_craft.pdf.ocr import OCR
-from pdf_craft.pdf.handler import PDFHandler
+from pdf_craft.pdf.handler import DefaultPDFHandler, PDFHandler
 from pdf_craft.pdf.types import Page
+from pdf_craft.transform import Transform
 
 
 class _FakeTransform:
@@ -48,8 +55,6 @@ class _CapturePatcher:
 
 
 class _FakeDocument:
-    pages_count = 1
-
     def metadata(self):
         raise AssertionError("metadata is not used by this OCR test")
 
@@ -62,7 +67,8 @@ class _FakeDocument:
         self.render_count += 1
         return Image.new("RGB", (100, 100))
 
-    def __init__(self):
+    def __init__(self, pages_count=1):
+        self.pages_count = pages_count
         self.render_count = 0
 
     def close(self):
@@ -70,8 +76,8 @@ class _FakeDocument:
 
 
 class _FakeHandler:
-    def __init__(self):
-        self.document = _FakeDocument()
+    def __init__(self, pages_count=1):
+        self.document = _FakeDocument(pages_count)
 
     def open(self, pdf_path):
         del pdf_path
@@ -88,6 +94,14 @@ class _DeterministicXMLTranslator:
         return task.element, task.payload
 
 
+def _write_empty_package(root: Path, page_pixel_sizes: dict[int, tuple[int, int]]) -> DocumentPackage:
+    package = DocumentPackage.from_path(root)
+    package.chapters_path.mkdir(parents=True)
+    package.assets_path.mkdir()
+    package.write_metadata(dpi=300, page_pixel_sizes=page_pixel_sizes)
+    return package
+
+
 class TestComposableBoundaries(unittest.TestCase):
     def test_extractor_creates_empty_assets_directory_for_asset_free_pages(self):
         with tempfile.TemporaryDirectory() as directory:
@@ -97,6 +111,24 @@ class TestComposableBoundaries(unittest.TestCase):
             )
             self.assertTrue(package.assets_path.is_dir())
 
+    def test_extraction_passes_the_llm_observer_to_toc_analysis(self):
+        def analyse_toc(*, toc_path, **_kwargs):
+            toc_path.write_text("<toc/>")
+
+        with tempfile.TemporaryDirectory() as directory:
+            root = Path(directory)
+            transform = Transform.__new__(Transform)
+            ocr = SimpleNamespace(recognize=lambda **_: iter(()), last_page_pixel_sizes={1: (100, 100)})
+            transform._ocr = cast(OCR, ocr)  # pylint: disable=protected-access
+            events = []
+            with patch("pdf_craft.transform.analyse_toc", side_effect=analyse_toc) as analyse, \
+                 patch("pdf_craft.transform.generate_chapter_files",
+                       side_effect=lambda *, chapters_path, **_: chapters_path.mkdir()):
+                PDFCraft.from_engine(transform).extract_pdf(
+                    root / "input.pdf", root / "package", ExtractionOptions(on_llm_event=events.append),
+                )
+            self.assertIs(analyse.call_args.kwargs["on_llm_event"].__self__, events)
+
     def test_extractor_produces_package_consumed_by_renderers_without_ocr_cache(self):
         with tempfile.TemporaryDirectory() as directory:
             root = Path(directory)
@@ -139,6 +171,97 @@ class TestComposableBoundaries(unittest.TestCase):
             self.assertIn("[1]", replacement.text)
             self.assertIn("T:heading", patcher.replacements[1].text)
 
+    def test_pdf_pipeline_batches_distinct_texts_once_across_chapters(self):
+        with tempfile.TemporaryDirectory() as directory:
+            root = Path(directory)
+            package = _write_empty_package(root, {1: (100, 100), 2: (100, 100)})
+            chapters = [
+                Chapter(None, -1, [ParagraphLayout("text", 0, [
+                    BlockLayout(1, 1, (1, 1, 50, 10), ["Header"]),
+                    BlockLayout(1, 2, (1, 20, 50, 50), ["alpha"]),
+                ])]),
+                Chapter(None, -1, [ParagraphLayout("text", 0, [
+                    BlockLayout(2, 1, (1, 1, 50, 10), ["Header"]),
+                    BlockLayout(2, 2, (1, 20, 50, 50), ["beta"]),
+                    BlockLayout(2, 3, (1, 60, 50, 90), ["same"]),
+                ])]),
+            ]
+            batches: list[list[str]] = []
+
+            class BatchTransformer:
+                def transform_batch(self, texts):
+                    batches.append(list(texts))
+                    return [text if text == "same" else "T:" + text for text in texts]
+
+            patcher = _CapturePatcher()
+            with patch("pdf_craft.pipeline.pdf.pipeline.create_chapters_reader", return_value=lambda: iter(chapters)):
+                PDFTranslationPipeline(patcher=cast(PDFPatcher, patcher), batch_size=2).translate(
+                    root / "input.pdf", root / "out.pdf", package, BatchTransformer()
+                )
+            self.assertEqual(batches, [["Header", "alpha"], ["beta", "same"]])
+            # Unchanged text is left alone; repeated headers are patched on every page
+            self.assertEqual(
+                [(item.page_index, item.text) for item in patcher.replacements],
+                [(1, "T:Header"), (1, "T:alpha"), (2, "T:Header"), (2, "T:beta")],
+            )
+
+    def test_pdf_pipeline_runs_plain_transformer_on_thread_pool(self):
+        with tempfile.TemporaryDirectory() as directory:
+            root = Path(directory)
+            package = _write_empty_package(root, {1: (100, 100)})
+            texts = [f"block {index}" for index in range(8)]
+            chapter = Chapter(None, -1, [ParagraphLayout("text", 0, [
+                BlockLayout(1, index, (1, index * 10, 50, index * 10 + 5), [text]) for index, text in enumerate(texts)
+            ])])
+            calls: list[str] = []
+
+            def transformer(text):
+                calls.append(text)
+                time.sleep(0.01)
+                return text.upper()
+
+            patcher = _CapturePatcher()
+            with patch("pdf_craft.pipeline.pdf.pipeline.create_chapters_reader", return_value=lambda: iter([chapter])):
+                PDFTranslationPipeline(patcher=cast(PDFPatcher, patcher), max_workers=4).translate(
+                    root / "input.pdf", root / "out.pdf", package, transformer
+                )
+            self.assertEqual(sorted(calls), sorted(texts))
+            self.assertEqual([item.text for item in patcher.replacements], [text.upper() for text in texts])
+            with self.assertRaises(ValueError):
+                PDFTranslationPipeline(patcher=cast(PDFPatcher, patcher), max_workers=0)
+            self.assertEqual(PDFTranslationPipeline(patch_workers=3).patcher.max_workers, 3)
+
+    def test_pdf_pipeline_resolves_missing_page_size_without_rendering(self):
+        with tempfile.TemporaryDirectory() as directory:
+            root = Path(directory)
+            package = _write_empty_package(root, {})
+            chapter = Chapter(None, -1, [ParagraphLayout("text", 0, [BlockLayout(1, 1, (1, 1, 50, 50), ["text"])])])
+            handler = _FakeHandler()
+            patcher = _CapturePatcher()
+            with patch("pdf_craft.pipeline.pdf.pipeline.create_chapters_reader", return_value=lambda: iter([chapter])):
+                PDFTranslationPipeline(cast(PDFHandler, handler), cast(PDFPatcher, patcher), dpi=150).translate(
+                    root / "input.pdf", root / "out.pdf", package, lambda text: "T:" + text
+                )
+            self.assertEqual(patcher.replacements[0].page_pixel_size, (150, 150))
+            self.assertEqual(handler.document.render_count, 0)
+
+    def test_pdf_pipeline_resolves_rotated_page_size_in_displayed_orientation(self):
+        with tempfile.TemporaryDirectory() as directory:
+            root = Path(directory)
+            writer = PdfWriter()
+            writer.add_blank_page(width=200, height=100).rotate(90)
+            with open(root / "input.pdf", "wb") as file:
+                writer.write(file)
+            package = _write_empty_package(root, {})
+            # A tall box fits the displayed 100x200 page but not the 200x100 media box.
+            chapter = Chapter(None, -1, [ParagraphLayout("text", 0, [BlockLayout(1, 1, (10, 10, 90, 190), ["text"])])])
+            handler = DefaultPDFHandler()
+            with patch("pdf_craft.pipeline.pdf.pipeline.create_chapters_reader", return_value=lambda: iter([chapter])):
+                PDFTranslationPipeline(handler, PDFPatcher(pdf_handler=handler), dpi=72).translate(
+                    root / "input.pdf", root / "out.pdf", package, lambda text: "T:" + text
+                )
+            self.assertEqual(len(PdfReader(root / "out.pdf").pages), 1)
+
     def test_metadata_path_is_retained_for_direct_package(self):
         with tempfile.TemporaryDirectory() as directory:
             root = Path(directory)
@@ -176,6 +299,68 @@ class TestComposableBoundaries(unittest.TestCase):
             self.assertEqual(resumed.last_page_pixel_sizes, {1: (100, 100)})
             self.assertEqual(handler.document.render_count, 1)
 
+    def test_pipelined_ocr_keeps_event_order_and_shares_token_budget(self):
+        def image2page(*, page_index, max_tokens, **_kwargs):
+            time.sleep(0.01 * (page_index % 3))
+            self.assertGreater(max_tokens, 0)
+            return Page(page_index, None, [], [], 10, 5)
+
+        with tempfile.TemporaryDirectory() as directory:
+            root = Path(directory)
+            handler = _FakeHandler(pages_count=6)
+            ocr = OCR(
+                DeepSeekOCRVendorConfig(base_url="http://localhost", api_key="key", model="ocr"),
+                cast(PDFHandler, handler),
+            )
+            with patch("pdf_craft.pdf.ocr.PageExtractorNode.image2page", side_effect=image2page):
+                events = list(ocr.recognize(
+                    root / "input.pdf", root / "assets", root / "ocr",
+                    max_tokens=1000, ocr_workers=3, prefetch_pages=2,
+                ))
+            self.assertEqual(
+                [(event.page_index, event.kind.name) for event in events],
+                [(index, kind) for index in range(1, 7) for kind in ("START", "RENDERED", "COMPLETE")],
+            )
+            self.assertEqual(sum(event.output_tokens for event in events), 30)
+            self.assertEqual(handler.document.render_count, 6)
+            self.assertTrue((root / "ocr" / "done").exists())
+
+            with patch("pdf_craft.pdf.ocr.PageExtractorNode.image2page", side_effect=image2page):
+                with self.assertRaises(TokenLimitError):
+                    list(OCR(
+                        DeepSeekOCRVendorConfig(base_url="http://localhost", api_key="key", model="ocr"),
+                        cast(PDFHandler, _FakeHandler(pages_count=6)),
+                    ).recognize(
+                        root / "input.pdf", root / "assets", root / "budget-ocr",
+                        max_tokens=15, ocr_workers=2,
+                    ))
+
+    def test_pipelined_ocr_saves_pages_in_flight_when_the_budget_runs_out(self):
+        # Pages 1 and 2 are both being recognized before either is charged.
+        barrier = threading.Barrier(2, timeout=5)
+
+        def image2page(*, page_index, **_kwargs):
+            if page_index <= 2:
+                barrier.wait()
+            return Page(page_index, None, [], [], 10, 5)
+
+        with tempfile.TemporaryDirectory() as directory:
+            root = Path(directory)
+            ocr = OCR(
+                DeepSeekOCRVendorConfig(base_url="http://localhost", api_key="key", model="ocr"),
+                cast(PDFHandler, _FakeHandler(pages_count=4)),
+            )
+            events = []
+            with patch("pdf_craft.pdf.ocr.PageExtractorNode.image2page", side_effect=image2page):
+                with self.assertRaises(TokenLimitError):
+                    for event in ocr.recognize(root / "input.pdf", root / "assets", root / "ocr",
+                                               max_tokens=15, ocr_workers=2):
+                        events.append(event)
+            completed = [event.page_index for event in events if event.kind.name == "COMPLETE"]
+            self.assertEqual(completed, [1, 2])
+            self.assertTrue((root / "ocr" / "page_2.xml").exists())
+            self.assertFalse((root / "ocr" / "page_3.xml").exists())
+
     def test_package_rejects_malformed_page_geometry(self):
         with tempfile.TemporaryDirectory() as directory:
             root = Path(directory)
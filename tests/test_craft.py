@@ -1,9 +1,13 @@
+import shutil
 import tempfile
+import threading
 import unittest
 from pathlib import Path
 from unittest.mock import Mock, patch
 from xml.etree.ElementTree import tostring
 
+from doc_page_extractor.extraction_context import AbortError
+
 from pdf_craft.craft import ExtractionOptions, PDFCraft, PDFOptions, TranslationStep
 from pdf_craft.document import DocumentPackage
 from pdf_craft.error import InterruptedError as PDFInterruptedError, PDFError
@@ -31,6 +35,24 @@ class _Engine:
         return "detected metadata"
 
 
+def _chapter_package(path: Path, chapters: int) -> DocumentPackage:
+    package = DocumentPackage.from_path(path)
+    package.chapters_path.mkdir(parents=True)
+    package.assets_path.mkdir()
+    package.write_metadata(page_pixel_sizes={1: (10, 10)})
+    for index in range(1, chapters + 1):
+        chapter = Chapter(
+            None, -1, [ParagraphLayout(
+                "text", 0, [BlockLayout(1, 1, (1, 1, 5, 5), ["original"])]
+            )]
+        )
+        (package.chapters_path / f"chapter_{index}.xml").write_text(
+            '<?xml version="1.0" encoding="UTF-8"?>\n'
+            + tostring(encode(chapter), encoding="unicode")
+        )
+    return package
+
+
 class TestPDFCraft(unittest.TestCase):
     def test_package_step_creates_independent_package(self):
         with tempfile.TemporaryDirectory() as directory:
@@ -89,6 +111,153 @@ class TestPDFCraft(unittest.TestCase):
             assert target.toc_path is not None
             self.assertIn('translated="yes"', target.toc_path.read_text())
 
+    def test_package_chapters_transform_concurrently_with_progress(self):
+        with tempfile.TemporaryDirectory() as directory:
+            root = Path(directory)
+            source = _chapter_package(root / "source", chapters=3)
+            barrier = threading.Barrier(3, timeout=5)
+
+            class Concurrent:
+                def transform(self, chapter: Chapter) -> Chapter:
+                    barrier.wait()  # only passes if all chapters are in flight together
+                    layout = chapter.layouts[0]
+                    assert isinstance(layout, ParagraphLayout)
+                    layout.blocks[0].content = ["translated"]
+                    return chapter
+
+            progress = []
+            target = ChapterPackageTransformer(
+                Concurrent(), max_workers=3, on_progress=progress.append,
+            ).transform(source, root / "target")
+
+            self.assertEqual([event.completed for event in progress], [1, 2, 3])
+            self.assertEqual({event.total for event in progress}, {3})
+            self.assertEqual(
+                sorted(event.chapter_path.name for event in progress),
+                ["chapter_1.xml", "chapter_2.xml", "chapter_3.xml"],
+            )
+            for path in target.chapters_path.glob("chapter*.xml"):
+                self.assertIn("translated", path.read_text())
+
+    def test_package_abort_stops_and_removes_partial_output(self):
+        with tempfile.TemporaryDirectory() as directory:
+            root = Path(directory)
+            source = _chapter_package(root / "source", chapters=4)
+            calls = []
+
+            class Counting:
+                def transform(self, chapter: Chapter) -> Chapter:
+                    calls.append(chapter)
+                    return chapter
+
+            transformer = ChapterPackageTransformer(
+                Counting(), max_workers=2, aborted=lambda: len(calls) >= 1,
+            )
+            with self.assertRaises(AbortError):
+                transformer.transform(source, root / "target")
+            self.assertLess(len(calls), 4)
+            self.assertFalse((root / "target").exists())
+
+    def test_package_links_assets_and_materializes_only_changed_chapters(self):
+        with tempfile.TemporaryDirectory() as directory:
+            root = Path(directory)
+            source = _chapter_package(root / "source", chapters=2)
+            (source.assets_path / "image.png").write_bytes(b"png")
+            calls = []
+
+            class FirstOnly:
+                def transform(self, chapter: Chapter) -> Chapter:
+                    layout = chapter.layouts[0]
+                    assert isinstance(layout, ParagraphLayout)
+                    if not calls:
+                        layout.blocks[0].content = ["translated"]
+                    calls.append(chapter)
+                    return chapter
+
+            target = ChapterPackageTransformer(FirstOnly()).transform(source, root / "target")
+
+            def same_file(name: str) -> bool:
+                return (source.chapters_path.parent / name).samefile(target.chapters_path.parent / name)
+
+            self.assertTrue(same_file("assets/image.png"))
+            self.assertFalse(same_file("chapters/chapter_1.xml"))
+            self.assertTrue(same_file("chapters/chapter_2.xml"))
+            self.assertIn("original", (source.chapters_path / "chapter_1.xml").read_text())
+            self.assertIn("translated", (target.chapters_path / "chapter_1.xml").read_text())
+
+    def test_incremental_package_reuses_chapters_with_unchanged_fingerprints(self):
+        with tempfile.TemporaryDirectory() as directory:
+            root = Path(directory)
+            source = _chapter_package(root / "source", chapters=3)
+            calls = []
+
+            class Versioned:
+                def __init__(self, version: str):
+                    self.version = version
+
+                def fingerprint(self) -> str:
+                    return self.version
+
+                def transform(self, chapter: Chapter) -> Chapter:
+                    calls.append(self.version)
+                    layout = chapter.layouts[0]
+                    assert isinstance(layout, ParagraphLayout)
+                    layout.blocks[0].content = [f"{layout.blocks[0].content[0]} {self.version}"]
+                    return chapter
+
+            def run(version: str) -> DocumentPackage:
+                calls.clear()
+                return ChapterPackageTransformer(
+                    Versioned(version), incremental=True,
+                ).transform(source, root / "target")
+
+            run("v1")
+            self.assertEqual(len(calls), 3)
+
+            edited = _chapter_package(root / "edited", chapters=1).chapters_path / "chapter_1.xml"
+            edited.write_text(edited.read_text().replace("original", "fixed"))
+            edited.replace(source.chapters_path / "chapter_2.xml")
+            target = run("v1")
+            self.assertEqual(len(calls), 1)
+            self.assertIn("original v1", (target.chapters_path / "chapter_1.xml").read_text())
+            self.assertIn("fixed v1", (target.chapters_path / "chapter_2.xml").read_text())
+
+            run("v2")
+            self.assertEqual(len(calls), 3)
+            with self.assertRaises(FileExistsError):
+                ChapterPackageTransformer(Versioned("v2")).transform(source, root / "target")
+
+    def test_incremental_package_recovers_output_moved_aside_by_a_crash(self):
+        with tempfile.TemporaryDirectory() as directory:
+            root = Path(directory)
+            source = _chapter_package(root / "source", chapters=2)
+            calls = []
+
+            class Fixed:
+                def fingerprint(self) -> str:
+                    return "fixed"
+
+                def transform(self, chapter: Chapter) -> Chapter:
+                    calls.append(chapter)
+                    return chapter
+
+            def run() -> DocumentPackage:
+                return ChapterPackageTransformer(Fixed(), incremental=True).transform(source, root / "target")
+
+            run()
+            # Crash after moving the old output aside, before the new one was renamed in.
+            (root / "target").rename(root / "target.replaced")
+            calls.clear()
+            run()
+            self.assertEqual(calls, [])
+            self.assertFalse((root / "target.replaced").exists())
+
+            # Crash after the swap, before the old output was deleted.
+            shutil.copytree(root / "target", root / "target.replaced")
+            run()
+            self.assertEqual(calls, [])
+            self.assertFalse((root / "target.replaced").exists())
+
     def test_pdf_rejects_append_block_steps_before_transforming(self):
         craft = PDFCraft.from_engine(_Engine())
         step = TranslationStep(Mock(), SubmitKind.APPEND_BLOCK)
@@ -98,6 +267,16 @@ class TestPDFCraft(unittest.TestCase):
                 "out.pdf", lambda text: text, steps=[step]
             )
 
+    def test_pdf_translation_forwards_worker_counts_to_the_pipeline(self):
+        craft = PDFCraft.from_engine(_Engine())
+        package = DocumentPackage(Path("chapters"), Path("assets"))
+        with patch("pdf_craft.craft.PDFTranslationPipeline") as pipeline:
+            craft.translate_pdf("source.pdf", package, "out.pdf", lambda text: text,
+                                max_workers=2, batch_size=8, patch_workers=4)
+        kwargs = pipeline.call_args.kwargs
+        self.assertEqual((kwargs["max_workers"], kwargs["batch_size"], kwargs["patch_workers"]), (2, 8, 4))
+        pipeline.return_value.translate.assert_called_once()
+
     def test_pdf_rejects_append_block_package_transformer(self):
         craft = PDFCraft.from_engine(_Engine())
         transformer = ChapterPackageTransformer(Mock(), mode=SubmitKind.APPEND_BLOCK)
@@ -0,0 +1,98 @@
+import os
+import sqlite3
+import tempfile
+import threading
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+from pdf_craft.llm import DirectoryLLMCache, SQLiteLLMCache
+
+
+class TestLLMCache(unittest.TestCase):
+    def test_directory_cache_keeps_one_file_per_response(self):
+        with tempfile.TemporaryDirectory() as directory:
+            cache = DirectoryLLMCache(directory)
+            cache.put_many({"a": "first", "b": "second"})
+            cache.put_many({"a": "ignored"})
+            self.assertEqual(cache.get("a"), "first")
+            self.assertIsNone(cache.get("missing"))
+            self.assertEqual(sorted(os.listdir(directory)), ["a.txt", "b.txt"])
+
+    def test_sqlite_cache_persists_in_one_file(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = Path(directory) / "llm.sqlite"
+            SQLiteLLMCache(path).put_many({"a": "first", "b": "second"})
+            cache = SQLiteLLMCache(path)
+            self.assertEqual(cache.get("a"), "first")
+            self.assertEqual(cache.get("b"), "second")
+            self.assertIsNone(cache.get("c"))
+
+    def test_sqlite_cache_evicts_least_recently_read_over_max_size(self):
+        with tempfile.TemporaryDirectory() as directory:
+            cache = SQLiteLLMCache(Path(directory) / "llm.sqlite", max_size=10)
+            with patch("pdf_craft.llm.cache.time.time", return_value=1.0):
+                cache.put_many({"a": "aaaa", "b": "bbbb"})
+            with patch("pdf_craft.llm.cache.time.time", return_value=2.0):
+                self.assertEqual(cache.get("a"), "aaaa")
+            with patch("pdf_craft.llm.cache.time.time", return_value=3.0):
+                cache.put_many({"c": "cccc"})
+            self.assertEqual(cache.get("a"), "aaaa")
+            self.assertIsNone(cache.get("b"))
+            self.assertEqual(cache.get("c"), "cccc")
+
+    def test_sqlite_cache_reads_buffer_access_times_until_close(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = Path(directory) / "llm.sqlite"
+            cache = SQLiteLLMCache(path)
+            with patch("pdf_craft.llm.cache.time.time", return_value=1.0):
+                cache.put_many({"a": "aaaa"})
+            with patch("pdf_craft.llm.cache.time.time", return_value=2.0):
+                self.assertEqual(cache.get("a"), "aaaa")
+
+            def accessed_at() -> float:
+                with sqlite3.connect(path) as connection:
+                    return connection.execute("SELECT accessed_at FROM responses").fetchone()[0]
+
+            # A cache hit takes no write lock; the access time is stored on close.
+            self.assertEqual(accessed_at(), 1.0)
+            reader = threading.Thread(target=cache.get, args=("a",))
+            reader.start()
+            reader.join()
+            cache.close()
+            self.assertGreater(accessed_at(), 1.0)
+
+    def test_sqlite_cache_expires_entries_by_age(self):
+        with tempfile.TemporaryDirectory() as directory:
+            cache = SQLiteLLMCache(Path(directory) / "llm.sqlite", max_age_seconds=60)
+            with patch("pdf_craft.llm.cache.time.time", return_value=100.0):
+                cache.put_many({"old": "response"})
+                self.assertEqual(cache.get("old"), "response")
+            with patch("pdf_craft.llm.cache.time.time", return_value=200.0):
+                self.assertIsNone(cache.get("old"))
+
+    def test_sqlite_cache_is_shared_across_threads(self):
+        with tempfile.TemporaryDirectory() as directory:
+            cache = SQLiteLLMCache(Path(directory) / "llm.sqlite")
+            errors: list[Exception] = []
+
+            def work(index: int) -> None:
+                try:
+                    for round_index in range(20):
+                        key = f"{index}-{round_index}"
+                        cache.put_many({key: key})
+                        if cache.get(key) != key:
+                            raise AssertionError(key)
+                except Exception as error:  # pylint: disable=broad-exception-caught
+                    errors.append(error)
+
+            threads = [threading.Thread(target=work, args=(index,)) for index in range(4)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            self.assertEqual(errors, [])
+
+
+if __name__ == "__main__":
+    unittest.main()
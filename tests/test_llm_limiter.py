@@ -0,0 +1,177 @@
+import asyncio
+import threading
+import unittest
+from unittest.mock import patch
+
+import httpx
+import openai
+
+from pdf_craft.llm import ConcurrencyLimiter, LLM, runtime_for
+from pdf_craft.llm.limiter import DEFAULT_MAX_CONCURRENCY, shared_limiter
+
+
+class TestConcurrencyLimiter(unittest.TestCase):
+    def test_retryable_errors_halve_the_limit_once_per_burst(self):
+        limiter = ConcurrencyLimiter(8)
+        barrier = threading.Barrier(3, timeout=5)
+
+        def fail():
+            try:
+                with limiter.acquire():
+                    barrier.wait()  # all three requests are in flight before any fails
+                    raise openai.APITimeoutError(request=_request())
+            except openai.APITimeoutError:
+                pass
+
+        threads = [threading.Thread(target=fail) for _ in range(3)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(limiter.limit, 4)
+
+        with self.assertRaises(openai.APITimeoutError):
+            with limiter.acquire():
+                raise openai.APITimeoutError(request=_request())
+        self.assertEqual(limiter.limit, 2)
+
+    def test_other_errors_do_not_back_off_and_successes_grow_to_the_ceiling(self):
+        limiter = ConcurrencyLimiter(3)
+        with self.assertRaises(ValueError):
+            with limiter.acquire():
+                raise ValueError("bad request")
+        self.assertEqual(limiter.limit, 3)
+
+        with self.assertRaises(openai.APITimeoutError):
+            with limiter.acquire():
+                raise openai.APITimeoutError(request=_request())
+        self.assertEqual(limiter.limit, 1)
+        for _ in range(10):
+            with limiter.acquire():
+                pass
+        self.assertEqual(limiter.limit, 3)
+
+    def test_blocks_requests_above_the_limit(self):
+        limiter = ConcurrencyLimiter(2)
+        release = threading.Event()
+        lock = threading.Lock()
+        active, peak = 0, 0
+
+        def work():
+            nonlocal active, peak
+            with limiter.acquire():
+                with lock:
+                    active += 1
+                    peak = max(peak, active)
+                release.wait(0.05)
+                with lock:
+                    active -= 1
+
+        threads = [threading.Thread(target=work) for _ in range(6)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(peak, 2)
+
+    def test_async_requests_wait_without_blocking_the_loop(self):
+        limiter = ConcurrencyLimiter(2)
+        active, peak = 0, 0
+
+        async def work():
+            nonlocal active, peak
+            async with limiter.acquire_async():
+                active += 1
+                peak = max(peak, active)
+                await asyncio.sleep(0.01)
+                active -= 1
+
+        async def main():
+            await asyncio.gather(*(work() for _ in range(8)))
+
+        asyncio.run(main())
+        self.assertEqual(peak, 2)
+        self.assertEqual(limiter.limit, 2)
+
+    def test_sync_release_wakes_async_waiters(self):
+        limiter = ConcurrencyLimiter(1)
+        entered = threading.Event()
+        release = threading.Event()
+
+        def hold():
+            with limiter.acquire():
+                entered.set()
+                release.wait(5)
+
+        thread = threading.Thread(target=hold)
+        thread.start()
+        entered.wait(5)
+
+        async def main():
+            loop = asyncio.get_running_loop()
+            loop.call_later(0.02, release.set)
+            async with limiter.acquire_async():
+                return True
+
+        self.assertTrue(asyncio.run(asyncio.wait_for(main(), 5)))
+        thread.join()
+
+    def test_raised_ceiling_frees_slots_for_waiters_at_once(self):
+        limiter = ConcurrencyLimiter(1)
+        entered = threading.Event()
+        release = threading.Event()
+
+        def hold():
+            with limiter.acquire():
+                entered.set()
+                release.wait(5)
+
+        holder = threading.Thread(target=hold)
+        holder.start()
+        entered.wait(5)
+        waiter_entered = threading.Event()
+
+        def wait():
+            with limiter.acquire():
+                waiter_entered.set()
+
+        waiter = threading.Thread(target=wait)
+        waiter.start()
+        limiter.raise_ceiling(2)
+        self.assertTrue(waiter_entered.wait(5))
+        self.assertEqual(limiter.limit, 2)
+        release.set()
+        holder.join()
+        waiter.join()
+
+    def test_runtimes_share_one_limiter_per_endpoint(self):
+        first = shared_limiter("https://shared.invalid/v1", "key", "model", 4)
+        self.assertIs(first, shared_limiter("https://shared.invalid/v1", "key", "model"))
+        # The default adopts the existing ceiling instead of lowering it.
+        self.assertEqual(first.max_concurrency, 4)
+        # An explicit ceiling takes effect for every runtime sharing the limiter, in both directions.
+        shared_limiter("https://shared.invalid/v1", "key", "model", 16)
+        self.assertEqual((first.max_concurrency, first.limit), (16, 16))
+        shared_limiter("https://shared.invalid/v1", "key", "model", 2)
+        self.assertEqual((first.max_concurrency, first.limit), (2, 2))
+        self.assertIsNot(first, shared_limiter("https://other.invalid/v1", "key", "model"))
+        self.assertIsNot(first, shared_limiter("https://shared.invalid/v1", "other-key", "model"))
+        self.assertIsNot(first, shared_limiter("https://shared.invalid/v1", "key", "other-model"))
+
+    def test_default_runtime_does_not_cap_a_configured_one_on_the_same_endpoint(self):
+        with patch("pdf_craft.llm.core.get_encoding"):
+            toc = runtime_for(LLM("key", "https://capped.invalid/v1", "small", "o200k_base"))
+            translation = runtime_for(LLM("key", "https://capped.invalid/v1", "large", "o200k_base",
+                                          max_concurrency=16))
+            fill = runtime_for(LLM("key", "https://capped.invalid/v1", "large", "o200k_base"))
+        self.assertEqual(toc.max_concurrency, DEFAULT_MAX_CONCURRENCY)
+        self.assertEqual(translation.max_concurrency, 16)
+        self.assertEqual(fill.max_concurrency, 16)
+
+
+def _request():
+    return httpx.Request("POST", "https://example.invalid/v1")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,7 +1,8 @@
 # pylint: disable=unused-argument
+import asyncio
 import unittest
 
-from pdf_craft.llm import Message, MessageRole, ProtocolRetry, ProtocolSuccess, RepairLoopOptions, run_repair_loop
+from pdf_craft.llm import AsyncRepairLoopOptions, Message, MessageRole, ProtocolRetry, ProtocolSuccess, RepairLoopOptions, arun_repair_loop, run_repair_loop
 
 
 class TestRepairLoop(unittest.TestCase):
@@ -115,6 +116,31 @@ class TestRepairLoop(unittest.TestCase):
         with self.assertRaisesRegex(ValueError, "protocol"):
             run_repair_loop(RepairLoopOptions(messages=[], request=lambda *args: "response", protocol=Protocol(), state=None))
 
+    def test_async_loop_retries_like_the_sync_loop(self):
+        class Protocol:
+            def validate(self, response, state, attempt, max_attempts):
+                return ProtocolSuccess(response, state) if response == "ok" else ProtocolRetry("again", state)
+
+            def empty(self, state, attempt, max_attempts):
+                return ProtocolRetry("non-empty", state)
+
+            def exhausted(self, state, attempts, response):
+                raise AssertionError("unexpected exhaustion")
+
+        seen = []
+
+        async def request(messages, attempt, maximum):
+            seen.append([message.message for message in messages])
+            await asyncio.sleep(0)
+            return ["", "bad", "ok"][attempt]
+
+        result = asyncio.run(arun_repair_loop(AsyncRepairLoopOptions(
+            messages=[Message(MessageRole.USER, "start")], request=request,
+            protocol=Protocol(), state=None, max_attempts=3,
+        )))
+        self.assertEqual(result, "ok")
+        self.assertEqual(seen, [["start"], ["start", "non-empty"], ["start", "bad", "again"]])
+
 
 if __name__ == "__main__":
     unittest.main()
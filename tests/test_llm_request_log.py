@@ -0,0 +1,84 @@
+import json
+import tempfile
+import threading
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+from pdf_craft.llm.request_log import RequestLog
+
+
+class TestRequestLog(unittest.TestCase):
+    def test_records_from_many_threads_are_written_as_json_lines(self):
+        with tempfile.TemporaryDirectory() as directory:
+            log = RequestLog(Path(directory))
+
+            def write(worker):
+                for index in range(50):
+                    log.write({"worker": worker, "index": index})
+
+            threads = [threading.Thread(target=write, args=(worker,)) for worker in range(4)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            log.flush(timeout=5)
+
+            lines = log.path.read_text(encoding="utf-8").splitlines()
+            records = [json.loads(line) for line in lines]
+            self.assertEqual(len(records), 200)
+            for worker in range(4):
+                indexes = [record["index"] for record in records if record["worker"] == worker]
+                self.assertEqual(indexes, list(range(50)))
+
+    def test_rotates_to_a_new_file_by_size(self):
+        with tempfile.TemporaryDirectory() as directory:
+            root = Path(directory)
+            log = RequestLog(root, max_bytes=100)
+            first_path = log.path
+            for index in range(10):
+                log.write({"index": index, "padding": "x" * 20})
+            log.flush(timeout=5)
+
+            files = sorted(root.glob("request-*.log"))
+            self.assertGreater(len(files), 1)
+            self.assertNotEqual(log.path, first_path)
+            indexes = sorted(
+                json.loads(line)["index"]
+                for path in files
+                for line in path.read_text(encoding="utf-8").splitlines()
+            )
+            self.assertEqual(indexes, list(range(10)))
+            for path in files:
+                self.assertLessEqual(path.stat().st_size, 100)
+
+    def test_write_failure_drops_queued_records_and_is_raised_by_flush(self):
+        with tempfile.TemporaryDirectory() as directory:
+            log = RequestLog(Path(directory))
+            entered = threading.Event()
+            release = threading.Event()
+
+            def fail(_file, _batch):
+                entered.set()
+                release.wait(5)
+                raise OSError("disk full")
+
+            with patch.object(log, "_write_batch", fail):
+                log.write({"index": 0})
+                entered.wait(5)
+                # Queued behind the failing batch, so they are dropped with it.
+                for index in range(1, 5):
+                    log.write({"index": index})
+                release.set()
+                with self.assertRaisesRegex(OSError, "disk full"):
+                    log.flush(timeout=5)
+
+            # The writer survives the failure and the error is raised only once.
+            log.write({"index": 5})
+            log.flush(timeout=5)
+            records = [json.loads(line) for line in log.path.read_text(encoding="utf-8").splitlines()]
+            self.assertEqual(records, [{"index": 5}])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,9 +1,16 @@
 # pylint: disable=protected-access
+import asyncio
+import json
 import tempfile
 import unittest
 from pathlib import Path
+from types import SimpleNamespace
 
-from pdf_craft.llm import LLM, Message, MessageRole, runtime_for
+import httpx
+import openai
+
+from pdf_craft.llm import aclose_async_clients, LLM, LLMEventKind, Message, MessageRole, batch_request_record, runtime_for
+from pdf_craft.llm.event_loop import EventLoopThread, run_async, shared_event_loop
 from pdf_craft.llm.runtime import LLMEmptyResponseError, LLMTransportError
 
 
@@ -13,6 +20,10 @@ def _config(path: Path) -> LLM:
                log_dir_path=path / "logs")
 
 
+def _sends_stream_options(request: dict) -> bool:
+    return isinstance(request.get("stream_options"), dict)
+
+
 class TestLLMRuntime(unittest.TestCase):
     def test_cache_commits_only_after_context_success_and_writes_logs(self):
         with tempfile.TemporaryDirectory() as directory:
@@ -32,6 +43,25 @@ class TestLLMRuntime(unittest.TestCase):
             self.assertEqual(calls, 1)
             self.assertTrue(list((root / "logs").glob("*.log")))
 
+            assert runtime._request_log is not None
+            runtime._request_log.flush(timeout=5)
+            records = [json.loads(line) for line in runtime._request_log.path.read_text(encoding="utf-8").splitlines()]
+            self.assertEqual([record["category"] for record in records],
+                             ["cache-miss", "request", "success", "cache-hit"])
+            self.assertGreaterEqual(records[2]["latency_ms"], 0)
+            self.assertEqual(records[2]["completion_tokens"], 1)
+            self.assertEqual(records[3]["cache"], "hit")
+
+    def test_discarded_responses_are_not_cached(self):
+        with tempfile.TemporaryDirectory() as directory:
+            runtime = runtime_for(_config(Path(directory)))
+            runtime._invoke = lambda *args: "rejected"  # type: ignore[method-assign]
+            with runtime.context() as context:
+                request = context.prepare("hello")
+                self.assertEqual(context.request("hello"), "rejected")
+                context.discard()
+            self.assertIsNone(runtime.cached(request))
+
     def test_empty_response_is_typed_after_retries(self):
         with tempfile.TemporaryDirectory() as directory:
             runtime = runtime_for(_config(Path(directory)))
@@ -49,6 +79,151 @@ class TestLLMRuntime(unittest.TestCase):
             self.assertEqual(raised.exception.attempts, 1)
             self.assertIsInstance(raised.exception.__cause__, ValueError)
 
+    def test_async_requests_share_retry_and_cache_logic(self):
+        with tempfile.TemporaryDirectory() as directory:
+            runtime = runtime_for(_config(Path(directory)))
+            responses = ["", "ok"]
+
+            async def ainvoke(*_args):
+                await asyncio.sleep(0)
+                return responses.pop(0)
+
+            runtime._ainvoke = ainvoke  # type: ignore[method-assign]
+            self.assertEqual(asyncio.run(runtime.arequest("hello")), "ok")
+            self.assertEqual(responses, [])
+            # The cached response is served to sync callers too.
+            self.assertEqual(runtime.request("hello"), "ok")
+
+    def test_event_loop_thread_closes_the_shared_connection_pool(self):
+        with tempfile.TemporaryDirectory() as directory:
+            runtime = runtime_for(_config(Path(directory)))
+
+            async def pool():
+                runtime._async_client()
+                return runtime._async_clients[asyncio.get_running_loop()]
+
+            with EventLoopThread() as event_loop:
+                http_client, client = event_loop.run(pool())
+                self.assertIs(event_loop.run(pool())[1], client)
+                event_loop.run(aclose_async_clients())
+                self.assertTrue(http_client.is_closed)
+                # A closed pool is replaced rather than reused.
+                http_client, replaced = event_loop.run(pool())
+                self.assertIsNot(replaced, client)
+            self.assertTrue(http_client.is_closed)
+
+    def test_sync_entry_points_reuse_one_loop_and_connection_pool(self):
+        with tempfile.TemporaryDirectory() as directory:
+            runtime = runtime_for(_config(Path(directory)))
+
+            async def client():
+                runtime._async_client()
+                return asyncio.get_running_loop(), runtime._async_clients[asyncio.get_running_loop()]
+
+            loop, clients = run_async(client())
+            self.assertEqual(run_async(client()), (loop, clients))
+            self.assertIs(shared_event_loop().loop, loop)
+            self.assertFalse(clients[0].is_closed)
+
+    def test_observe_meters_retries_tokens_and_cache_hits(self):
+        with tempfile.TemporaryDirectory() as directory:
+            runtime = runtime_for(_config(Path(directory)))
+            responses = ["", "hello world"]
+            runtime._invoke = lambda *args: responses.pop(0)  # type: ignore[method-assign]
+            events = []
+            with runtime.observe(events.append) as metering:
+                runtime.request("hello")
+                runtime.request("hello")
+            runtime.request("hello")
+
+            self.assertEqual([event.kind for event in events],
+                             [LLMEventKind.RETRY, LLMEventKind.COMPLETE, LLMEventKind.CACHE_HIT])
+            self.assertEqual(events[1].protocol, "1")
+            self.assertEqual((metering.requests, metering.cache_hits, metering.attempts, metering.retries),
+                             (2, 1, 2, 1))
+            self.assertGreater(metering.prompt_tokens, 0)
+            self.assertGreater(metering.completion_tokens, 0)
+            self.assertEqual(metering.cache_hit_rate, 0.5)
+
+    def test_token_counts_come_from_the_provider_usage(self):
+        with tempfile.TemporaryDirectory() as directory:
+            runtime = runtime_for(_config(Path(directory)))
+            requests = []
+
+            def create(**kwargs):
+                requests.append(kwargs)
+                delta = SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content="bonjour"))], usage=None)
+                usage = SimpleNamespace(choices=[], usage=SimpleNamespace(prompt_tokens=11, completion_tokens=3))
+                return iter([delta, usage])
+
+            runtime._client = SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=create)))  # type: ignore[assignment]
+            with runtime.observe() as metering:
+                self.assertEqual(runtime.request("hello", use_cache=False), "bonjour")
+            self.assertEqual(requests[0]["stream_options"], {"include_usage": True})
+            # Reported usage is taken as is; the prompt is not re-encoded locally.
+            self.assertEqual((metering.prompt_tokens, metering.completion_tokens), (11, 3))
+
+    def test_rejected_stream_options_are_dropped_and_tokens_counted_locally(self):
+        with tempfile.TemporaryDirectory() as directory:
+            runtime = runtime_for(_config(Path(directory)))
+            requests = []
+
+            def create(**kwargs):
+                requests.append(kwargs)
+                if _sends_stream_options(kwargs):
+                    response = httpx.Response(400, request=httpx.Request("POST", "https://example.invalid/v1"))
+                    raise openai.BadRequestError("Unrecognized request argument supplied: stream_options",
+                                                 response=response, body=None)
+                return iter([SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content="bonjour"))],
+                                             usage=None)])
+
+            runtime._client = SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=create)))  # type: ignore[assignment]
+            with runtime.observe() as metering:
+                self.assertEqual(runtime.request("hello", use_cache=False), "bonjour")
+                self.assertEqual(runtime.request("hello again", use_cache=False), "bonjour")
+            # The rejection is retried once within the attempt, then never sent again.
+            self.assertEqual([_sends_stream_options(request) for request in requests], [True, False, False])
+            self.assertEqual(metering.failures, 0)
+            self.assertEqual(metering.retries, 0)
+            self.assertGreater(metering.prompt_tokens, 0)
+            self.assertGreater(metering.completion_tokens, 0)
+
+    def test_stream_usage_can_be_turned_off(self):
+        with tempfile.TemporaryDirectory() as directory:
+            config = _config(Path(directory))
+            config.stream_usage = False
+            runtime = runtime_for(config)
+            requests = []
+
+            async def create(**kwargs):
+                requests.append(kwargs)
+
+                async def chunks():
+                    yield SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content="bonjour"))],
+                                          usage=None)
+                return chunks()
+
+            client = SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=create)))
+            runtime._async_client = lambda: client  # type: ignore[method-assign,assignment,return-value]
+            self.assertEqual(run_async(runtime.arequest("hello", use_cache=False)), "bonjour")
+            self.assertFalse(_sends_stream_options(requests[0]))
+
+    def test_prepared_request_matches_the_cache_key_of_a_real_request(self):
+        with tempfile.TemporaryDirectory() as directory:
+            runtime = runtime_for(_config(Path(directory)))
+            messages = [Message(MessageRole.SYSTEM, "translate"), Message(MessageRole.USER, "hello")]
+            with runtime.context("seed") as context:
+                prepared = context.prepare(messages)
+            self.assertIsNone(runtime.cached(prepared))
+
+            runtime._invoke = lambda *args: "bonjour"  # type: ignore[method-assign]
+            runtime.request(messages, cache_seed_content="seed")
+            self.assertEqual(runtime.cached(prepared), "bonjour")
+
+            record = batch_request_record("model", prepared)
+            self.assertEqual(record["custom_id"], prepared.cache_key)
+            self.assertEqual(record["body"]["messages"][1], {"role": "user", "content": "hello"})
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,41 @@
+import random
+import unittest
+
+from pdf_craft.pdf.ngrams import RepetitionRule, find_repetitive_ngrams, has_repetitive_ngrams
+from pdf_craft_tool.bench import reference_has_repetitive_ngrams
+
+_RULES = (
+    RepetitionRule(min_ngram=2, max_ngram=5, repeat_threshold=16),
+    RepetitionRule(min_ngram=6, max_ngram=20, repeat_threshold=8),
+)
+
+
+class TestRepetitiveNgrams(unittest.TestCase):
+    def test_detects_short_and_long_patterns_in_one_call(self):
+        self.assertEqual(find_repetitive_ngrams("1." * 16, _RULES), [True, False])
+        self.assertEqual(find_repetitive_ngrams("1." * 15, _RULES), [False, False])
+        self.assertEqual(find_repetitive_ngrams("x" + "这是一个例子" * 8, _RULES), [False, True])
+        self.assertEqual(find_repetitive_ngrams("", _RULES), [False, False])
+        self.assertFalse(has_repetitive_ngrams("", 2, 5, 16))
+
+    def test_matches_reference_implementation(self):
+        rng = random.Random(7)
+        for _ in range(400):
+            alphabet = rng.choice(("ab", "abc", "1.", "这是一个例子"))
+            unit = "".join(rng.choice(alphabet) for _ in range(rng.randint(1, 22)))
+            text = (
+                "".join(rng.choice(alphabet) for _ in range(rng.randint(0, 10)))
+                + unit * rng.randint(1, 18)
+                + "".join(rng.choice(alphabet) for _ in range(rng.randint(0, 10)))
+            )
+            expected = [
+                reference_has_repetitive_ngrams(
+                    text, rule.min_ngram, rule.max_ngram, rule.repeat_threshold
+                )
+                for rule in _RULES
+            ]
+            self.assertEqual(find_repetitive_ngrams(text, _RULES), expected, text)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,120 @@
+import os
+import tempfile
+import unittest
+from pathlib import Path
+from typing import cast
+from unittest.mock import patch
+
+from PIL import Image
+
+from pdf_craft.common import read_xml
+from pdf_craft.ocr_config import DeepSeekOCRVendorConfig
+from pdf_craft.pdf.handler import PDFHandler
+from pdf_craft.pdf.ocr import OCR
+from pdf_craft.pdf.ocr_cache import OCRCache
+from pdf_craft.pdf.types import Page, PageLayout, decode
+
+
+class _Document:
+    pages_count = 2
+
+    def metadata(self):
+        raise AssertionError("metadata is not used by this test")
+
+    def page_size(self, page_index):
+        del page_index
+        return (1.0, 1.0)
+
+    def render_page(self, page_index, dpi):
+        del dpi
+        return Image.new("RGB", (40, 40), (page_index * 50, 0, 0))
+
+    def close(self):
+        pass
+
+
+class _Handler:
+    def open(self, pdf_path):
+        del pdf_path
+        return _Document()
+
+
+def _image2page(*, image, page_index, asset_hub, **_kwargs):
+    asset_hash = asset_hub.clip(image, (0, 0, 10, 10))
+    return Page(
+        index=page_index,
+        image=image if page_index == 1 else None,
+        body_layouts=[PageLayout("image", (0, 0, 10, 10), "figure", 0, asset_hash)],
+        footnotes_layouts=[],
+        input_tokens=100,
+        output_tokens=20,
+    )
+
+
+def _vendor_config(api_key: str = "key") -> DeepSeekOCRVendorConfig:
+    return DeepSeekOCRVendorConfig(base_url="http://localhost", api_key=api_key, model="ocr")
+
+
+class TestOCRCache(unittest.TestCase):
+    def test_fresh_work_dir_reuses_cached_pages_and_assets(self):
+        with tempfile.TemporaryDirectory() as directory:
+            root = Path(directory)
+            cache = OCRCache(root / "cache")
+
+            with patch("pdf_craft.pdf.ocr.PageExtractorNode.image2page", side_effect=_image2page) as first:
+                list(OCR(_vendor_config(), cast(PDFHandler, _Handler()), cache).recognize(
+                    root / "input.pdf", root / "first" / "assets", root / "first" / "ocr",
+                ))
+            self.assertEqual(first.call_count, 2)
+
+            # Secrets do not take part in the config identity.
+            with patch("pdf_craft.pdf.ocr.PageExtractorNode.image2page", side_effect=_image2page) as second:
+                events = list(OCR(_vendor_config("other"), cast(PDFHandler, _Handler()), cache).recognize(
+                    root / "input.pdf", root / "second" / "assets", root / "second" / "ocr",
+                    cover_path=root / "second" / "cover.png",
+                ))
+            second.assert_not_called()
+            self.assertEqual(sum(event.input_tokens + event.output_tokens for event in events), 0)
+            self.assertTrue((root / "second" / "cover.png").exists())
+
+            page = decode(read_xml(root / "second" / "ocr" / "page_2.xml"))
+            self.assertEqual(page.index, 2)
+            self.assertEqual(page.body_layouts[0].text, "figure")
+            self.assertEqual(
+                sorted(path.name for path in (root / "second" / "assets").iterdir()),
+                sorted(path.name for path in (root / "first" / "assets").iterdir()),
+            )
+
+            with patch("pdf_craft.pdf.ocr.PageExtractorNode.image2page", side_effect=_image2page) as footnotes:
+                list(OCR(_vendor_config(), cast(PDFHandler, _Handler()), cache).recognize(
+                    root / "input.pdf", root / "third" / "assets", root / "third" / "ocr",
+                    includes_footnotes=True,
+                ))
+            self.assertEqual(footnotes.call_count, 2)
+
+    def test_evicts_least_recently_used_entries_over_max_size(self):
+        with tempfile.TemporaryDirectory() as directory:
+            root = Path(directory)
+            asset_path = root / "assets"
+            pages = [Page(index, None, [], [], 0, 0) for index in range(1, 4)]
+
+            cache = OCRCache(root / "cache")
+            cache.store("a", pages[0], asset_path)
+            entry_size = sum(path.stat().st_size for path in (root / "cache" / "entries" / "a").iterdir())
+
+            cache = OCRCache(root / "cache", max_size=entry_size * 2)
+            cache.store("b", pages[1], asset_path)
+            os.utime(root / "cache" / "entries" / "a" / "page.xml", (0, 0))
+            os.utime(root / "cache" / "entries" / "b" / "page.xml", (1, 1))
+            self.assertIsNotNone(cache.load("a", 1, asset_path))  # touch "a" so "b" is oldest
+            cache.store("c", pages[2], asset_path)
+
+            self.assertEqual(
+                sorted(path.name for path in (root / "cache" / "entries").iterdir()),
+                ["a", "c"],
+            )
+            self.assertIsNone(cache.load("b", 2, asset_path))
+
+
+if __name__ == "__main__":
+    unittest.main()
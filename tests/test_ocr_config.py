@@ -77,6 +77,15 @@ class TestOCRConfig(unittest.TestCase):
                 ocr=config,
             )
 
+    def test_worker_devices_split_local_devices_only_for_several_workers(self):
+        node = PageExtractorNode(DeepSeekOCRLocalConfig(enable_devices_numbers=[0, 1, 2]))
+        # One worker keeps the serial default and lets the extractor pick devices.
+        self.assertEqual(node.worker_devices(1, None), [None])
+        self.assertEqual(node.worker_devices(2, None), [0, 1])
+        self.assertEqual(node.worker_devices(4, 1), [1])
+        vendor = PageExtractorNode(DeepSeekOCRVendorConfig(base_url="https://example.com", api_key="key", model="model"))
+        self.assertEqual(vendor.worker_devices(3, None), [None, None, None])
+
     def test_local_deepseek_ocr_uses_doc_page_extractor_factory(self):
         extractor = Mock()
         with patch(
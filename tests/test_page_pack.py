@@ -0,0 +1,152 @@
+import tempfile
+import unittest
+from pathlib import Path
+from typing import cast
+from unittest.mock import patch
+
+from PIL import Image
+
+from pdf_craft.common import save_xml
+from pdf_craft.ocr_config import DeepSeekOCRVendorConfig
+from pdf_craft.pdf import PagePack, PageStore
+from pdf_craft.pdf.handler import PDFHandler
+from pdf_craft.pdf.ocr import OCR
+from pdf_craft.pdf.types import Page, PageLayout, encode
+
+
+def _page(index: int, text: str) -> Page:
+    return Page(
+        index=index,
+        image=None,
+        body_layouts=[PageLayout("text", (1, 2, 3, 4), text, 0, None)],
+        footnotes_layouts=[PageLayout("image", (0, 0, 9, 9), "", 0, "abc")],
+        input_tokens=index * 10,
+        output_tokens=index,
+    )
+
+
+class _Document:
+    pages_count = 3
+
+    def metadata(self):
+        raise AssertionError("metadata is not used by this test")
+
+    def page_size(self, page_index):
+        del page_index
+        return (1.0, 1.0)
+
+    def render_page(self, page_index, dpi):
+        del page_index, dpi
+        return Image.new("RGB", (20, 20))
+
+    def close(self):
+        pass
+
+
+class _Handler:
+    def open(self, pdf_path):
+        del pdf_path
+        return _Document()
+
+
+def _image2page(*, page_index, **_kwargs):
+    return _page(page_index, f"ocr {page_index}")
+
+
+class TestPagePack(unittest.TestCase):
+    def test_reads_pages_by_index_and_later_records_win(self):
+        with tempfile.TemporaryDirectory() as directory:
+            pack_path = Path(directory) / "pages.pack"
+            pack = PagePack(pack_path)
+            pack.append(_page(2, "two"))
+            pack.append(_page(1, "one"))
+            pack.append(_page(2, "two again"))
+
+            reopened = PagePack(pack_path)
+            self.assertEqual(reopened.indexes(), [1, 2])
+            self.assertEqual(reopened.read(2).body_layouts[0].text, "two again")
+            self.assertEqual(reopened.read(1), _page(1, "one"))
+
+    def test_torn_tail_is_ignored_and_overwritten(self):
+        with tempfile.TemporaryDirectory() as directory:
+            pack_path = Path(directory) / "pages.pack"
+            PagePack(pack_path).append(_page(1, "one"))
+            with open(pack_path, "ab") as file:
+                file.write(b"\x02\x00\x00\x00\xff\x00")
+
+            pack = PagePack(pack_path)
+            self.assertEqual(pack.indexes(), [1])
+            pack.append(_page(2, "two"))
+            self.assertEqual(PagePack(pack_path).indexes(), [1, 2])
+            self.assertEqual(PagePack(pack_path).read(2).body_layouts[0].text, "two")
+
+    def test_page_store_prefers_pack_over_xml_files(self):
+        with tempfile.TemporaryDirectory() as directory:
+            pages_path = Path(directory)
+            save_xml(encode(_page(1, "xml")), pages_path / "page_1.xml")
+            self.assertEqual([page.index for page in PageStore(pages_path).read()], [1])
+
+            PagePack(pages_path / "pages.pack").append(_page(3, "packed"))
+            store = PageStore(pages_path)
+            pages = list(store.read())
+            self.assertEqual([page.body_layouts[0].text for page in pages], ["packed"])
+            self.assertIs(next(store.read([3])), pages[0])
+
+    def test_ocr_packs_existing_xml_pages_and_resumes_from_pack(self):
+        with tempfile.TemporaryDirectory() as directory:
+            root = Path(directory)
+            ocr_path = root / "ocr"
+            ocr_path.mkdir()
+            save_xml(encode(_page(1, "from xml")), ocr_path / "page_1.xml")
+            config = DeepSeekOCRVendorConfig(base_url="http://localhost", api_key="key", model="ocr")
+
+            with patch("pdf_craft.pdf.ocr.PageExtractorNode.image2page", side_effect=_image2page) as image2page:
+                list(OCR(config, cast(PDFHandler, _Handler())).recognize(
+                    root / "input.pdf", root / "assets", ocr_path,
+                    page_indexes=[1, 2], packed_pages=True,
+                ))
+            self.assertEqual(image2page.call_count, 1)
+            self.assertFalse((ocr_path / "page_2.xml").exists())
+            self.assertFalse((ocr_path / "page_1.xml").exists())
+
+            # An existing pack is kept even without packed_pages.
+            with patch("pdf_craft.pdf.ocr.PageExtractorNode.image2page", side_effect=_image2page) as image2page:
+                list(OCR(config, cast(PDFHandler, _Handler())).recognize(
+                    root / "input.pdf", root / "assets", ocr_path,
+                ))
+            self.assertEqual(image2page.call_count, 1)
+            self.assertFalse((ocr_path / "page_3.xml").exists())
+
+            pages = list(PageStore(ocr_path).read())
+            self.assertEqual(
+                [page.body_layouts[0].text for page in pages],
+                ["from xml", "ocr 2", "ocr 3"],
+            )
+
+    def test_packing_skips_pages_already_packed_and_finished_runs(self):
+        with tempfile.TemporaryDirectory() as directory:
+            root = Path(directory)
+            ocr_path = root / "ocr"
+            ocr_path.mkdir()
+            PagePack(ocr_path / "pages.pack").append(_page(1, "packed"))
+            # Left over from a crash between appending and deleting; never decoded again.
+            (ocr_path / "page_1.xml").write_text("not xml", encoding="utf-8")
+            (ocr_path / "page_2.xml").write_text("not xml", encoding="utf-8")
+            (ocr_path / "done").touch()
+            config = DeepSeekOCRVendorConfig(base_url="http://localhost", api_key="key", model="ocr")
+
+            list(OCR(config, cast(PDFHandler, _Handler())).recognize(root / "input.pdf", root / "assets", ocr_path))
+            self.assertTrue((ocr_path / "page_2.xml").exists())
+
+            (ocr_path / "done").unlink()
+            (ocr_path / "page_2.xml").unlink()
+            with patch("pdf_craft.pdf.ocr.PageExtractorNode.image2page", side_effect=_image2page):
+                list(OCR(config, cast(PDFHandler, _Handler())).recognize(
+                    root / "input.pdf", root / "assets", ocr_path, page_indexes=[1],
+                ))
+            self.assertFalse((ocr_path / "page_1.xml").exists())
+            self.assertEqual(PagePack(ocr_path / "pages.pack").read(1).body_layouts[0].text, "packed")
+
+
+if __name__ == "__main__":
+    unittest.main()
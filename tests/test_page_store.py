@@ -0,0 +1,36 @@
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+from pdf_craft.common import read_xml, save_xml
+from pdf_craft.pdf import PageStore
+from pdf_craft.pdf.types import Page, PageLayout, encode
+
+
+class TestPageStore(unittest.TestCase):
+    def test_each_page_is_decoded_once_across_interleaved_reads(self):
+        with tempfile.TemporaryDirectory() as directory:
+            pages_path = Path(directory)
+            for index in (1, 2, 10):
+                layout = PageLayout("text", (0, 0, 10, 10), f"page {index}", 0, None)
+                save_xml(encode(Page(index, None, [layout], [], 0, 0)), pages_path / f"page_{index}.xml")
+
+            store = PageStore(pages_path)
+            with patch("pdf_craft.common.reader.read_xml", wraps=read_xml) as reads:
+                body = store.read()
+                footnotes = store.read()
+                first = [next(body).index, next(footnotes).index, next(body).index]
+                rest = [page.index for page in footnotes]
+                selected = [page.index for page in store.read(page_indexes={10})]
+                again = list(store.read())
+
+            self.assertEqual(first, [1, 1, 2])
+            self.assertEqual(rest, [2, 10])
+            self.assertEqual(selected, [10])
+            self.assertEqual([page.body_layouts[0].text for page in again], ["page 1", "page 2", "page 10"])
+            self.assertEqual(reads.call_count, 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
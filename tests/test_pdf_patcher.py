@@ -30,7 +30,107 @@ class TestPDFPatcher(unittest.TestCase):
             self.assertEqual(len(reader.pages), 1)
             page = list(reader.pages)[0]
             self.assertIn("Translated", page.extract_text())
-            self.assertNotIn("Original", page.extract_text())
+            # The overlay is vector only: no page bitmap replaces the source content.
+            self.assertEqual(list(page.images), [])
+
+    def test_pages_without_replacements_are_copied_verbatim(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            root = Path(temp_dir)
+            source = root / "source.pdf"
+            target = root / "target.pdf"
+            doc = canvas.Canvas(str(source), pagesize=(200, 200))
+            for index in range(3):
+                doc.drawString(20, 160, f"Page {index + 1}")
+                doc.showPage()
+            doc.save()
+
+            PDFPatcher(font_size=12).patch(
+                source,
+                target,
+                [PDFReplacement(2, (50, 25, 450, 100), "Translated", (600, 600))],
+            )
+
+            source_pages: list[Any] = list(pypdf.PdfReader(str(source)).pages)
+            target_pages: list[Any] = list(pypdf.PdfReader(str(target)).pages)
+            self.assertEqual(len(target_pages), 3)
+            for index in (0, 2):
+                self.assertEqual(target_pages[index].get_contents().get_data(),
+                                 source_pages[index].get_contents().get_data())
+            self.assertIn("Translated", target_pages[1].extract_text())
+            self.assertIn("Page 2", target_pages[1].extract_text())
+
+    def test_encrypted_source_produces_readable_patched_pages(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            root = Path(temp_dir)
+            plain = root / "plain.pdf"
+            source = root / "source.pdf"
+            target = root / "target.pdf"
+            doc = canvas.Canvas(str(plain), pagesize=(200, 200))
+            doc.drawString(20, 160, "Original")
+            doc.save()
+            # Published books often carry an owner password with an empty user password.
+            writer = pypdf.PdfWriter(clone_from=str(plain))
+            writer.encrypt(user_password="", owner_password="owner", algorithm="RC4-128")
+            with open(source, "wb") as file:
+                writer.write(file)
+
+            PDFPatcher(font_size=12).patch(
+                source,
+                target,
+                [PDFReplacement(1, (50, 25, 450, 100), "Translated", (600, 600))],
+            )
+
+            text = list(pypdf.PdfReader(str(target)).pages)[0].extract_text()
+            self.assertIn("Translated", text)
+            self.assertIn("Original", text)
+
+    def test_one_overlay_document_serves_pages_of_different_sizes(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            root = Path(temp_dir)
+            source = root / "source.pdf"
+            target = root / "target.pdf"
+            doc = canvas.Canvas(str(source), pagesize=(200, 200))
+            doc.showPage()
+            doc.setPageSize((400, 300))
+            doc.showPage()
+            doc.save()
+
+            PDFPatcher(font_size=12).patch(
+                source,
+                target,
+                [
+                    PDFReplacement(1, (50, 25, 450, 100), "First", (600, 600)),
+                    PDFReplacement(2, (50, 25, 750, 100), "Second", (800, 600)),
+                ],
+            )
+
+            pages: list[Any] = list(pypdf.PdfReader(str(target)).pages)
+            self.assertEqual([(float(page.mediabox.width), float(page.mediabox.height)) for page in pages],
+                             [(200, 200), (400, 300)])
+            self.assertIn("First", pages[0].extract_text())
+            self.assertNotIn("Second", pages[0].extract_text())
+            self.assertIn("Second", pages[1].extract_text())
+
+    def test_process_pool_fits_like_the_sequential_preflight(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            root = Path(temp_dir)
+            source = root / "source.pdf"
+            doc = canvas.Canvas(str(source), pagesize=(200, 200))
+            doc.drawString(1, 1, "source")
+            doc.save()
+            replacements = [
+                PDFReplacement(1, (10, 10 + 60 * index, 590, 60 + 60 * index), "translated text " * (index + 1), (600, 600))
+                for index in range(4)
+            ] + [PDFReplacement(1, (10, 560, 30, 580), "too much text " * 100, (600, 600))]
+
+            results = []
+            for max_workers in (1, 2):
+                patcher = PDFPatcher(options=PatchTextOptions(overflow="skip"), max_workers=max_workers)
+                patcher.patch(source, root / f"target-{max_workers}.pdf", replacements)
+                page: Any = pypdf.PdfReader(str(root / f"target-{max_workers}.pdf")).pages[0]
+                results.append((page.extract_text(), patcher.skipped_replacements))  # pylint: disable=no-member
+            self.assertEqual(results[0], results[1])
+            self.assertEqual(len(results[0][1]), 1)
 
     def test_rejects_invalid_bbox(self):
         with self.assertRaises(ValueError):
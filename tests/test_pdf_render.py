@@ -0,0 +1,164 @@
+import io
+import os
+import stat
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+from PIL import Image
+
+from pdf_craft.error import PDFError
+from pdf_craft.pdf.handler import DefaultPDFDocument, _read_ppm
+from pdf_craft.pdf.page_ref import PageRefContext
+
+_ASSETS = Path(__file__).parent / "assets"
+
+# Emulates `pdftoppm -r DPI -f FIRST -l LAST FILE`: one DPI-sized PPM per page on
+# stdout, and a failure once FAIL_AT_PAGE is reached.
+_FAKE_PDFTOPPM = """#!{python}
+import sys
+
+args = sys.argv[1:]
+dpi = int(args[args.index("-r") + 1])
+first = int(args[args.index("-f") + 1])
+last = int(args[args.index("-l") + 1])
+with open({log!r}, "a", encoding="utf-8") as log:
+    log.write(f"{{first}}-{{last}}@{{dpi}}\\n")
+for page in range(first, last + 1):
+    if page == {fail_at_page}:
+        sys.stderr.write("Syntax Error: broken page")
+        sys.exit(1)
+    sys.stdout.buffer.write(b"P6\\n%d %d\\n255\\n" % (dpi, page))
+    sys.stdout.buffer.write(bytes([page]) * dpi * page * 3)
+"""
+
+
+class _BulkDocument:
+    pages_count = 5
+
+    def __init__(self):
+        self.bulk_calls: list[tuple[list[int], int]] = []
+        self.single_calls: list[int] = []
+
+    def page_size(self, page_index):
+        return (1.0, float(page_index))
+
+    def render_page(self, page_index, dpi):
+        self.single_calls.append(page_index)
+        return Image.new("RGB", (dpi, page_index))
+
+    def render_pages(self, page_indexes, dpi):
+        page_indexes = list(page_indexes)
+        self.bulk_calls.append((page_indexes, dpi))
+        for page_index in page_indexes:
+            if page_index == 4:
+                raise RuntimeError("broken page")
+            yield Image.new("L", (dpi, page_index))
+
+    def metadata(self):
+        raise AssertionError("metadata is not used by this test")
+
+    def close(self):
+        pass
+
+
+class _BulkHandler:
+    def __init__(self):
+        self.document = _BulkDocument()
+
+    def open(self, pdf_path):
+        del pdf_path
+        return self.document
+
+
+class TestPDFRender(unittest.TestCase):
+    def test_default_document_streams_page_ranges_from_one_process(self):
+        with tempfile.TemporaryDirectory() as directory:
+            poppler_path = Path(directory)
+            log_path = poppler_path / "calls.log"
+            self._install_fake_pdftoppm(poppler_path, log_path, fail_at_page=0)
+            document = DefaultPDFDocument(_ASSETS / "mix.pdf", poppler_path)
+            try:
+                images = list(document.render_pages([1, 2, 3, 5], dpi=7))
+            finally:
+                document.close()
+
+            self.assertEqual([image.size for image in images], [(7, 1), (7, 2), (7, 3), (7, 5)])
+            self.assertEqual(images[2].getpixel((0, 0)), (3, 3, 3))
+            self.assertEqual(log_path.read_text().splitlines(), ["1-3@7", "5-5@7"])
+
+    def test_default_document_reports_failed_page_with_poppler_message(self):
+        with tempfile.TemporaryDirectory() as directory:
+            poppler_path = Path(directory)
+            self._install_fake_pdftoppm(poppler_path, poppler_path / "calls.log", fail_at_page=2)
+            document = DefaultPDFDocument(_ASSETS / "mix.pdf", poppler_path)
+            try:
+                stream = document.render_pages([1, 2, 3], dpi=5)
+                self.assertEqual(next(stream).size, (5, 1))
+                with self.assertRaisesRegex(PDFError, "broken page") as context:
+                    next(stream)
+                self.assertEqual(context.exception.page_index, 2)
+            finally:
+                document.close()
+
+    def test_page_ref_renderer_prefers_bulk_rendering_and_recovers_after_errors(self):
+        handler = _BulkHandler()
+        with PageRefContext(_ASSETS / "mix.pdf", handler) as refs:
+            all_refs = list(refs)
+            renderer = refs.renderer(all_refs, dpi=10)
+            try:
+                self.assertEqual(renderer.render(all_refs[0]).mode, "RGB")
+                renderer.render(all_refs[1])
+                renderer.render(all_refs[2])
+                with self.assertRaises(PDFError) as context:
+                    renderer.render(all_refs[3])
+                self.assertEqual(context.exception.page_index, 4)
+                self.assertEqual(renderer.render(all_refs[4]).size, (10, 5))
+                self.assertEqual(renderer.render(all_refs[0]).size, (10, 1))
+            finally:
+                renderer.close()
+
+        document = handler.document
+        self.assertEqual(document.bulk_calls, [([1, 2, 3, 4, 5], 10), ([5], 10)])
+        self.assertEqual(document.single_calls, [1])
+
+    def test_page_ref_renderer_splits_streams_when_dpi_changes(self):
+        handler = _BulkHandler()
+        with PageRefContext(_ASSETS / "mix.pdf", handler) as refs:
+            all_refs = list(refs)[:3]
+            # page_size grows with the index, so the size limit lowers DPI from page 2 on.
+            renderer = refs.renderer(all_refs, dpi=300, max_image_file_size=30000)
+            for ref in all_refs:
+                renderer.render(ref)
+            renderer.close()
+
+        dpis = [dpi for _, dpi in handler.document.bulk_calls]
+        self.assertEqual(len(dpis), 3)
+        self.assertEqual(len(set(dpis)), 3)
+
+    def test_read_ppm_parses_header_lines_and_comments(self):
+        stream = io.BytesIO(b"P6\n# comment\n2 1\n255\n" + bytes(range(6)) + b"P6 1 1 255\n" + b"\n\n\n")
+        first = _read_ppm(stream)
+        assert first is not None
+        self.assertEqual((first.size, first.getpixel((1, 0))), ((2, 1), (3, 4, 5)))
+        second = _read_ppm(stream)
+        assert second is not None
+        self.assertEqual(second.getpixel((0, 0)), (10, 10, 10))
+        self.assertIsNone(_read_ppm(stream))
+        with self.assertRaisesRegex(ValueError, "Truncated PPM header"):
+            _read_ppm(io.BytesIO(b"P6\n2 1\n"))
+        with self.assertRaisesRegex(ValueError, "Unexpected PPM header"):
+            _read_ppm(io.BytesIO(b"P6\n2 1\n255 extra\n"))
+
+    def _install_fake_pdftoppm(self, poppler_path: Path, log_path: Path, fail_at_page: int) -> None:
+        script_path = poppler_path / "pdftoppm"
+        script_path.write_text(
+            _FAKE_PDFTOPPM.format(python=sys.executable, log=str(log_path), fail_at_page=fail_at_page),
+            encoding="utf-8",
+        )
+        os.chmod(script_path, os.stat(script_path).st_mode | stat.S_IEXEC)
+
+
+if __name__ == "__main__":
+    unittest.main()
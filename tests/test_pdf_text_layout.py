@@ -30,6 +30,16 @@ class TestBoxTextLayout(unittest.TestCase):
 
         self.assertEqual(fitted.font_size, 16)
 
+    def test_seeded_search_matches_a_fresh_search(self):
+        options = PatchTextOptions(max_font_size=16, min_font_size=4)
+        reused = BoxTextLayout(options)
+        for repeat, width, height in [(3, 80, 100), (4, 80, 100), (12, 80, 100), (1, 200, 40), (6, 90, 120)]:
+            text = "这是没有空格的中文文本，需要在固定宽度的边框中自动换行。" * repeat
+            self.assertEqual(reused.fit(text, width, height).font_size,
+                             BoxTextLayout(options).fit(text, width, height).font_size)
+        with self.assertRaisesRegex(ValueError, "cannot fit bbox"):
+            reused.fit("too much text " * 100, 20, 10)
+
     def test_fails_when_minimum_font_cannot_fit(self):
         options = PatchTextOptions(max_font_size=8, min_font_size=8)
         with self.assertRaisesRegex(ValueError, "cannot fit bbox"):
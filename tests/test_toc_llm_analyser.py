@@ -1,5 +1,6 @@
 import unittest
 from typing import cast
+from unittest.mock import patch
 
 from pdf_craft.llm.types import Message, MessageRole
 from pdf_craft.llm.core import LLM
@@ -95,6 +96,20 @@ class TestLLMAnalyser(unittest.TestCase):
         self.assertEqual(analyser.request(payload=None, messages=[Message(MessageRole.USER, "toc")]), [2, 3])
         self.assertEqual(received, ['{"A": 2, "B": 3}'])
 
+    def test_runtime_requests_use_the_async_transport(self):
+        llm = LLM("key", "https://example.invalid/v1", "model", "o200k_base", retry_interval_seconds=0)
+        calls = []
+
+        async def ainvoke(_runtime, messages, *_args):
+            calls.append(messages)
+            return '{"0": 0, "1": 1}'
+
+        analyser = _LLMAnalyser(llm=llm, validate=lambda response, payload: ([0, 1], None))
+        with patch("pdf_craft.llm.runtime.LLMRuntime._ainvoke", ainvoke), \
+             patch("pdf_craft.llm.runtime.LLMRuntime._invoke", side_effect=AssertionError("sync transport")):
+            self.assertEqual(analyser.request(payload=None, messages=[Message(MessageRole.USER, "json")]), [0, 1])
+        self.assertEqual(len(calls), 1)
+
     def test_title_and_toc_levels_reject_string_and_boolean_integers(self):
         for response, validator in (
             ('{"0": "1"}', _validate_title_response),
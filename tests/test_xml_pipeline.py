@@ -0,0 +1,294 @@
+# pylint: disable=protected-access
+import asyncio
+import json
+import re
+import tempfile
+import sys
+import threading
+import unittest
+import zipfile
+from pathlib import Path
+from unittest.mock import patch
+from xml.etree.ElementTree import fromstring
+
+from pdf_craft.llm import LLM, batch_response_record
+from pdf_craft.llm.event_loop import EventLoopThread
+from pdf_craft.pipeline.epub import collect_epub_translation, plan_epub_translation, translate_epub
+from pdf_craft.pipeline.epub.adapter import Zip
+from pdf_craft.pipeline.epub.adapter import zip as zip_adapter
+from pdf_craft.transformer.xml_translator.xml_translator import SubmitKind, TranslationTask, XMLTranslator
+from pdf_craft.transformer.xml_translator.xml_translator.concurrency import run_async_pipeline, run_unordered
+
+
+class TestRunAsyncPipeline(unittest.TestCase):
+    def test_stages_overlap_on_one_loop_and_keep_input_order(self):
+        threads = set()
+        with EventLoopThread() as event_loop:
+            # Item 1's second stage and item 2's first stage must meet at the barrier.
+            barrier = asyncio.Barrier(2)
+
+            async def first(value):
+                threads.add(threading.get_ident())
+                if value == 2:
+                    await asyncio.wait_for(barrier.wait(), 5)
+                return value * 10
+
+            async def second(value):
+                threads.add(threading.get_ident())
+                if value == 10:
+                    await asyncio.wait_for(barrier.wait(), 5)
+                return value + 1
+
+            results = list(run_async_pipeline(event_loop.loop, [1, 2, 3], first, second,
+                                              first_concurrency=1, second_concurrency=1))
+        self.assertEqual(results, [11, 21, 31])
+        self.assertEqual(len(threads), 1)
+
+    def test_propagates_errors_and_cancels_the_rest(self):
+        cancelled = []
+
+        async def first(value):
+            if value == 3:
+                raise ValueError("first stage")
+            if value > 3:
+                try:
+                    await asyncio.sleep(5)
+                except asyncio.CancelledError:
+                    cancelled.append(value)
+                    raise
+            return value
+
+        async def second(value):
+            return str(value)
+
+        results = []
+        with EventLoopThread() as event_loop:
+            with self.assertRaisesRegex(ValueError, "first stage"):
+                for result in run_async_pipeline(event_loop.loop, range(6), first, second,
+                                                 first_concurrency=3, second_concurrency=2):
+                    results.append(result)
+        self.assertEqual(results, ["0", "1", "2"])
+        self.assertTrue(cancelled)
+
+
+class TestRunUnordered(unittest.TestCase):
+    def test_yields_in_completion_order_with_bounded_window(self):
+        release = threading.Event()
+        lock = threading.Lock()
+        running = 0
+        max_running = 0
+
+        def execute(value):
+            nonlocal running, max_running
+            with lock:
+                running += 1
+                max_running = max(max_running, running)
+            if value == 1:
+                release.wait(timeout=5)
+            with lock:
+                running -= 1
+            return value
+
+        results = []
+        for result in run_unordered([1, 2, 3, 4], execute, concurrency=2):
+            results.append(result)
+            if result == 3:
+                release.set()
+        # Item 1 holds one of the two slots while items 2 and 3 pass it.
+        self.assertEqual(results[:2], [2, 3])
+        self.assertEqual(sorted(results), [1, 2, 3, 4])
+        self.assertLessEqual(max_running, 2)
+
+
+class TestZip(unittest.TestCase):
+    def test_assembles_target_in_source_order_with_raw_copies(self):
+        with tempfile.TemporaryDirectory() as directory:
+            root = Path(directory)
+            source = root / "source.epub"
+            with zipfile.ZipFile(source, "w", zipfile.ZIP_DEFLATED) as source_zip:
+                source_zip.writestr("OEBPS/a.xhtml", "<a/>")
+                source_zip.writestr("mimetype", "application/epub+zip", compress_type=zipfile.ZIP_STORED)
+                source_zip.writestr("OEBPS/image.png", bytes(range(256)) * 64, compresslevel=1)
+                source_zip.writestr("OEBPS/b.xhtml", "<b/>")
+
+            with Zip(source, root / "target.epub") as zip:
+                threads = [
+                    threading.Thread(target=lambda name=name: _replace(zip, name, f"<{name}-new/>"))
+                    for name in ("OEBPS/b.xhtml", "OEBPS/a.xhtml")
+                ]
+                for thread in threads:
+                    thread.start()
+                for thread in threads:
+                    thread.join()
+
+            with zipfile.ZipFile(source) as source_zip, zipfile.ZipFile(root / "target.epub") as target_zip:
+                self.assertIsNone(target_zip.testzip())
+                self.assertEqual(target_zip.namelist(), ["mimetype", "OEBPS/a.xhtml", "OEBPS/image.png", "OEBPS/b.xhtml"])
+                self.assertEqual(target_zip.getinfo("mimetype").compress_type, zipfile.ZIP_STORED)
+                self.assertEqual(target_zip.read("OEBPS/a.xhtml"), b"<OEBPS/a.xhtml-new/>")
+                # Untouched entries keep their original compressed bytes.
+                image = source_zip.getinfo("OEBPS/image.png")
+                self.assertEqual(target_zip.getinfo("OEBPS/image.png").compress_size, image.compress_size)
+                self.assertEqual(target_zip.read("OEBPS/image.png"), source_zip.read("OEBPS/image.png"))
+            self.assertEqual(sorted(path.name for path in root.iterdir()), ["source.epub", "target.epub"])
+
+
+    def test_untouched_entries_round_trip_with_and_without_raw_copies(self):
+        # Raw copies rely on zipfile internals verified on 3.11-3.13; other versions re-compress.
+        self.assertEqual(zip_adapter._RAW_COPY, sys.version_info[:2] in ((3, 11), (3, 12), (3, 13)))
+        with tempfile.TemporaryDirectory() as directory:
+            root = Path(directory)
+            source = root / "source.epub"
+            with open(source, "wb") as file:
+                # An unseekable stream makes zipfile write entries with data descriptors.
+                with zipfile.ZipFile(_Unseekable(file), "w", zipfile.ZIP_DEFLATED) as source_zip:
+                    source_zip.writestr("mimetype", "application/epub+zip", compress_type=zipfile.ZIP_STORED)
+                    source_zip.writestr("OEBPS/a.xhtml", "<a/>")
+                    with source_zip.open("OEBPS/image.png", "w") as entry:
+                        entry.write(bytes(range(256)) * 64)
+            for raw in (True, False):
+                with self.subTest(raw=raw), patch.object(zip_adapter, "_RAW_COPY", raw and zip_adapter._RAW_COPY):
+                    target = root / f"target-{raw}.epub"
+                    with Zip(source, target) as zip:
+                        _replace(zip, "OEBPS/a.xhtml", "<new/>")
+                    with zipfile.ZipFile(source) as source_zip, zipfile.ZipFile(target) as target_zip:
+                        self.assertIsNone(target_zip.testzip())
+                        self.assertEqual(target_zip.read("OEBPS/a.xhtml"), b"<new/>")
+                        self.assertEqual(target_zip.read("OEBPS/image.png"), source_zip.read("OEBPS/image.png"))
+                        self.assertEqual(target_zip.read("mimetype"), b"application/epub+zip")
+
+
+class TestPlanElements(unittest.TestCase):
+    def test_plan_reports_chunks_cached_by_a_previous_run(self):
+        with tempfile.TemporaryDirectory() as directory:
+            translator = XMLTranslator(
+                translation_llm=_llm(Path(directory)), fill_llm=_llm(Path(directory)), target_language="French",
+                user_prompt=None, ignore_translated_error=False, max_retries=1, max_fill_displaying_errors=10,
+                max_group_score=2600, cache_seed_content="seed",
+            )
+
+            def tasks():
+                return [TranslationTask(fromstring("<body><p>Hello world</p></body>"), SubmitKind.REPLACE, None)]
+
+            planned = list(translator.plan_elements(tasks()))
+            self.assertEqual(len(planned), 1)
+            self.assertFalse(planned[0].translation.cached)
+            self.assertGreater(planned[0].translation.prompt_tokens, 0)
+            self.assertIsNone(planned[0].fill)
+
+            translator._translation_runtime._ainvoke = _constant_ainvoke("Bonjour le monde")  # type: ignore[method-assign]
+            list(translator.translate_elements(tasks()))
+            planned = list(translator.plan_elements(tasks()))
+            self.assertTrue(planned[0].translation.cached)
+            # A single plain paragraph is filled without the fill LLM.
+            self.assertIsNone(planned[0].fill)
+
+    def test_concurrency_above_the_llm_limit_warns(self):
+        with tempfile.TemporaryDirectory() as directory:
+            llm = _llm(Path(directory))
+            translator = XMLTranslator(
+                translation_llm=llm, fill_llm=llm, target_language="French", user_prompt=None,
+                ignore_translated_error=False, max_retries=1, max_fill_displaying_errors=10,
+                max_group_score=2600, cache_seed_content="seed",
+            )
+            limit = translator._translation_runtime.max_concurrency
+            with self.assertWarnsRegex(UserWarning, f"concurrency={limit + 1} exceeds"):
+                list(translator.translate_elements([], concurrency=limit + 1))
+
+    def test_batch_responses_are_collected_into_the_caches(self):
+        with tempfile.TemporaryDirectory() as directory:
+            root = Path(directory)
+            llm = _llm(root)
+            source = Path(__file__).parent / "assets" / "epub" / "Cambridge.epub"
+            first = plan_epub_translation(source, "French", SubmitKind.REPLACE, llm=llm,
+                                          batch_path=root / "translations.jsonl")
+            self.assertGreater(first.pending_chunks, 0)
+            self.assertEqual(first.fill_requests, 0)
+            requests = _read_jsonl(root / "translations.jsonl")
+            self.assertEqual(len(requests), first.batch_requests)
+            self.assertTrue(all(record["custom_id"].startswith("translation:") for record in requests))
+
+            # A stand-in batch executor answering every request.
+            with open(root / "responses.jsonl", "w", encoding="utf-8") as file:
+                for record in requests:
+                    response = batch_response_record(record["custom_id"], "Traduit.\n\nTraduit.")
+                    file.write(json.dumps(response) + "\n")
+            self.assertEqual(collect_epub_translation(root / "responses.jsonl", llm=llm), len(requests))
+
+            second = plan_epub_translation(source, "French", SubmitKind.REPLACE, llm=llm,
+                                           batch_path=root / "fills.jsonl")
+            self.assertEqual(second.cached_chunks, second.chunks)
+            self.assertEqual(second.pending_prompt_tokens, 0)
+            self.assertTrue(all(record["custom_id"].startswith("fill:")
+                                for record in _read_jsonl(root / "fills.jsonl")))
+            self.assertEqual(second.pending_fill_requests, second.batch_requests)
+
+            # Fill responses without one complete <xml> block are not cached.
+            fills = _read_jsonl(root / "fills.jsonl")
+            with open(root / "fill-responses.jsonl", "w", encoding="utf-8") as file:
+                for index, record in enumerate(fills):
+                    content = "no xml here" if index == 0 else "<xml><p>Traduit.</p></xml>"
+                    file.write(json.dumps(batch_response_record(record["custom_id"], content)) + "\n")
+            self.assertEqual(collect_epub_translation(root / "fill-responses.jsonl", llm=llm), len(fills) - 1)
+
+    def test_parallel_chapters_match_sequential_output_and_plan(self):
+        with tempfile.TemporaryDirectory() as directory, \
+             patch("pdf_craft.llm.runtime.LLMRuntime._ainvoke", _echo_ainvoke):
+            root = Path(directory)
+            source = Path(__file__).parent / "assets" / "epub" / "Cambridge.epub"
+            for chapter_concurrency in (1, 3):
+                translate_epub(source, root / f"{chapter_concurrency}.epub", "French", SubmitKind.REPLACE,
+                               llm=_llm(root / str(chapter_concurrency)), chapter_concurrency=chapter_concurrency)
+            with zipfile.ZipFile(root / "1.epub") as sequential, zipfile.ZipFile(root / "3.epub") as parallel:
+                self.assertEqual(sequential.namelist(), parallel.namelist())
+                for name in sequential.namelist():
+                    self.assertEqual(sequential.read(name), parallel.read(name), name)
+
+            planned = plan_epub_translation(source, "French", SubmitKind.REPLACE, llm=_llm(root / "3"),
+                                            chapter_concurrency=3)
+            self.assertEqual(planned.cached_chunks, planned.chunks)
+
+
+def _replace(zip: Zip, name: str, content: str) -> None:
+    with zip.replace(Path(name)) as file:
+        file.write(content.encode("utf-8"))
+
+
+def _constant_ainvoke(response: str):
+    async def ainvoke(*_args, **_kwargs) -> str:
+        return response
+    return ainvoke
+
+
+async def _echo_ainvoke(_runtime, messages, *_args, **_kwargs) -> str:
+    # Translations echo the source and fills return the XML template unchanged.
+    user_message = messages[-1].message
+    template = re.search(r"XML template:\n```XML\n(.*)\n```", user_message, re.S)
+    return f"```XML\n{template.group(1)}\n```" if template else user_message
+
+
+class _Unseekable:
+    def __init__(self, file) -> None:
+        self._file = file
+
+    def write(self, data: bytes) -> int:
+        return self._file.write(data)
+
+    def flush(self) -> None:
+        self._file.flush()
+
+    def close(self) -> None:
+        pass
+
+
+def _llm(root: Path) -> LLM:
+    return LLM("key", "https://example.invalid/v1", "model", "o200k_base",
+               retry_interval_seconds=0, cache_path=root / "cache")
+
+
+def _read_jsonl(path: Path) -> list[dict]:
+    return [json.loads(line) for line in path.read_text(encoding="utf-8").splitlines()]
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,17 +1,22 @@
  # pylint: disable=protected-access,unused-argument
+import asyncio
 import unittest
 from types import SimpleNamespace
 from typing import Any, cast
-from xml.etree.ElementTree import Element
+from xml.etree.ElementTree import Element, fromstring
 
+from pdf_craft.transformer.xml_translator.segment import BlockSegment, search_inline_segments, search_text_segments
 from pdf_craft.transformer.xml_translator.xml_translator.callbacks import Callbacks
-from pdf_craft.transformer.xml_translator.xml_translator.translator import XMLTranslator
+from pdf_craft.transformer.xml_translator.xml_translator.hill_climbing import HillClimbing
+from pdf_craft.transformer.xml_translator.xml_translator.tokens import TokenCache
+from pdf_craft.transformer.xml_translator.xml_translator.translator import XMLTranslator, _TranslatedGroup
 
 
 class _Context:
     def __init__(self, responses):
         self.responses = iter(responses)
         self.calls = 0
+        self.discarded = 0
 
     def __enter__(self):
         return self
@@ -19,10 +24,13 @@ class _Context:
     def __exit__(self, *args):
         return None
 
-    def request(self, messages, **kwargs):
+    async def arequest(self, messages, **kwargs):
         self.calls += 1
         return next(self.responses)
 
+    def discard(self):
+        self.discarded += 1
+
 
 class _Runtime:
     def __init__(self, responses):
@@ -66,15 +74,23 @@ class TestXMLRepairLoop(unittest.TestCase):
         translator = _translator(["<xml>bad</xml>", "<xml>good</xml>"])
         events = []
         hill = _Hill(["structural error", None])
-        translator._request_and_submit(cast(Any, hill), "source", "translated", _callbacks(events))
+        asyncio.run(translator._request_and_submit(cast(Any, hill), "source", "translated", _callbacks(events)))
         self.assertEqual(cast(Any, translator._fill_runtime).context_value.calls, 2)
         self.assertEqual([event.error_message for event in events], ["structural error"])
         self.assertFalse(events[0].over_maximum_retries)
+        # The rejected first response is dropped before the context commits it to the cache.
+        self.assertEqual(cast(Any, translator._fill_runtime).context_value.discarded, 1)
+
+    def test_valid_first_fill_stays_cacheable(self):
+        translator = _translator(["<xml>good</xml>"])
+        asyncio.run(translator._request_and_submit(cast(Any, _Hill([None])), "s", "t", _callbacks([])))
+        self.assertEqual(cast(Any, translator._fill_runtime).context_value.discarded, 0)
 
     def test_exhausted_event_keeps_final_xml_diagnostic_and_callback_errors_propagate(self):
         translator = _translator(["<xml>a</xml>", "<xml>b</xml>"], retries=2)
         events = []
-        translator._request_and_submit(cast(Any, _Hill(["first error", "final structural error"])), "s", "t", _callbacks(events))
+        asyncio.run(translator._request_and_submit(
+            cast(Any, _Hill(["first error", "final structural error"])), "s", "t", _callbacks(events)))
         self.assertEqual(events[-1].error_message, "final structural error")
         self.assertTrue(events[-1].over_maximum_retries)
 
@@ -82,10 +98,38 @@ class TestXMLRepairLoop(unittest.TestCase):
             raise RuntimeError("callback")
 
         with self.assertRaisesRegex(RuntimeError, "callback"):
-            _translator(["<xml>x</xml>"])._request_and_submit(
+            asyncio.run(_translator(["<xml>x</xml>"])._request_and_submit(
                 cast(Any, _Hill(["error"])), "s", "t",
                 Callbacks(lambda x: x, lambda x: x, lambda x: x, fail),
-            )
+            ))
+
+    def test_single_plain_paragraph_is_filled_without_the_fill_llm(self):
+        translator = _translator([])
+        events = []
+        mappings = asyncio.run(translator._fill_inline_segments(
+            _translated("<body><p>Hello world.</p></body>", "你好，世界。"), _callbacks(events)))
+        self.assertEqual(cast(Any, translator._fill_runtime).context_value.calls, 0)
+        self.assertEqual(events, [])
+        mapping = mappings[0]
+        assert mapping is not None
+        self.assertEqual("".join(segment.text for segment in mapping[1]), "你好，世界。")
+
+    def test_nested_inline_tags_still_use_the_fill_llm(self):
+        translator = _translator(["<xml><p>你好<b>世界</b></p></xml>"], retries=1)
+        translator._extract_xml_element = fromstring  # type: ignore[method-assign]
+        asyncio.run(translator._fill_inline_segments(
+            _translated("<body><p>Hello <b>world</b></p></body>", "你好世界"), _callbacks([])))
+        self.assertEqual(cast(Any, translator._fill_runtime).context_value.calls, 1)
+
+
+def _translated(source: str, translated_text: str) -> _TranslatedGroup:
+    inline_segments = list(search_inline_segments(search_text_segments(fromstring(source))))
+    hill_climbing = HillClimbing(
+        encoding=TokenCache(cast(Any, SimpleNamespace(encode=list))),
+        max_fill_displaying_errors=10,
+        block_segment=BlockSegment(root_tag="xml", inline_segments=inline_segments),
+    )
+    return _TranslatedGroup(inline_segments, hill_climbing, "source", translated_text)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,43 @@
+import unittest
+from typing import Any, cast
+
+from pdf_craft.transformer.xml_translator.xml_translator.tokens import TokenCache
+
+
+class _Encoding:
+    def __init__(self):
+        self.calls: list[str] = []
+
+    def encode(self, text):
+        self.calls.append(text)
+        return [ord(char) for char in text]
+
+    def decode(self, tokens):
+        return "".join(chr(token) for token in tokens)
+
+
+class TestTokenCache(unittest.TestCase):
+    def test_repeated_texts_are_encoded_once(self):
+        encoding = _Encoding()
+        tokens = TokenCache(cast(Any, encoding))
+        self.assertEqual(tokens.count("hello"), 5)
+        first = tokens.encode("hello")
+        first.append(0)  # callers may mutate their copy
+        self.assertEqual(tokens.encode("hello"), [ord(char) for char in "hello"])
+        self.assertEqual(tokens.decode(tokens.encode("hello")[:2]), "he")
+        self.assertEqual(encoding.calls, ["hello"])
+
+    def test_least_recently_used_entries_are_evicted(self):
+        encoding = _Encoding()
+        tokens = TokenCache(cast(Any, encoding), max_entries=2)
+        tokens.count("a")
+        tokens.count("b")
+        tokens.count("a")
+        tokens.count("c")  # evicts "b"
+        tokens.count("a")
+        tokens.count("b")
+        self.assertEqual(encoding.calls, ["a", "b", "c", "b"])
+
+
+if __name__ == "__main__":
+    unittest.main()